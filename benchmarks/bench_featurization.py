@@ -0,0 +1,54 @@
+"""
+Compares FeatureExtractor's vocabulary-based TfidfVectorizer path with the hashing mode,
+in memory and streamed in chunks across worker processes.
+
+Run from the repository root:
+    python -m benchmarks.bench_featurization --docs 100000 1000000 --jobs 4
+"""
+import argparse
+import itertools
+import random
+import time
+from typing import Iterator, List
+from meme_predictor.feature_extractor import FeatureExtractor
+
+def synthetic_chunks(n_docs: int, chunk_size: int, vocabulary_size: int = 50000, seed: int = 0) -> Iterator[List[str]]:
+    """
+    Yields synthetic documents with a Zipf-like vocabulary, one chunk at a time.
+    """
+    rng = random.Random(seed)
+    words = [f"tok{i}" for i in range(vocabulary_size)]
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(vocabulary_size)))
+    for start in range(0, n_docs, chunk_size):
+        size = min(chunk_size, n_docs - start)
+        yield [" ".join(rng.choices(words, cum_weights=cum_weights, k=rng.randint(5, 40))) for _ in range(size)]
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--chunk-size", type=int, default=20000)
+    parser.add_argument("--jobs", type=int, default=4)
+    args = parser.parse_args()
+
+    for n_docs in args.docs:
+        chunks = list(synthetic_chunks(n_docs, args.chunk_size))
+        documents = [doc for chunk in chunks for doc in chunk]
+        tfidf = timed(lambda: FeatureExtractor().fit_transform(documents))
+        hashing = timed(lambda: FeatureExtractor(hashing=True).fit_transform(documents))
+
+        def streamed() -> None:
+            extractor = FeatureExtractor(hashing=True)
+            extractor.fit_chunks(iter(chunks), n_jobs=args.jobs)
+            for _ in extractor.transform_chunks(iter(chunks), n_jobs=args.jobs):
+                pass
+        chunked = timed(streamed)
+        print(f"{n_docs:>9} docs | tfidf {n_docs / tfidf:10.0f} docs/s | hashing {n_docs / hashing:10.0f} docs/s"
+              f" | hashing chunked x{args.jobs} {n_docs / chunked:10.0f} docs/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+"""
+End-to-end benchmark of the pipeline on synthetic corpora replayed through local Twitter,
+Reddit and Solana RPC stubs. For every scale it measures wall time, throughput and peak RSS
+for each stage and for a concurrent end-to-end cycle, and writes machine-readable JSON so
+runs on different commits can be compared.
+
+Each scale runs in its own subprocess so memory figures are independent. Run from the
+repository root:
+    python -m benchmarks.bench_pipeline --docs 1000 10000 100000 --output bench_results.json
+    python -m benchmarks.bench_pipeline --docs 10000 --compare bench_results.json
+"""
+import argparse
+import asyncio
+import functools
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List
+import numpy as np
+from solana.publickey import PublicKey
+from benchmarks.service_stubs import ServiceStubs
+from benchmarks.synthetic_corpus import MEME_WORDS, TICKERS, SyntheticCorpus
+from blockchain_integration.solana_connector import SolanaConnector
+from data_collection.api_integrations import APIIntegrations
+from data_collection.deduplicator import Deduplicator
+from meme_predictor.feature_extractor import FeatureExtractor
+from meme_predictor.meme_model import MemeModel
+from monitoring.metrics import REGISTRY
+from pipeline.dag_runner import PipelineRunner, Stage
+from preprocessing.shared_tokenizer import SharedTokenizer
+from recommender.recommender_system import RecommenderSystem
+from trend_analysis.trend_detector import TrendDetector
+
+FORMAT_VERSION = 1
+
+def current_rss() -> int:
+    """
+    Resident set size in bytes (Linux /proc; elsewhere the peak so far).
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+class RSSMonitor:
+    def __init__(self, interval: float = 0.005):
+        """
+        Samples RSS on a background thread while a stage runs and keeps the peak.
+        """
+        self.interval = interval
+        self.start_rss = self.peak_rss = current_rss()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak_rss = max(self.peak_rss, current_rss())
+
+    def __enter__(self) -> "RSSMonitor":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak_rss = max(self.peak_rss, current_rss())
+
+def record(results: Dict[str, Dict[str, Any]], name: str, items: int, seconds: float, memory: RSSMonitor) -> None:
+    results[name] = {
+        "seconds": round(seconds, 4),
+        "items": items,
+        "items_per_second": round(items / seconds, 1) if seconds > 0 else None,
+        "peak_rss_mb": round(memory.peak_rss / 2 ** 20, 1),
+        "rss_growth_mb": round((memory.peak_rss - memory.start_rss) / 2 ** 20, 1),
+    }
+
+def measure(results: Dict[str, Dict[str, Any]], name: str, items: int, fn: Callable[[], Any]) -> Any:
+    """
+    Runs `fn`, records its wall time, throughput over `items` and memory, and returns its result.
+    """
+    with RSSMonitor() as memory:
+        start = time.perf_counter()
+        value = fn()
+        seconds = time.perf_counter() - start
+    record(results, name, items, seconds, memory)
+    return value
+
+async def measure_async(results: Dict[str, Dict[str, Any]], name: str, items: int,
+                        coroutine_fn: Callable[[], Any]) -> Any:
+    """
+    `measure` for coroutines, timed on the event loop so stub request handling is included.
+    """
+    with RSSMonitor() as memory:
+        start = time.perf_counter()
+        value = await coroutine_fn()
+        seconds = time.perf_counter() - start
+    record(results, name, items, seconds, memory)
+    return value
+
+def latency_ms(snapshot: Dict[str, float]) -> Dict[str, float]:
+    return {key: round(value * 1000, 3) for key, value in snapshot.items() if key != "count"}
+
+async def collect(stubs: ServiceStubs, max_results: int = 100) -> Dict[str, List[str]]:
+    """
+    Pulls the whole corpus through APIIntegrations' paginated streams, both sources concurrently.
+    """
+    api = APIIntegrations("token", "id", "secret", twitter_url=stubs.twitter_url, reddit_url=stubs.reddit_url)
+    pages = stubs.corpus.n_docs // max_results + 2
+
+    async def drain(stream, field):
+        return [item[field] async for item in stream]
+
+    twitter, reddit = await asyncio.gather(
+        drain(api.stream_twitter_data("meme", max_results, max_pages=pages, max_polls=1), "text"),
+        drain(api.stream_reddit_data("crypto", max_results, max_pages=pages, max_polls=1), "title"),
+    )
+    await api.close()
+    return {"twitter": twitter, "reddit": reddit}
+
+def deduplicate(collected: Dict[str, List[str]]) -> List[str]:
+    deduplicator = Deduplicator()
+    documents = []
+    for source, texts in collected.items():
+        documents += deduplicator.filter(texts, source=source)
+    return documents
+
+def synthetic_users(n_users: int, seed: int = 0) -> Dict[str, List[str]]:
+    rng = np.random.default_rng(seed)
+    pool = MEME_WORDS + [ticker.lower() for ticker in TICKERS]
+    return {f"user{i}": list(rng.choice(pool, size=5, replace=False)) for i in range(n_users)}
+
+def synthetic_wallets(n_wallets: int, seed: int = 0) -> List[str]:
+    rng = np.random.default_rng(seed)
+    return [str(PublicKey(bytes(rng.integers(0, 256, 32, dtype=np.uint8)))) for _ in range(n_wallets)]
+
+def run_scale(n_docs: int, trees: int = 100, seed: int = 0, sentiment: bool = False,
+              latency_samples: int = 500) -> Dict[str, Any]:
+    """
+    Benchmarks every stage on an `n_docs` corpus and returns the results for that scale.
+    """
+    stages: Dict[str, Dict[str, Any]] = {}
+    corpus = measure(stages, "generate_corpus", n_docs, lambda: SyntheticCorpus(n_docs, seed=seed))
+    labels_by_text = dict(zip(corpus.texts, corpus.labels()))
+    stubs = ServiceStubs(corpus)
+    users = synthetic_users(min(n_docs, 100_000), seed)
+    wallets = synthetic_wallets(min(n_docs, 10_000), seed)
+    model_dir = tempfile.mkdtemp(prefix="bench_model_")
+
+    async def run() -> Dict[str, Any]:
+        await stubs.start()
+        try:
+            return await benchmark(stubs)
+        finally:
+            await stubs.stop()
+
+    async def benchmark(stubs: ServiceStubs) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        # Blocking stages run off the loop so the stubs stay responsive.
+        in_thread = lambda name, items, fn: loop.run_in_executor(None, measure, stages, name, items, fn)
+
+        collected = await measure_async(stages, "collect", n_docs, lambda: collect(stubs))
+        stages["collect"]["requests"] = dict(stubs.requests)
+        stages["collect"]["request_latency_ms"] = {
+            service: latency_ms(REGISTRY.get("request_seconds").snapshot(service=service))
+            for service in ("twitter", "reddit")
+        }
+        documents = await in_thread("deduplicate", n_docs, lambda: deduplicate(collected))
+        n_unique = len(documents)
+        shared_tokens = await in_thread("tokenize", n_unique, lambda: SharedTokenizer().fit(documents))
+        detector = TrendDetector()
+        await in_thread("trends", n_unique, lambda: detector.detect_trends(documents, shared_tokens=shared_tokens))
+        if sentiment:
+            from trend_analysis.sentiment_analysis import SentimentAnalysis
+            analyzer = SentimentAnalysis()
+            await in_thread("sentiment", n_unique, lambda: analyzer.analyze_sentiment(documents))
+        extractor = FeatureExtractor()
+        features = await in_thread("features", n_unique, lambda: extractor.fit_transform(documents, shared_tokens=shared_tokens))
+        y = np.array([labels_by_text.get(text, 0) for text in documents])
+        model = MemeModel(model_path=os.path.join(model_dir, "meme_model.joblib"))
+        model.model.set_params(n_estimators=trees, verbosity=0)
+        await in_thread("train", n_unique, lambda: model.train(features, y))
+        if model._current_booster() is None:
+            # MemeModel logs and swallows training errors (e.g. running out of memory); keep
+            # benchmarking the other stages and make the failure visible in the results.
+            stages["train"]["error"] = "training failed, see log"
+        else:
+            await in_thread("predict", n_unique, lambda: model.predict(features))
+
+            def single_post_latency() -> Dict[str, float]:
+                timings = []
+                for row in range(min(latency_samples, features.shape[0])):
+                    start = time.perf_counter()
+                    model.predict_raw(extractor.transform([documents[row]]))
+                    timings.append(time.perf_counter() - start)
+                timings.sort()
+                return {"p50": timings[len(timings) // 2], "p99": timings[int(len(timings) * 0.99)],
+                        "max": timings[-1]}
+            scoring = await in_thread("score_single_post", min(latency_samples, n_unique), single_post_latency)
+            stages["score_single_post"]["latency_ms"] = latency_ms(scoring)
+
+        recommender = RecommenderSystem()
+        recommender.index_trends(detector.topics)
+        await in_thread("recommend", len(users), lambda: recommender.recommend_many(users))
+
+        connector = SolanaConnector(rpc_url=stubs.rpc_url)
+        await measure_async(stages, "solana_balances", len(wallets), lambda: connector.get_balances(wallets))
+        await connector.close()
+
+        # One concurrent cycle through the DAG runner, as main.py runs it.
+        async def end_to_end() -> Dict[str, Any]:
+            e2e_detector, e2e_extractor = TrendDetector(), FeatureExtractor()
+            e2e_model = MemeModel(model_path=os.path.join(model_dir, "e2e_model.joblib"))
+            e2e_model.model.set_params(n_estimators=trees, verbosity=0)
+            e2e_connector = SolanaConnector(rpc_url=stubs.rpc_url)
+
+            def train(features, documents):
+                e2e_model.train(features, np.array([labels_by_text.get(text, 0) for text in documents]))
+                return True
+
+            def recommend(trends):
+                e2e_recommender = RecommenderSystem()
+                e2e_recommender.index_trends(e2e_detector.topics)
+                return e2e_recommender.recommend_many(users)
+
+            runner = PipelineRunner([
+                Stage("collect", functools.partial(collect, stubs), outputs=["collected"], executor="async"),
+                Stage("deduplicate", deduplicate, ["collected"], ["documents"]),
+                Stage("tokenize", lambda docs: SharedTokenizer().fit(docs), ["documents"], ["shared_tokens"]),
+                Stage("trends", lambda docs, tokens: e2e_detector.detect_trends(docs, shared_tokens=tokens),
+                      ["documents", "shared_tokens"], ["trends"]),
+                Stage("features", lambda docs, tokens: e2e_extractor.fit_transform(docs, shared_tokens=tokens),
+                      ["documents", "shared_tokens"], ["features"]),
+                Stage("train", train, ["features", "documents"], ["trained"]),
+                Stage("predict", lambda features, trained: e2e_model.predict(features), ["features", "trained"],
+                      ["predictions"]),
+                Stage("recommend", recommend, ["trends"], ["recommendations"]),
+                Stage("balances", functools.partial(e2e_connector.get_balances, wallets), outputs=["balances"],
+                      executor="async"),
+            ])
+            try:
+                await runner.run_once()
+            finally:
+                runner.close()
+                await e2e_connector.close()
+            return {name: round(seconds, 4) for name, seconds in runner.last_timings.items()}
+
+        stage_timings = await measure_async(stages, "end_to_end", n_docs, end_to_end)
+        stages["end_to_end"]["stage_seconds"] = stage_timings
+        return {"docs": n_docs, "unique_docs": n_unique, "stages": stages}
+
+    return asyncio.run(run())
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"format_version": FORMAT_VERSION, "commit": commit, "python": platform.python_version(),
+            "platform": platform.platform(), "cpu_count": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())}
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float,
+            min_seconds: float = 0.05) -> List[str]:
+    """
+    Lists stages that got more than `tolerance` slower than in `baseline`, scale by scale.
+    Stages faster than `min_seconds` in both runs are too noisy to flag.
+    """
+    regressions = []
+    previous = {result["docs"]: result for result in baseline.get("results", [])}
+    for result in current["results"]:
+        before = previous.get(result["docs"])
+        if before is None:
+            continue
+        for name, stage in result["stages"].items():
+            old = before["stages"].get(name, {}).get("seconds")
+            if not old:
+                continue
+            ratio = stage["seconds"] / old
+            noisy = max(old, stage["seconds"]) < min_seconds
+            flag = "REGRESSION" if ratio > 1 + tolerance and not noisy else ""
+            print(f"{result['docs']:>9} {name:>18}: {old:9.3f}s -> {stage['seconds']:9.3f}s  x{ratio:5.2f} {flag}")
+            if flag:
+                regressions.append(f"{result['docs']}:{name}")
+    return regressions
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--trees", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sentiment", action="store_true", help="Include the BERT sentiment stage (downloads the model)")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this path")
+    parser.add_argument("--compare", default=None, help="Baseline JSON to compare stage times against")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    parser.add_argument("--min-seconds", type=float, default=0.05, help="Ignore stages faster than this")
+    parser.add_argument("--scale-worker", type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scale_worker is not None:
+        print(json.dumps(run_scale(args.scale_worker, args.trees, args.seed, args.sentiment)))
+        return
+    report = {"environment": environment(), "results": []}
+    for n_docs in args.docs:
+        child = [sys.executable, "-m", "benchmarks.bench_pipeline", "--scale-worker", str(n_docs),
+                 "--trees", str(args.trees), "--seed", str(args.seed)] + (["--sentiment"] if args.sentiment else [])
+        output = subprocess.run(child, check=True, stdout=subprocess.PIPE, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        report["results"].append(result)
+        for name, stage in result["stages"].items():
+            print(f"{n_docs:>9} {name:>18}: {stage['seconds']:9.3f}s {stage['items_per_second'] or 0:12.0f}/s"
+                  f"  peak RSS {stage['peak_rss_mb']:8.1f} MB")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.tolerance, args.min_seconds)
+        if regressions:
+            print(f"{len(regressions)} stages regressed beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
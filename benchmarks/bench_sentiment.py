@@ -0,0 +1,47 @@
+"""
+Compares sentiment throughput of the plain HF pipeline call against the batched,
+length-bucketed engine used by SentimentAnalysis.analyze_sentiment, on any backend.
+
+Run from the repository root:
+    python -m benchmarks.bench_sentiment --docs 2000 --batch-size 32 --backend quantized
+"""
+import argparse
+import random
+import time
+from trend_analysis.sentiment_analysis import BACKENDS, SentimentAnalysis
+
+WORDS = ("pepe doge wif bonk moon rug pump dump launch whale chart bullish bearish "
+         "airdrop solana memecoin hodl degen ape floor listing liquidity").split()
+
+def synthetic_texts(n: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(WORDS, k=rng.randint(3, 60))) for _ in range(n)]
+
+def docs_per_second(fn, texts) -> float:
+    start = time.perf_counter()
+    fn(texts)
+    return len(texts) / (time.perf_counter() - start)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model", default="nlptown/bert-base-multilingual-uncased-sentiment")
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--backend", choices=BACKENDS, default="torch")
+    parser.add_argument("--onnx-path", default=None)
+    args = parser.parse_args()
+
+    texts = synthetic_texts(args.docs)
+    baseline = docs_per_second(SentimentAnalysis(args.model).sentiment_pipeline, texts)
+    analyzer = SentimentAnalysis(args.model, batch_size=args.batch_size, num_threads=args.threads,
+                                 backend=args.backend, onnx_path=args.onnx_path)
+    cold = docs_per_second(analyzer.analyze_sentiment, texts)
+    warm = docs_per_second(analyzer.analyze_sentiment, texts)
+    print(f"pipeline (current path): {baseline:10.1f} docs/s")
+    print(f"{args.backend} backend")
+    print(f"engine, cold cache:      {cold:10.1f} docs/s ({cold / baseline:.2f}x)")
+    print(f"engine, warm cache:      {warm:10.1f} docs/s ({warm / baseline:.2f}x)")
+
+if __name__ == "__main__":
+    main()
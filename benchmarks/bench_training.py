@@ -0,0 +1,75 @@
+"""
+Compares MemeModel.train on a fully materialized matrix with MemeModel.train_chunks
+(QuantileDMatrix and external memory), reporting wall time and peak RSS. Each mode runs
+in its own subprocess so peak RSS is measured independently.
+
+Run from the repository root:
+    python -m benchmarks.bench_training --rows 200000 --features 2000 --jobs 4
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import scipy.sparse as sp
+from meme_predictor.meme_model import MemeModel
+
+MODES = ("in_memory", "quantile_chunks", "external_memory")
+
+def make_chunks(rows: int, features: int, chunk_rows: int, seed: int = 0):
+    """
+    Yields reproducible sparse `(X, y)` chunks whose labels depend on a few features.
+    """
+    rng = np.random.default_rng(seed)
+    for start in range(0, rows, chunk_rows):
+        n = min(chunk_rows, rows - start)
+        X = sp.random(n, features, density=0.01, format='csr', dtype=np.float32, random_state=rng)
+        signal = np.asarray(X[:, :10].sum(axis=1)).ravel()
+        y = (signal + rng.normal(0, 0.05, n) > np.median(signal)).astype(int)
+        yield X, y
+
+def run_mode(mode: str, args: argparse.Namespace) -> dict:
+    model = MemeModel(n_jobs=args.jobs)
+    model.model.set_params(n_estimators=args.trees)
+    start = time.perf_counter()
+    if mode == "in_memory":
+        chunks = list(make_chunks(args.rows, args.features, args.chunk_rows))
+        X = sp.vstack([X for X, _ in chunks], format='csr')
+        y = np.concatenate([y for _, y in chunks])
+        del chunks
+        model.train(X, y)
+    else:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            model.train_chunks(make_chunks(args.rows, args.features, args.chunk_rows), n_jobs=args.jobs,
+                               external_memory=(mode == "external_memory"), cache_dir=cache_dir)
+    wall = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {"mode": mode, "rows": args.rows, "wall_seconds": round(wall, 2), "peak_rss_mb": round(peak_mb, 1)}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--features", type=int, default=2000)
+    parser.add_argument("--chunk-rows", type=int, default=20000)
+    parser.add_argument("--trees", type=int, default=50)
+    parser.add_argument("--jobs", type=int, default=None)
+    parser.add_argument("--mode", choices=MODES, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args)))
+        return
+    for mode in MODES:
+        child = [sys.executable, "-m", "benchmarks.bench_training", "--mode", mode, "--rows", str(args.rows),
+                 "--features", str(args.features), "--chunk-rows", str(args.chunk_rows), "--trees", str(args.trees)]
+        if args.jobs:
+            child += ["--jobs", str(args.jobs)]
+        output = subprocess.run(child, check=True, capture_output=True, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{result['mode']:>16}: {result['wall_seconds']:8.2f} s  peak RSS {result['peak_rss_mb']:8.1f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Local HTTP stand-ins for the Twitter recent-search, Reddit listing and Solana JSON-RPC
+endpoints, serving a SyntheticCorpus so benchmarks exercise the real client code paths
+without touching the network.
+"""
+import asyncio
+import hashlib
+from typing import Any, Dict, Optional
+from aiohttp import web
+from benchmarks.synthetic_corpus import SyntheticCorpus
+
+class ServiceStubs:
+    def __init__(self, corpus: SyntheticCorpus, latency_ms: float = 0.0):
+        """
+        `latency_ms` is added to every response to mimic a remote service.
+        """
+        self.corpus = corpus
+        self.latency = latency_ms / 1000.0
+        self.requests: Dict[str, int] = {"twitter": 0, "reddit": 0, "solana": 0}
+        self._runner: Optional[web.AppRunner] = None
+        self.base_url = ""
+
+    async def _delay(self) -> None:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def twitter(self, request: web.Request) -> web.Response:
+        self.requests["twitter"] += 1
+        await self._delay()
+        if "since_id" in request.query:
+            return web.json_response({"meta": {"result_count": 0}})
+        max_results = int(request.query.get("max_results", 100))
+        return web.json_response(self.corpus.twitter_page(max_results, request.query.get("next_token")))
+
+    async def reddit(self, request: web.Request) -> web.Response:
+        self.requests["reddit"] += 1
+        await self._delay()
+        if "before" in request.query:
+            return web.json_response({"data": {"children": [], "after": None}})
+        limit = int(request.query.get("limit", 100))
+        return web.json_response(self.corpus.reddit_page(limit, request.query.get("after")))
+
+    @staticmethod
+    def lamports(address: str) -> int:
+        return int.from_bytes(hashlib.blake2b(address.encode(), digest_size=4).digest(), "little")
+
+    def _rpc(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        method, params = request["method"], request.get("params", [])
+        if method == "getMultipleAccounts":
+            result: Any = {"context": {"slot": 1}, "value": [
+                {"lamports": self.lamports(a), "owner": "11111111111111111111111111111111", "data": ["", "base64"],
+                 "executable": False, "rentEpoch": 0} for a in params[0]
+            ]}
+        elif method == "getBalance":
+            result = {"context": {"slot": 1}, "value": self.lamports(params[0])}
+        else:
+            return {"jsonrpc": "2.0", "id": request["id"], "error": {"code": -32601, "message": "Method not found"}}
+        return {"jsonrpc": "2.0", "id": request["id"], "result": result}
+
+    async def solana(self, request: web.Request) -> web.Response:
+        self.requests["solana"] += 1
+        await self._delay()
+        payload = await request.json()
+        if isinstance(payload, list):
+            return web.json_response([self._rpc(item) for item in payload])
+        return web.json_response(self._rpc(payload))
+
+    @property
+    def twitter_url(self) -> str:
+        return f"{self.base_url}/2/tweets/search/recent"
+
+    @property
+    def reddit_url(self) -> str:
+        return f"{self.base_url}/r/{{subreddit}}/new.json"
+
+    @property
+    def rpc_url(self) -> str:
+        return f"{self.base_url}/solana"
+
+    async def start(self) -> str:
+        """
+        Serves all three endpoints on an ephemeral localhost port and returns the base URL.
+        """
+        app = web.Application()
+        app.router.add_get("/2/tweets/search/recent", self.twitter)
+        app.router.add_get("/r/{subreddit}/new.json", self.reddit)
+        app.router.add_post("/solana", self.solana)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.base_url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+        return self.base_url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,107 @@
+"""
+Reproducible synthetic tweet/Reddit corpora for the benchmarks, stored column-wise so a
+million documents fit comfortably in memory. API payloads are built page by page on demand.
+"""
+import itertools
+import random
+import time
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+TICKERS = ["DOGE", "PEPE", "BONK", "WIF", "SHIB", "FLOKI", "MEW", "POPCAT", "BRETT", "MOG", "TURBO", "SOL"]
+MEME_WORDS = ["moon", "pump", "rug", "ape", "hodl", "wagmi", "ngmi", "gm", "frog", "dog", "cat", "wojak",
+              "chad", "diamond", "hands", "launch", "airdrop", "whale", "degen", "bags", "rekt", "lfg", "based"]
+TEMPLATES = [
+    "${ticker} is going to the {w1} {w2} {tail}",
+    "just aped into ${ticker} {w1} {tail}",
+    "{w1} {w2} season ${ticker} {tail} #memecoin",
+    "why is nobody talking about ${ticker} {w1} {tail}",
+    "${ticker} {w1} or {w2}? {tail}",
+]
+HOT_TICKERS = {"PEPE", "WIF", "POPCAT"}
+
+class SyntheticCorpus:
+    def __init__(self, n_docs: int, seed: int = 0, reddit_share: float = 0.3, duplicate_rate: float = 0.1,
+                 vocabulary_size: int = 20000, start: float = 1_700_000_000.0, span_seconds: float = 86400.0):
+        """
+        `n_docs` posts split between Twitter and Reddit. Texts mix meme templates, tickers
+        and a Zipf-distributed tail vocabulary. `duplicate_rate` of them are retweets or
+        reposts of an earlier text, which exercises the deduplicator. Engagement depends on
+        the ticker and on length, so MemeModel has a real signal to learn.
+        """
+        rng = random.Random(seed)
+        np_rng = np.random.default_rng(seed)
+        tail_words = [f"w{i}" for i in range(vocabulary_size)]
+        cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(vocabulary_size)))
+        self.n_docs = n_docs
+        self.texts: List[str] = []
+        hot = np.zeros(n_docs, dtype=bool)
+        for i in range(n_docs):
+            if i and rng.random() < duplicate_rate:
+                original = self.texts[rng.randrange(len(self.texts))]
+                self.texts.append(f"RT @user{rng.randrange(1000)}: {original}")
+                hot[i] = any(f"${ticker}" in original for ticker in HOT_TICKERS)
+                continue
+            ticker = rng.choice(TICKERS)
+            hot[i] = ticker in HOT_TICKERS
+            tail = " ".join(rng.choices(tail_words, cum_weights=cum_weights, k=rng.randint(3, 25)))
+            self.texts.append(rng.choice(TEMPLATES).format(ticker=ticker, w1=rng.choice(MEME_WORDS),
+                                                           w2=rng.choice(MEME_WORDS), tail=tail))
+        self.is_reddit = np_rng.random(n_docs) < reddit_share
+        self.timestamps = start + np.sort(np_rng.random(n_docs)) * span_seconds
+        lengths = np.fromiter((len(text) for text in self.texts), dtype=np.float64, count=n_docs)
+        base = np_rng.lognormal(mean=2.0, sigma=1.2, size=n_docs) * (1.0 + 2.5 * hot) * (0.5 + lengths / lengths.max())
+        self.likes = base.astype(np.int64)
+        self.retweets = (base * np_rng.uniform(0.05, 0.4, n_docs)).astype(np.int64)
+        self.replies = (base * np_rng.uniform(0.01, 0.2, n_docs)).astype(np.int64)
+        self.tweet_rows = np.flatnonzero(~self.is_reddit)[::-1]  # newest first, like the search API
+        self.post_rows = np.flatnonzero(self.is_reddit)[::-1]
+
+    def labels(self) -> np.ndarray:
+        """
+        1 for posts whose likes are above the corpus median.
+        """
+        return (self.likes > np.median(self.likes)).astype(int)
+
+    def documents_by_source(self) -> Dict[str, List[str]]:
+        """
+        Texts per source in the order the APIs return them (newest first).
+        """
+        return {"twitter": [self.texts[i] for i in self.tweet_rows], "reddit": [self.texts[i] for i in self.post_rows]}
+
+    def tweet(self, row: int) -> Dict[str, Any]:
+        return {
+            "id": str(10 ** 15 + row),
+            "text": self.texts[row],
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(self.timestamps[row])),
+            "public_metrics": {"like_count": int(self.likes[row]), "retweet_count": int(self.retweets[row]),
+                               "reply_count": int(self.replies[row]), "quote_count": 0},
+        }
+
+    def post(self, row: int) -> Dict[str, Any]:
+        return {"name": f"t3_{row:x}", "title": self.texts[row], "created_utc": float(self.timestamps[row]),
+                "score": int(self.likes[row]), "num_comments": int(self.replies[row])}
+
+    def twitter_page(self, max_results: int, next_token: Optional[str] = None) -> Dict[str, Any]:
+        """
+        One page of the recent-search response; `next_token` is the offset of the page.
+        """
+        offset = int(next_token or 0)
+        rows = self.tweet_rows[offset:offset + max_results]
+        meta: Dict[str, Any] = {"result_count": len(rows)}
+        if len(rows):
+            meta["newest_id"] = str(10 ** 15 + rows[0])
+        if offset + max_results < len(self.tweet_rows):
+            meta["next_token"] = str(offset + max_results)
+        return {"data": [self.tweet(row) for row in rows], "meta": meta}
+
+    def reddit_page(self, limit: int, after: Optional[str] = None) -> Dict[str, Any]:
+        """
+        One page of a subreddit's `new.json` listing, paginated by the `after` fullname.
+        """
+        offset = 0
+        if after:
+            offset = int(np.searchsorted(-self.post_rows, -int(after[3:], 16))) + 1
+        rows = self.post_rows[offset:offset + limit]
+        next_after = f"t3_{rows[-1]:x}" if len(rows) and offset + limit < len(self.post_rows) else None
+        return {"data": {"children": [{"kind": "t3", "data": self.post(row)} for row in rows], "after": next_after}}
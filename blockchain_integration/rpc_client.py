@@ -0,0 +1,185 @@
+import asyncio
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import aiohttp
+from data_collection.fetch_scheduler import FetchScheduler
+from monitoring.metrics import REGISTRY, REQUEST_SECONDS, REQUESTS, record_cache
+
+RPC_CALLS = REGISTRY.counter("rpc_calls_total", "Solana JSON-RPC requests by method and outcome")
+
+logger = logging.getLogger(__name__)
+
+class RPCError(Exception):
+    def __init__(self, code: int, message: str, data: Any = None):
+        """
+        Error object returned by the node for one JSON-RPC request.
+        """
+        super().__init__(f"RPC error {code}: {message}")
+        self.code = code
+        self.message = message
+        self.data = data
+
+class SolanaRPC:
+    def __init__(self, rpc_url: str = "https://api.mainnet-beta.solana.com", max_batch_size: int = 100,
+                 max_accounts_per_call: int = 100, max_concurrency: int = 8, cache_ttl: float = 2.0,
+                 cache_size: int = 100_000, request_timeout: float = 30.0,
+                 scheduler: Optional[FetchScheduler] = None, clock: Callable[[], float] = time.monotonic):
+        """
+        JSON-RPC client for a Solana node over one pooled keep-alive aiohttp session.
+        Calls are sent as JSON-RPC batches of up to `max_batch_size` requests, account lookups
+        use `getMultipleAccounts` with up to `max_accounts_per_call` keys (the node limits),
+        at most `max_concurrency` HTTP requests are in flight, and 429/5xx responses are
+        retried by `scheduler`. Account reads are cached for `cache_ttl` seconds per commitment.
+        """
+        self.rpc_url = rpc_url
+        self.max_batch_size = max_batch_size
+        self.max_accounts_per_call = max_accounts_per_call
+        self.max_concurrency = max_concurrency
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.request_timeout = request_timeout
+        self.scheduler = scheduler or FetchScheduler()
+        self.clock = clock
+        self._ids = itertools.count(1)
+        self._cache: "OrderedDict[Tuple[str, str, str], Tuple[float, Any]]" = OrderedDict()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Returns the shared client session, creating the pooled connector on first use.
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=60.0, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=aiohttp.ClientTimeout(total=self.request_timeout)
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            logger.debug(f"Created pooled aiohttp session for {self.rpc_url}")
+        return self._session
+
+    async def close(self) -> None:
+        """
+        Closes the shared client session and its pooled connections.
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info("Solana RPC session closed")
+        self._session = None
+
+    async def _post(self, payload: Any) -> Any:
+        session = await self._get_session()
+        async with self._semaphore:
+            try:
+                with REQUEST_SECONDS.time(service="solana_rpc"):
+                    response = await self.scheduler.fetch(session, self.rpc_url, method="POST", json=payload)
+            except Exception:
+                REQUESTS.inc(service="solana_rpc", outcome="error")
+                raise
+        REQUESTS.inc(service="solana_rpc", outcome="ok")
+        return response
+
+    @staticmethod
+    def _count(method: str, result: Any) -> Any:
+        RPC_CALLS.inc(method=method, outcome="error" if isinstance(result, RPCError) else "ok")
+        return result
+
+    @staticmethod
+    def _unwrap(response: Dict[str, Any]) -> Any:
+        if "error" in response:
+            error = response["error"]
+            return RPCError(error.get("code", 0), error.get("message", ""), error.get("data"))
+        return response.get("result")
+
+    async def call(self, method: str, params: Optional[List[Any]] = None) -> Any:
+        """
+        Sends a single request and returns its result; raises RPCError if the node returns an error.
+        """
+        response = await self._post({"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params or []})
+        result = self._count(method, self._unwrap(response))
+        if isinstance(result, RPCError):
+            raise result
+        return result
+
+    async def _send_batch(self, requests: Sequence[Tuple[str, List[Any]]]) -> List[Any]:
+        ids = [next(self._ids) for _ in requests]
+        payload = [{"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+                   for request_id, (method, params) in zip(ids, requests)]
+        responses = await self._post(payload)
+        if isinstance(responses, dict):
+            # Nodes answer a rejected batch with a single error object.
+            error = self._unwrap(responses)
+            error = error if isinstance(error, RPCError) else RPCError(0, "Malformed batch response")
+            return [self._count(method, error) for method, _ in requests]
+        by_id = {response.get("id"): response for response in responses}
+        return [self._count(method, self._unwrap(by_id[request_id]) if request_id in by_id
+                            else RPCError(0, "Missing response"))
+                for request_id, (method, _) in zip(ids, requests)]
+
+    async def batch(self, requests: Sequence[Tuple[str, List[Any]]]) -> List[Any]:
+        """
+        Sends `(method, params)` requests as JSON-RPC batches and returns their results in
+        order. A failed request yields an RPCError in its slot instead of failing the batch.
+        """
+        chunks = [requests[i:i + self.max_batch_size] for i in range(0, len(requests), self.max_batch_size)]
+        results = await asyncio.gather(*(self._send_batch(chunk) for chunk in chunks))
+        return [result for chunk in results for result in chunk]
+
+    def _cached(self, key: Tuple[str, str, str], now: float) -> Tuple[bool, Any]:
+        entry = self._cache.get(key)
+        if entry is None or entry[0] <= now:
+            return False, None
+        self._cache.move_to_end(key)
+        return True, entry[1]
+
+    def _remember(self, key: Tuple[str, str, str], value: Any, now: float) -> None:
+        self._cache[key] = (now + self.cache_ttl, value)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def _accounts(self, kind: str, addresses: Sequence[str], commitment: str,
+                        config: Dict[str, Any]) -> Dict[str, Any]:
+        now = self.clock()
+        found: Dict[str, Any] = {}
+        missing = []
+        for address in dict.fromkeys(addresses):
+            hit, value = self._cached((kind, commitment, address), now)
+            if hit:
+                found[address] = value
+            else:
+                missing.append(address)
+        record_cache("solana_accounts", len(found), len(missing))
+        chunks = [missing[i:i + self.max_accounts_per_call] for i in range(0, len(missing), self.max_accounts_per_call)]
+        params = {"commitment": commitment, **config}
+        results = await self.batch([("getMultipleAccounts", [chunk, params]) for chunk in chunks])
+        now = self.clock()
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, RPCError):
+                logger.error(f"getMultipleAccounts failed for {len(chunk)} accounts: {result}")
+                continue
+            for address, account in zip(chunk, result["value"]):
+                found[address] = account
+                self._remember((kind, commitment, address), account, now)
+        return found
+
+    async def get_multiple_accounts(self, addresses: Sequence[str], commitment: str = "confirmed",
+                                    encoding: str = "base64") -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Account info for many addresses; None for accounts that do not exist. Addresses whose
+        lookup failed are left out of the result.
+        """
+        return await self._accounts(f"account:{encoding}", addresses, commitment, {"encoding": encoding})
+
+    async def get_balances(self, addresses: Sequence[str], commitment: str = "confirmed") -> Dict[str, int]:
+        """
+        Lamport balances for many addresses, read through `getMultipleAccounts` with an empty
+        data slice so no account data is transferred. Accounts that do not exist have balance 0.
+        """
+        accounts = await self._accounts(
+            "balance", addresses, commitment, {"encoding": "base64", "dataSlice": {"offset": 0, "length": 0}}
+        )
+        return {address: account["lamports"] if account else 0 for address, account in accounts.items()}
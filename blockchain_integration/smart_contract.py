@@ -1,43 +1,73 @@
 import logging
 from solana.publickey import PublicKey
 from solana.transaction import TransactionInstruction, Transaction
-from solana.rpc.async_api import AsyncClient
 from solana.rpc.types import TxOpts
-from typing import Any, Optional, Dict
+from typing import Any, Dict, List, Optional
+from blockchain_integration.solana_connector import SolanaConnector
 
 logger = logging.getLogger(__name__)
 
 class SmartContract:
-    def __init__(self, program_id: str, rpc_url: str = "https://api.mainnet-beta.solana.com"):
+    def __init__(self, program_id: str, rpc_url: str = "https://api.mainnet-beta.solana.com",
+                 connector: Optional[SolanaConnector] = None):
         """
         Initializes the SmartContract class to interact with Solana blockchain smart contracts.
+        Pass the application's `connector` to reuse its RPC connection pool instead of opening another.
         """
         self.program_id = PublicKey(program_id)
-        self.client = AsyncClient(rpc_url)
+        self.connector = connector or SolanaConnector(rpc_url)
+        self._owns_connector = connector is None
         logger.info(f"SmartContract initialized with program ID {program_id}")
 
+    def build_transaction(self, params: Dict[str, Any], signer: Any) -> Transaction:
+        """
+        Builds the (unsigned) transaction invoking the contract with the given parameters.
+        """
+        # Example of creating a transaction instruction
+        instruction = TransactionInstruction(
+            keys=[],
+            program_id=self.program_id,
+            data=b'',  # Add data for the instruction if needed
+        )
+        return Transaction(fee_payer=signer.public_key).add(instruction)
+
     async def invoke_contract(self, params: Dict[str, Any], signer: Any) -> Optional[str]:
         """
         Invokes a smart contract function with the provided parameters.
         """
         try:
-            # Example of creating a transaction instruction
-            instruction = TransactionInstruction(
-                keys=[],
-                program_id=self.program_id,
-                data=b'',  # Add data for the instruction if needed
-            )
-            transaction = Transaction().add(instruction)
-            response = await self.client.send_transaction(transaction, signer, opts=TxOpts(skip_confirmation=False))
-            logger.info(f"Smart contract invoked: {response['result']}")
-            return response['result']
+            transaction = self.build_transaction(params, signer)
+            signature = await self.connector.send_transaction(transaction, signer, opts=TxOpts(skip_confirmation=False))
+            if signature is None:
+                return None
+            logger.info(f"Smart contract invoked: {signature}")
+            return signature
         except Exception as e:
             logger.error(f"Error invoking smart contract: {e}")
             return None
 
+    async def invoke_many(self, params_list: List[Dict[str, Any]], signer: Any) -> List[Optional[str]]:
+        """
+        Invokes the contract once per parameter set, sending all transactions concurrently
+        instead of confirming each before sending the next. Returns the signature of each
+        confirmed invocation, or None for those that failed.
+        """
+        try:
+            transactions = [self.build_transaction(params, signer) for params in params_list]
+            records = await self.connector.send_transactions(transactions, signer)
+            if len(records) != len(transactions):
+                raise RuntimeError(f"Got {len(records)} submission records for {len(transactions)} transactions")
+            signatures = [record["signature"] if record["status"] == "confirmed" else None for record in records]
+            logger.info(f"Smart contract invoked {sum(s is not None for s in signatures)} of {len(params_list)} times")
+            return signatures
+        except Exception as e:
+            logger.error(f"Error invoking smart contract: {e}")
+            return [None] * len(params_list)
+
     async def close(self) -> None:
         """
-        Closes the connection to the Solana RPC client.
+        Closes the connection to the Solana RPC client, unless it is shared with the caller.
         """
-        await self.client.close()
+        if self._owns_connector:
+            await self.connector.close()
         logger.info("SmartContract RPC connection closed")
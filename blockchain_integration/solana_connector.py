@@ -1,49 +1,126 @@
+import asyncio
+import base64
 import logging
-from solana.rpc.async_api import AsyncClient
+import time
 from solana.transaction import Transaction
 from solana.publickey import PublicKey
 from solana.rpc.types import TxOpts
-from typing import Optional, Any
+from typing import Dict, List, Optional, Any, Sequence
+from blockchain_integration.rpc_client import SolanaRPC
+from blockchain_integration.transaction_submitter import TransactionSubmitter
+from monitoring.metrics import REGISTRY
+
+TRANSACTIONS = REGISTRY.counter("solana_transactions_total", "Transactions sent by final status")
 
 logger = logging.getLogger(__name__)
 
 class SolanaConnector:
-    def __init__(self, rpc_url: str = "https://api.mainnet-beta.solana.com"):
+    def __init__(self, rpc_url: str = "https://api.mainnet-beta.solana.com", rpc: Optional[SolanaRPC] = None,
+                 commitment: str = "confirmed"):
         """
         Initializes Solana connection with the specified RPC URL.
+        All calls go through one `SolanaRPC` client (and its connection pool), which may be
+        passed in to share it with other components, e.g. `SmartContract`.
         """
-        self.client = AsyncClient(rpc_url)
-        logger.info(f"Connected to Solana RPC at {rpc_url}")
+        self.rpc = rpc or SolanaRPC(rpc_url)
+        self._owns_rpc = rpc is None
+        self.commitment = commitment
+        self.submitter = TransactionSubmitter(self.rpc, commitment=commitment)
+        logger.info(f"Connected to Solana RPC at {self.rpc.rpc_url}")
 
     async def get_balance(self, wallet_address: str) -> Optional[int]:
         """
         Fetches the balance of the specified wallet address in lamports.
         """
         try:
-            public_key = PublicKey(wallet_address)
-            response = await self.client.get_balance(public_key)
-            balance = response['result']['value']
+            address = str(PublicKey(wallet_address))
+            balance = (await self.rpc.get_balances([address], self.commitment))[address]
             logger.info(f"Balance for {wallet_address}: {balance} lamports")
             return balance
         except Exception as e:
             logger.error(f"Error fetching balance for {wallet_address}: {e}")
             return None
 
+    async def get_balances(self, wallet_addresses: Sequence[str]) -> Dict[str, int]:
+        """
+        Fetches the balances of many wallets in lamports with batched `getMultipleAccounts` calls.
+        Wallets whose lookup failed are left out.
+        """
+        try:
+            balances = await self.rpc.get_balances(wallet_addresses, self.commitment)
+            logger.info(f"Fetched balances for {len(balances)} of {len(wallet_addresses)} wallets")
+            return balances
+        except Exception as e:
+            logger.error(f"Error fetching balances for {len(wallet_addresses)} wallets: {e}")
+            return {}
+
+    async def confirm_transaction(self, signature: str, commitment: Optional[str] = None, timeout: float = 60.0,
+                                  poll_interval: float = 0.5) -> bool:
+        """
+        Polls `getSignatureStatuses` until the transaction reaches `commitment` or fails.
+        Returns whether it was confirmed without error within `timeout` seconds.
+        """
+        levels = ["processed", "confirmed", "finalized"]
+        target = levels.index(commitment or self.commitment)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            status = (await self.rpc.call("getSignatureStatuses", [[signature]]))["value"][0]
+            if status is not None:
+                if status.get("err") is not None:
+                    logger.error(f"Transaction {signature} failed: {status['err']}")
+                    return False
+                if levels.index(status.get("confirmationStatus") or "processed") >= target:
+                    return True
+            await asyncio.sleep(poll_interval)
+        logger.error(f"Timed out confirming transaction {signature}")
+        return False
+
     async def send_transaction(self, transaction: Transaction, signer: Any, opts: TxOpts = TxOpts()) -> Optional[str]:
         """
         Sends a transaction to the Solana network.
         """
         try:
-            response = await self.client.send_transaction(transaction, signer, opts=opts)
-            logger.info(f"Transaction sent: {response['result']}")
-            return response['result']
+            transaction.recent_blockhash, _ = await self.submitter.blockhash_cache.get()
+            transaction.sign(signer)
+            config = {"encoding": "base64", "skipPreflight": opts.skip_preflight,
+                      "preflightCommitment": opts.preflight_commitment}
+            if opts.max_retries is not None:
+                config["maxRetries"] = opts.max_retries
+            signature = await self.rpc.call(
+                "sendTransaction", [base64.b64encode(transaction.serialize()).decode(), config]
+            )
+            logger.info(f"Transaction sent: {signature}")
+            if not opts.skip_confirmation and not await self.confirm_transaction(signature):
+                TRANSACTIONS.inc(status="failed")
+                return None
+            TRANSACTIONS.inc(status="sent" if opts.skip_confirmation else "confirmed")
+            return signature
         except Exception as e:
+            TRANSACTIONS.inc(status="failed")
             logger.error(f"Error sending transaction: {e}")
             return None
 
+    async def send_transactions(self, transactions: Sequence[Transaction], signer: Any) -> List[Dict[str, Any]]:
+        """
+        Sends many transactions concurrently and tracks their confirmations in bulk,
+        resending any whose blockhash expires. See `TransactionSubmitter.submit_many`.
+        Always returns one record per transaction; if submission itself fails, every record
+        has status "failed" and the error in "err".
+        """
+        try:
+            records = await self.submitter.submit_many(transactions, signer)
+        except Exception as e:
+            logger.error(f"Error sending {len(transactions)} transactions: {e}")
+            records = [{"signature": None, "status": "failed", "err": str(e), "attempts": 0} for _ in transactions]
+        for record in records:
+            TRANSACTIONS.inc(status=record["status"])
+        return records
+
     async def close(self) -> None:
         """
-        Closes the connection to the Solana RPC client.
+        Closes the connection to the Solana RPC client, unless it was passed in by the caller.
         """
-        await self.client.close()
+        await self.submitter.close()
+        if self._owns_rpc:
+            await self.rpc.close()
         logger.info("Solana RPC connection closed")
@@ -0,0 +1,213 @@
+import asyncio
+import itertools
+import json
+import logging
+import random
+from typing import Any, Dict, List, Optional
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+_CLOSED = object()
+
+def ws_url_for(rpc_url: str) -> str:
+    """
+    Websocket endpoint of an RPC node, following the http -> ws / https -> wss convention.
+    """
+    if rpc_url.startswith("https://"):
+        return "wss://" + rpc_url[len("https://"):]
+    if rpc_url.startswith("http://"):
+        return "ws://" + rpc_url[len("http://"):]
+    return rpc_url
+
+class Subscription:
+    def __init__(self, method: str, params: List[Any], queue_size: int):
+        """
+        One server-side subscription, consumed with `async for`. Notifications are buffered in
+        a bounded queue; when the consumer falls behind the oldest ones are dropped (and counted
+        in `dropped`) so one slow consumer cannot stall the shared connection.
+        """
+        self.method = method
+        self.params = params
+        self.queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self.server_id: Optional[int] = None
+        self.dropped = 0
+        self.received = 0
+
+    def _put(self, item: Any) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(item)
+
+    def deliver(self, result: Any) -> None:
+        self.received += 1
+        self._put(result)
+
+    def finish(self) -> None:
+        self._put(_CLOSED)
+
+    def __aiter__(self) -> "Subscription":
+        return self
+
+    async def __anext__(self) -> Any:
+        item = await self.queue.get()
+        if item is _CLOSED:
+            raise StopAsyncIteration
+        return item
+
+class SolanaSubscriptions:
+    def __init__(self, ws_url: str, queue_size: int = 1000, base_backoff: float = 0.5, max_backoff: float = 30.0,
+                 heartbeat: float = 30.0):
+        """
+        Push notifications from a Solana node over a single websocket, exposed as async iterators.
+        Every subscription is multiplexed over one connection; if it drops, the client
+        reconnects with full-jitter backoff and re-subscribes everything still open.
+        Malformed messages are logged, counted in `malformed` and skipped.
+        """
+        self.ws_url = ws_url
+        self.queue_size = queue_size
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.heartbeat = heartbeat
+        self.reconnects = 0
+        self.malformed = 0
+        self._ids = itertools.count(1)
+        self._subscriptions: List[Subscription] = []
+        self._by_server_id: Dict[int, Subscription] = {}
+        self._pending: Dict[int, Subscription] = {}
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._runner: Optional[asyncio.Task] = None
+        self._closed = False
+
+    async def _send_subscribe(self, subscription: Subscription) -> None:
+        request_id = next(self._ids)
+        self._pending[request_id] = subscription
+        await self._ws.send_json({"jsonrpc": "2.0", "id": request_id, "method": subscription.method,
+                                  "params": subscription.params})
+
+    def _handle(self, message: Dict[str, Any]) -> None:
+        if "id" in message:
+            subscription = self._pending.pop(message["id"], None)
+            if subscription is None:
+                return
+            if "error" in message:
+                logger.error(f"{subscription.method} rejected: {message['error']}")
+                self._subscriptions.remove(subscription)
+                subscription.finish()
+                return
+            subscription.server_id = message["result"]
+            self._by_server_id[subscription.server_id] = subscription
+        elif message.get("method", "").endswith("Notification"):
+            subscription = self._by_server_id.get(message["params"]["subscription"])
+            if subscription is not None:
+                subscription.deliver(message["params"]["result"])
+
+    async def _run(self) -> None:
+        attempt = 0
+        while not self._closed:
+            try:
+                async with self._session.ws_connect(self.ws_url, heartbeat=self.heartbeat) as ws:
+                    self._ws = ws
+                    self._pending.clear()
+                    self._by_server_id.clear()
+                    for subscription in list(self._subscriptions):
+                        await self._send_subscribe(subscription)
+                    if attempt:
+                        logger.info(f"Reconnected to {self.ws_url}, resubscribed {len(self._subscriptions)} streams")
+                    attempt = 0
+                    async for message in ws:
+                        if message.type == aiohttp.WSMsgType.TEXT:
+                            # One malformed frame must not end the stream for every subscriber
+                            try:
+                                self._handle(json.loads(message.data))
+                            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                                self.malformed += 1
+                                logger.warning(f"Ignoring malformed websocket message {message.data[:200]!r}: {e!r}")
+                        elif message.type == aiohttp.WSMsgType.ERROR:
+                            break
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+                logger.warning(f"Websocket connection to {self.ws_url} failed: {e!r}")
+            except Exception as e:
+                logger.exception(f"Unexpected error on websocket {self.ws_url}, reconnecting: {e!r}")
+            finally:
+                self._ws = None
+            if self._closed:
+                break
+            delay = random.uniform(0, min(self.max_backoff, self.base_backoff * (2 ** attempt)))
+            attempt += 1
+            self.reconnects += 1
+            await asyncio.sleep(delay)
+
+    async def subscribe(self, method: str, params: List[Any]) -> Subscription:
+        """
+        Opens a subscription (e.g. "accountSubscribe") and returns it as an async iterator of notification results.
+        """
+        if self._runner is None:
+            self._session = aiohttp.ClientSession()
+            self._runner = asyncio.ensure_future(self._run())
+        subscription = Subscription(method, params, self.queue_size)
+        self._subscriptions.append(subscription)
+        if self._ws is not None and not self._ws.closed:
+            await self._send_subscribe(subscription)
+        return subscription
+
+    async def account_subscribe(self, address: str, commitment: str = "confirmed",
+                                encoding: str = "base64") -> Subscription:
+        """
+        Changes to one account, e.g. a wallet's lamports or a token account's data.
+        """
+        return await self.subscribe("accountSubscribe", [address, {"commitment": commitment, "encoding": encoding}])
+
+    async def logs_subscribe(self, mentions: str, commitment: str = "confirmed") -> Subscription:
+        """
+        Logs of transactions mentioning an address, e.g. `settings.smart_contract_program_id`.
+        """
+        return await self.subscribe("logsSubscribe", [{"mentions": [mentions]}, {"commitment": commitment}])
+
+    async def program_subscribe(self, program_id: str, commitment: str = "confirmed", encoding: str = "base64",
+                                filters: Optional[List[Dict[str, Any]]] = None) -> Subscription:
+        """
+        Changes to any account owned by a program, optionally narrowed by `filters`.
+        """
+        config: Dict[str, Any] = {"commitment": commitment, "encoding": encoding}
+        if filters:
+            config["filters"] = filters
+        return await self.subscribe("programSubscribe", [program_id, config])
+
+    async def unsubscribe(self, subscription: Subscription) -> None:
+        """
+        Cancels a subscription and ends its iterator.
+        """
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+        if subscription.server_id is not None:
+            self._by_server_id.pop(subscription.server_id, None)
+            if self._ws is not None and not self._ws.closed:
+                await self._ws.send_json({"jsonrpc": "2.0", "id": next(self._ids),
+                                          "method": subscription.method.replace("Subscribe", "Unsubscribe"),
+                                          "params": [subscription.server_id]})
+        subscription.finish()
+
+    async def close(self) -> None:
+        """
+        Ends every subscription and closes the connection.
+        """
+        self._closed = True
+        for subscription in self._subscriptions:
+            subscription.finish()
+        self._subscriptions = []
+        if self._ws is not None:
+            await self._ws.close()
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        logger.info("Solana subscriptions closed")
@@ -0,0 +1,170 @@
+import asyncio
+import base64
+import logging
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from solana.transaction import Transaction
+from blockchain_integration.rpc_client import RPCError, SolanaRPC
+
+logger = logging.getLogger(__name__)
+
+COMMITMENT_LEVELS = ["processed", "confirmed", "finalized"]
+
+class BlockhashCache:
+    def __init__(self, rpc: SolanaRPC, refresh_interval: float = 20.0, commitment: str = "finalized"):
+        """
+        Keeps a recent blockhash and its last valid block height, refreshed in the background
+        every `refresh_interval` seconds so signing never waits on `getLatestBlockhash`.
+        A blockhash stays usable for roughly 150 blocks (about a minute).
+        """
+        self.rpc = rpc
+        self.refresh_interval = refresh_interval
+        self.commitment = commitment
+        self._current: Optional[Tuple[str, int]] = None
+        self._refreshing: Optional[asyncio.Task] = None
+        self._background: Optional[asyncio.Task] = None
+
+    async def _fetch(self) -> Tuple[str, int]:
+        latest = await self.rpc.call("getLatestBlockhash", [{"commitment": self.commitment}])
+        self._current = (latest["value"]["blockhash"], latest["value"]["lastValidBlockHeight"])
+        return self._current
+
+    async def refresh(self) -> Tuple[str, int]:
+        """
+        Fetches a new blockhash; concurrent callers share one request.
+        """
+        if self._refreshing is None or self._refreshing.done():
+            self._refreshing = asyncio.ensure_future(self._fetch())
+        return await asyncio.shield(self._refreshing)
+
+    async def get(self) -> Tuple[str, int]:
+        """
+        Returns `(blockhash, last_valid_block_height)`, starting the background refresh on first use.
+        """
+        if self._background is None:
+            self._background = asyncio.ensure_future(self._refresh_forever())
+        if self._current is None:
+            return await self.refresh()
+        return self._current
+
+    async def _refresh_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning(f"Background blockhash refresh failed: {e}")
+
+    async def close(self) -> None:
+        for task in (self._background, self._refreshing):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+        self._background = self._refreshing = None
+
+class TransactionSubmitter:
+    def __init__(self, rpc: SolanaRPC, blockhash_cache: Optional[BlockhashCache] = None,
+                 commitment: str = "confirmed", poll_interval: float = 0.5, max_attempts: int = 3,
+                 timeout: float = 120.0, skip_preflight: bool = False):
+        """
+        Signs and sends many transactions at once and tracks them to `commitment` in bulk.
+        Sends go out as JSON-RPC batches, confirmations are polled with one
+        `getSignatureStatuses` call per 256 pending signatures, and a transaction whose
+        blockhash expired before it landed is re-signed with a fresh blockhash and resent,
+        up to `max_attempts` sends in total.
+        """
+        self.rpc = rpc
+        self.blockhash_cache = blockhash_cache or BlockhashCache(rpc)
+        self.commitment = commitment
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.skip_preflight = skip_preflight
+
+    async def _send(self, indices: List[int], transactions: Sequence[Transaction], signers: Sequence[Sequence[Any]],
+                    records: List[Dict[str, Any]]) -> None:
+        """
+        Signs the given transactions with the cached blockhash and sends them in batches.
+        """
+        blockhash, last_valid_block_height = await self.blockhash_cache.get()
+        config = {"encoding": "base64", "skipPreflight": self.skip_preflight, "preflightCommitment": self.commitment}
+        requests = []
+        for index in indices:
+            transaction = transactions[index]
+            transaction.recent_blockhash = blockhash
+            transaction.sign(*signers[index])
+            requests.append(("sendTransaction", [base64.b64encode(transaction.serialize()).decode(), config]))
+            records[index]["attempts"] += 1
+            records[index]["last_valid_block_height"] = last_valid_block_height
+        for index, result in zip(indices, await self.rpc.batch(requests)):
+            if isinstance(result, RPCError):
+                records[index].update(status="failed", err=result.message)
+            else:
+                records[index].update(signature=result, status="pending")
+
+    async def _poll(self, records: List[Dict[str, Any]]) -> List[int]:
+        """
+        Updates pending records from one round of status polling and returns the indices whose blockhash expired.
+        """
+        pending = [i for i, record in enumerate(records) if record["status"] == "pending"]
+        chunks = [pending[i:i + 256] for i in range(0, len(pending), 256)]
+        requests = [("getSignatureStatuses", [[records[i]["signature"] for i in chunk]]) for chunk in chunks]
+        results = await self.rpc.batch(requests + [("getBlockHeight", [{"commitment": self.commitment}])])
+        block_height = results[-1]
+        target = COMMITMENT_LEVELS.index(self.commitment)
+        expired = []
+        for chunk, result in zip(chunks, results[:-1]):
+            if isinstance(result, RPCError):
+                logger.warning(f"Status poll failed for {len(chunk)} signatures: {result}")
+                continue
+            for index, status in zip(chunk, result["value"]):
+                record = records[index]
+                if status is None:
+                    if not isinstance(block_height, RPCError) and block_height > record["last_valid_block_height"]:
+                        expired.append(index)
+                elif status.get("err") is not None:
+                    record.update(status="failed", err=status["err"])
+                elif COMMITMENT_LEVELS.index(status.get("confirmationStatus") or "processed") >= target:
+                    record["status"] = "confirmed"
+        return expired
+
+    async def submit_many(self, transactions: Sequence[Transaction], signers: Sequence[Any]) -> List[Dict[str, Any]]:
+        """
+        Submits the transactions and waits until each one is confirmed, failed or given up on.
+        `signers` is one keypair for all transactions or a sequence of per-transaction signer lists.
+        Returns one record per transaction, in order, with its `signature`, `status`
+        ("confirmed", "failed", "expired" or "timeout"), `err` and number of `attempts`.
+        """
+        if not isinstance(signers, (list, tuple)):
+            signers = [[signers]] * len(transactions)
+        records = [{"signature": None, "status": "new", "err": None, "attempts": 0, "last_valid_block_height": 0}
+                   for _ in transactions]
+        deadline = time.monotonic() + self.timeout
+        await self._send(list(range(len(transactions))), transactions, signers, records)
+        while any(record["status"] == "pending" for record in records):
+            if time.monotonic() > deadline:
+                for record in records:
+                    if record["status"] == "pending":
+                        record["status"] = "timeout"
+                break
+            await asyncio.sleep(self.poll_interval)
+            expired = await self._poll(records)
+            retry = [i for i in expired if records[i]["attempts"] < self.max_attempts]
+            for index in expired:
+                if index not in retry:
+                    records[index]["status"] = "expired"
+            if retry:
+                logger.info(f"Resending {len(retry)} transactions with an expired blockhash")
+                await self.blockhash_cache.refresh()
+                await self._send(retry, transactions, signers, records)
+        for record in records:
+            record.pop("last_valid_block_height")
+        confirmed = sum(record["status"] == "confirmed" for record in records)
+        logger.info(f"Submitted {len(records)} transactions, {confirmed} confirmed")
+        return records
+
+    async def close(self) -> None:
+        await self.blockhash_cache.close()
@@ -1,15 +1,17 @@
 import os
+from typing import Optional, Tuple
 from pydantic import BaseSettings, Field
 
 class Settings(BaseSettings):
-    # API Keys
-    twitter_bearer_token: str = Field(..., env="TWITTER_BEARER_TOKEN")
-    reddit_client_id: str = Field(..., env="REDDIT_CLIENT_ID")
-    reddit_client_secret: str = Field(..., env="REDDIT_CLIENT_SECRET")
+    # API Keys (validated by the components that use them, see `require`)
+    twitter_bearer_token: Optional[str] = Field(None, env="TWITTER_BEARER_TOKEN")
+    reddit_client_id: Optional[str] = Field(None, env="REDDIT_CLIENT_ID")
+    reddit_client_secret: Optional[str] = Field(None, env="REDDIT_CLIENT_SECRET")
 
     # Solana Configuration
     solana_rpc_url: str = Field("https://api.mainnet-beta.solana.com", env="SOLANA_RPC_URL")
-    smart_contract_program_id: str = Field(..., env="SMART_CONTRACT_PROGRAM_ID")
+    smart_contract_program_id: Optional[str] = Field(None, env="SMART_CONTRACT_PROGRAM_ID")
+    solana_ws_url: Optional[str] = Field(None, env="SOLANA_WS_URL")  # derived from solana_rpc_url if unset
 
     # Logging
     log_level: str = Field("INFO", env="LOG_LEVEL")
@@ -18,4 +20,16 @@ class Settings(BaseSettings):
         env_file = ".env"
         env_file_encoding = 'utf-8'
 
+    def require(self, component: str, *names: str) -> Tuple[str, ...]:
+        """
+        Values of the named settings, raising ValueError naming every missing environment
+        variable. Components call this when they are built, so a process only needs the
+        secrets of the components it actually uses.
+        """
+        missing = [self.__fields__[name].field_info.extra.get("env", name.upper())
+                   for name in names if not getattr(self, name)]
+        if missing:
+            raise ValueError(f"{component} requires the {', '.join(missing)} setting(s)")
+        return tuple(getattr(self, name) for name in names)
+
 settings = Settings()
@@ -1,37 +1,121 @@
 import logging
 import aiohttp
 import asyncio
-from typing import Any, Dict, List
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+from data_collection.fetch_scheduler import FetchScheduler
+from monitoring.metrics import DOCUMENTS, REQUEST_SECONDS, REQUESTS
 
 logger = logging.getLogger(__name__)
 
+TWITTER_SEARCH_URL = "https://api.twitter.com/2/tweets/search/recent"
+REDDIT_NEW_URL = "https://www.reddit.com/r/{subreddit}/new.json"
+
+def tweet_record(tweet: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Flattens a v2 tweet (with `created_at` and `public_metrics`) into a DocumentStore record.
+    """
+    metrics = tweet.get('public_metrics', {})
+    created_at = tweet.get('created_at')
+    return {
+        "id": tweet['id'],
+        "source": "twitter",
+        "created_at": datetime.fromisoformat(created_at).timestamp() if created_at else time.time(),
+        "text": tweet['text'],
+        "like_count": metrics.get('like_count', 0),
+        "retweet_count": metrics.get('retweet_count', 0),
+        "reply_count": metrics.get('reply_count', 0),
+        "quote_count": metrics.get('quote_count', 0),
+    }
+
+def reddit_record(post: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Flattens a Reddit listing post into a DocumentStore record; score counts as likes, comments as replies.
+    """
+    return {
+        "id": post.get('name') or post.get('id'),
+        "source": "reddit",
+        "created_at": float(post.get('created_utc') or time.time()),
+        "text": post['title'],
+        "like_count": post.get('score', 0),
+        "retweet_count": 0,
+        "reply_count": post.get('num_comments', 0),
+        "quote_count": 0,
+    }
+
 class APIIntegrations:
-    def __init__(self, twitter_bearer_token: str, reddit_client_id: str, reddit_client_secret: str):
+    def __init__(self, twitter_bearer_token: str, reddit_client_id: str, reddit_client_secret: str,
+                 connection_limit: int = 100, connection_limit_per_host: int = 10,
+                 keepalive_timeout: float = 60.0, request_timeout: float = 30.0,
+                 scheduler: Optional[FetchScheduler] = None, twitter_url: Optional[str] = None,
+                 reddit_url: Optional[str] = None):
         """
         Initializes APIIntegrations with Twitter and Reddit credentials.
+        All requests share one keep-alive aiohttp session, created on first use,
+        so TLS handshakes are paid once per connection rather than once per call.
+        Requests are paced and retried by `scheduler`, which may be shared with other fetchers.
+        `twitter_url` and `reddit_url` (a template with `{subreddit}`) point at local stubs in tests and benchmarks.
         """
         self.twitter_bearer_token = twitter_bearer_token
         self.reddit_client_id = reddit_client_id
         self.reddit_client_secret = reddit_client_secret
+        self.connection_limit = connection_limit
+        self.connection_limit_per_host = connection_limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.request_timeout = request_timeout
+        self.scheduler = scheduler or FetchScheduler()
+        self.twitter_url = twitter_url or TWITTER_SEARCH_URL
+        self.reddit_url = reddit_url or REDDIT_NEW_URL
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Returns the shared client session, creating the pooled connector on first use.
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.connection_limit,
+                limit_per_host=self.connection_limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout)
+            )
+            logger.debug("Created pooled aiohttp session for API integrations")
+        return self._session
+
+    async def close(self) -> None:
+        """
+        Closes the shared client session and its pooled connections.
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info("API integrations session closed")
+        self._session = None
 
-    async def _fetch_data(self, session: aiohttp.ClientSession, url: str, headers: Dict[str, str], params: Dict[str, Any]) -> Dict[str, Any]:
+    async def _fetch_data(self, session: aiohttp.ClientSession, url: str, headers: Dict[str, str], params: Dict[str, Any],
+                          service: str = "api") -> Dict[str, Any]:
         """
         Generic method to fetch data from any given API endpoint.
         """
         try:
-            async with session.get(url, headers=headers, params=params) as response:
-                response.raise_for_status()
-                data = await response.json()
-                return data
-        except aiohttp.ClientError as e:
+            with REQUEST_SECONDS.time(service=service):
+                data = await self.scheduler.fetch(session, url, headers=headers, params=params)
+            REQUESTS.inc(service=service, outcome="ok")
+            return data
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            REQUESTS.inc(service=service, outcome="error")
             logger.error(f"API request failed with error: {e}, URL: {url}")
             return {}
 
-    async def fetch_twitter_data(self, query: str, max_results: int = 100) -> Dict[str, Any]:
+    async def fetch_twitter_data(self, query: str, max_results: int = 100, next_token: Optional[str] = None,
+                                 since_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Fetches data from Twitter using their API.
         """
-        url = "https://api.twitter.com/2/tweets/search/recent"
         headers = {
             "Authorization": f"Bearer {self.twitter_bearer_token}"
         }
@@ -40,34 +124,157 @@ class APIIntegrations:
             "max_results": max_results,
             "tweet.fields": "created_at,public_metrics"
         }
-        async with aiohttp.ClientSession() as session:
-            return await self._fetch_data(session, url, headers, params)
+        if next_token:
+            params["next_token"] = next_token
+        if since_id:
+            params["since_id"] = since_id
+        session = await self._get_session()
+        return await self._fetch_data(session, self.twitter_url, headers, params, service="twitter")
 
-    async def fetch_reddit_data(self, subreddit: str, limit: int = 100) -> Dict[str, Any]:
+    async def fetch_reddit_data(self, subreddit: str, limit: int = 100, after: Optional[str] = None,
+                                before: Optional[str] = None) -> Dict[str, Any]:
         """
         Fetches data from Reddit using their API.
         """
-        url = f"https://www.reddit.com/r/{subreddit}/new.json"
         headers = {
             "User-Agent": "QuanterAI/0.1"
         }
         params = {"limit": limit}
-        async with aiohttp.ClientSession() as session:
-            return await self._fetch_data(session, url, headers, params)
+        if after:
+            params["after"] = after
+        if before:
+            params["before"] = before
+        session = await self._get_session()
+        return await self._fetch_data(session, self.reddit_url.format(subreddit=subreddit), headers, params,
+                                      service="reddit")
 
-    async def gather_api_data(self, query: str, subreddit: str) -> List[str]:
+    async def stream_twitter_data(self, query: str, max_results: int = 100, max_pages: int = 10,
+                                  poll_interval: float = 15.0, max_polls: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
         """
-        Collects data from Twitter and Reddit asynchronously.
+        Continuously yields tweets for a query as pages arrive.
+        Each poll walks `next_token` pages up to `max_pages`, then later polls only
+        request tweets newer than the newest one already seen (`since_id`).
+        """
+        since_id: Optional[str] = None
+        polls = 0
+        while max_polls is None or polls < max_polls:
+            polls += 1
+            next_token: Optional[str] = None
+            newest_id: Optional[str] = None
+            for _ in range(max_pages):
+                data = await self.fetch_twitter_data(query, max_results, next_token=next_token, since_id=since_id)
+                meta = data.get('meta', {})
+                newest_id = newest_id or meta.get('newest_id')
+                for tweet in data.get('data', []):
+                    yield tweet
+                next_token = meta.get('next_token')
+                if not next_token:
+                    break
+            if newest_id:
+                since_id = newest_id
+            if max_polls is None or polls < max_polls:
+                await asyncio.sleep(poll_interval)
+
+    async def stream_reddit_data(self, subreddit: str, limit: int = 100, max_pages: int = 10,
+                                 poll_interval: float = 15.0, max_polls: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Continuously yields Reddit posts from a subreddit as pages arrive.
+        Each poll walks `after` pages up to `max_pages`, then later polls only
+        request posts newer than the newest one already seen (`before`).
+        """
+        before: Optional[str] = None
+        polls = 0
+        while max_polls is None or polls < max_polls:
+            polls += 1
+            after: Optional[str] = None
+            newest_name: Optional[str] = None
+            for _ in range(max_pages):
+                data = await self.fetch_reddit_data(subreddit, limit, after=after, before=before)
+                listing = data.get('data', {})
+                children = listing.get('children', [])
+                if children and newest_name is None:
+                    newest_name = children[0]['data'].get('name')
+                for post in children:
+                    yield post['data']
+                # Reddit only honours one of `after`/`before`, so new-item polls stay on one page.
+                after = listing.get('after')
+                if not after or before:
+                    break
+            if newest_name:
+                before = newest_name
+            if max_polls is None or polls < max_polls:
+                await asyncio.sleep(poll_interval)
+
+    async def stream_api_data(self, query: str, subreddit: str, poll_interval: float = 15.0,
+                              max_polls: Optional[int] = None, queue_size: int = 1000) -> AsyncIterator[str]:
+        """
+        Streams documents from Twitter and Reddit concurrently, yielding each text as it arrives.
+        A bounded queue applies backpressure to the producers when consumers fall behind.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        done = object()
+
+        async def produce(source: AsyncIterator[Dict[str, Any]], field: str) -> None:
+            try:
+                async for item in source:
+                    text = item.get(field)
+                    if text:
+                        await queue.put(text)
+            except Exception as e:
+                logger.error(f"Streaming producer for '{field}' failed: {e}")
+            finally:
+                await queue.put(done)
+
+        producers = [
+            asyncio.create_task(produce(self.stream_twitter_data(query, poll_interval=poll_interval, max_polls=max_polls), 'text')),
+            asyncio.create_task(produce(self.stream_reddit_data(subreddit, poll_interval=poll_interval, max_polls=max_polls), 'title'))
+        ]
+        remaining = len(producers)
+        try:
+            while remaining:
+                item = await queue.get()
+                if item is done:
+                    remaining -= 1
+                    continue
+                yield item
+        finally:
+            for task in producers:
+                task.cancel()
+            await asyncio.gather(*producers, return_exceptions=True)
+
+    async def gather_api_records(self, query: str, subreddit: str) -> List[Dict[str, Any]]:
+        """
+        Collects data from Twitter and Reddit asynchronously as records that keep each post's
+        ID, timestamp, source and engagement metrics alongside its text.
         """
         twitter_task = self.fetch_twitter_data(query)
         reddit_task = self.fetch_reddit_data(subreddit)
         twitter_data, reddit_data = await asyncio.gather(twitter_task, reddit_task)
-        
-        documents = []
+
+        records: List[Dict[str, Any]] = []
         if 'data' in twitter_data:
-            documents += [tweet['text'] for tweet in twitter_data['data']]
+            records += [tweet_record(tweet) for tweet in twitter_data['data']]
         if 'data' in reddit_data:
-            documents += [post['data']['title'] for post in reddit_data['data']['children']]
-        
+            records += [reddit_record(post['data']) for post in reddit_data['data']['children']]
+        for source in ("twitter", "reddit"):
+            DOCUMENTS.inc(sum(record["source"] == source for record in records), stage="collect", source=source)
+        return records
+
+    async def gather_api_data_by_source(self, query: str, subreddit: str) -> Dict[str, List[str]]:
+        """
+        Collects data from Twitter and Reddit asynchronously, keyed by source.
+        """
+        documents: Dict[str, List[str]] = {"twitter": [], "reddit": []}
+        for record in await self.gather_api_records(query, subreddit):
+            documents[record["source"]].append(record["text"])
+        return documents
+
+    async def gather_api_data(self, query: str, subreddit: str) -> List[str]:
+        """
+        Collects data from Twitter and Reddit asynchronously.
+        """
+        by_source = await self.gather_api_data_by_source(query, subreddit)
+        documents = by_source["twitter"] + by_source["reddit"]
+
         logger.debug(f"Collected {len(documents)} documents from APIs.")
         return documents
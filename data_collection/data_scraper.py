@@ -1,29 +1,75 @@
 import asyncio
 import aiohttp
 import logging
+from concurrent.futures import Executor, ProcessPoolExecutor
 from bs4 import BeautifulSoup
-from typing import List
+from typing import AsyncIterator, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+from data_collection.fetch_scheduler import FetchScheduler
+from monitoring.metrics import DOCUMENTS, REQUEST_SECONDS, REQUESTS, stage_timer
 
 logger = logging.getLogger(__name__)
 
+try:
+    import lxml  # noqa: F401
+    DEFAULT_PARSER = 'lxml'
+except ImportError:
+    DEFAULT_PARSER = 'html.parser'
+
+def extract_text(html: str, parser: str = DEFAULT_PARSER) -> str:
+    """
+    Extracts visible text from an HTML document. Module-level so it can run in a process pool.
+    """
+    return BeautifulSoup(html, parser).get_text()
+
 class DataScraper:
-    def __init__(self, urls: List[str]):
+    def __init__(self, urls: List[str], scheduler: Optional[FetchScheduler] = None, max_concurrency: int = 20,
+                 parse_workers: Optional[int] = None, max_body_bytes: int = 2_000_000,
+                 parser: str = DEFAULT_PARSER):
         """
         Initializes the scraper with a list of URLs.
+        `max_concurrency`, `parse_workers` and `max_body_bytes` only apply to `scrape_stream`;
+        `parse_workers=0` parses on a thread instead of a process pool.
         """
         self.urls = urls
+        self.scheduler = scheduler or FetchScheduler()
+        self.max_concurrency = max_concurrency
+        self.parse_workers = parse_workers
+        self.max_body_bytes = max_body_bytes
+        self.parser = parser
+        self._executor: Optional[Executor] = None
+
+    def _get_executor(self) -> Optional[Executor]:
+        """
+        Returns the parse process pool, or None to use the loop's default thread pool.
+        """
+        if self.parse_workers == 0:
+            return None
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.parse_workers)
+        return self._executor
+
+    def close(self) -> None:
+        """
+        Shuts down the parse process pool.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
 
-    async def fetch(self, session: aiohttp.ClientSession, url: str) -> str:
+    async def fetch(self, session: aiohttp.ClientSession, url: str, max_bytes: Optional[int] = None) -> str:
         """
         Asynchronously fetches data from a given URL.
         """
         try:
-            async with session.get(url, timeout=10) as response:
-                response.raise_for_status()
-                text = await response.text()
-                logger.debug(f"Fetched data from {url}")
-                return text
+            with REQUEST_SECONDS.time(service="scraper"):
+                text = await self.scheduler.fetch(session, url, endpoint=urlsplit(url).netloc, as_json=False,
+                                                  max_bytes=max_bytes, timeout=10)
+            REQUESTS.inc(service="scraper", outcome="ok")
+            logger.debug(f"Fetched data from {url}")
+            return text
         except Exception as e:
+            REQUESTS.inc(service="scraper", outcome="error")
             logger.error(f"Error fetching data from {url}: {e}")
             return ""
 
@@ -34,4 +80,73 @@ class DataScraper:
         async with aiohttp.ClientSession() as session:
             tasks = [self.fetch(session, url) for url in self.urls]
             html_contents = await asyncio.gather(*tasks)
-            return [BeautifulSoup(html, 'html.parser').get_text() for html in html_contents if html]
+            with stage_timer("scrape_parse"):
+                texts = [BeautifulSoup(html, 'html.parser').get_text() for html in html_contents if html]
+            DOCUMENTS.inc(len(texts), stage="scrape")
+            return texts
+
+    async def scrape_stream(self, urls: Optional[Iterable[str]] = None) -> AsyncIterator[Tuple[str, str]]:
+        """
+        Scrapes URLs with at most `max_concurrency` fetches in flight, parsing HTML off the
+        event loop, and yields `(url, text)` pairs in completion order. URLs are pulled lazily
+        from `urls` (default: `self.urls`) so memory stays bounded for arbitrarily long lists.
+        If iterating `urls` raises, the pages already queued are still yielded and the error
+        is then re-raised to the consumer.
+        """
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        url_queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_concurrency * 2)
+        results: asyncio.Queue = asyncio.Queue(maxsize=self.max_concurrency * 2)
+        done = object()
+        feed_errors: List[Exception] = []
+
+        async def feed() -> None:
+            try:
+                for url in (self.urls if urls is None else urls):
+                    await url_queue.put(url)
+            except Exception as e:
+                logger.error(f"Error reading URLs to scrape: {e}")
+                feed_errors.append(e)
+            finally:
+                # Always release the workers, or they and the consumer would wait forever
+                for _ in range(self.max_concurrency):
+                    await url_queue.put(done)
+
+        async def work(session: aiohttp.ClientSession) -> None:
+            try:
+                while True:
+                    url = await url_queue.get()
+                    if url is done:
+                        break
+                    html = await self.fetch(session, url, max_bytes=self.max_body_bytes)
+                    if not html:
+                        continue
+                    try:
+                        with stage_timer("scrape_parse"):
+                            text = await loop.run_in_executor(executor, extract_text, html, self.parser)
+                    except Exception as e:
+                        logger.error(f"Error parsing HTML from {url}: {e}")
+                        continue
+                    DOCUMENTS.inc(stage="scrape")
+                    await results.put((url, text))
+            finally:
+                await results.put(done)
+
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            tasks = [asyncio.create_task(feed())]
+            tasks += [asyncio.create_task(work(session)) for _ in range(self.max_concurrency)]
+            remaining = self.max_concurrency
+            try:
+                while remaining:
+                    item = await results.get()
+                    if item is done:
+                        remaining -= 1
+                        continue
+                    yield item
+                if feed_errors:
+                    raise feed_errors[0]
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,141 @@
+import hashlib
+import logging
+import re
+import time
+from collections import OrderedDict, defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Set
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+_RETWEET_PREFIX = re.compile(r'^rt @\w+:?\s*')
+_URL = re.compile(r'https?://\S+')
+_MENTION = re.compile(r'@\w+')
+_NON_WORD = re.compile(r'[^\w\s$#]')
+_WHITESPACE = re.compile(r'\s+')
+
+class Deduplicator:
+    def __init__(self, num_perm: int = 64, bands: int = 16, threshold: float = 0.8, shingle_size: int = 5,
+                 window_seconds: float = 3600.0, max_entries: int = 200_000, seed: int = 42,
+                 clock: Callable[[], float] = time.time):
+        """
+        Drops exact and near-duplicate documents before the analysis stages.
+        Exact duplicates are matched on a hash of the normalized text; near duplicates
+        by MinHash signatures over character shingles, bucketed with LSH banding.
+        Only documents seen within `window_seconds` (and at most `max_entries` of them)
+        are remembered, so the index stays bounded on an unbounded stream.
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.window_seconds = window_seconds
+        self.max_entries = max_entries
+        self.clock = clock
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        self._next_id = 0
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._exact: Dict[str, int] = {}
+        self._buckets: List[Dict[bytes, Set[int]]] = [defaultdict(set) for _ in range(bands)]
+        self.stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"seen": 0, "exact": 0, "near": 0})
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        Canonical form used for hashing: lowercased, without retweet prefixes, URLs,
+        mentions or punctuation, and with whitespace collapsed.
+        """
+        text = _RETWEET_PREFIX.sub('', text.lower().strip())
+        text = _MENTION.sub(' ', _URL.sub(' ', text))
+        text = _NON_WORD.sub(' ', text)
+        return _WHITESPACE.sub(' ', text).strip()
+
+    def _signature(self, normalized: str) -> np.ndarray:
+        k = self.shingle_size
+        shingles = {normalized[i:i + k] for i in range(max(len(normalized) - k + 1, 1))}
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=4).digest(), 'little') for s in shingles),
+            dtype=np.uint64, count=len(shingles)
+        )
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME
+        return permuted.min(axis=0)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def _evict(self, now: float, incoming: int = 0) -> None:
+        # Drops expired entries, then the oldest ones until `incoming` more fit within max_entries
+        while self._entries:
+            entry_id, (timestamp, content_hash, band_keys, _) = next(iter(self._entries.items()))
+            if now - timestamp <= self.window_seconds and len(self._entries) + incoming <= self.max_entries:
+                break
+            self._entries.popitem(last=False)
+            if self._exact.get(content_hash) == entry_id:
+                del self._exact[content_hash]
+            for band, key in enumerate(band_keys):
+                bucket = self._buckets[band].get(key)
+                if bucket is not None:
+                    bucket.discard(entry_id)
+                    if not bucket:
+                        del self._buckets[band][key]
+
+    def is_duplicate(self, text: str, source: str = "unknown", timestamp: Optional[float] = None) -> bool:
+        """
+        Returns True if `text` duplicates a document still in the window; otherwise indexes it.
+        """
+        now = self.clock() if timestamp is None else timestamp
+        self._evict(now)
+        stats = self.stats[source]
+        stats["seen"] += 1
+        normalized = self.normalize(text)
+        content_hash = hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).hexdigest()
+        if content_hash in self._exact:
+            stats["exact"] += 1
+            return True
+        signature = self._signature(normalized)
+        band_keys = self._band_keys(signature)
+        candidates: Set[int] = set()
+        for band, key in enumerate(band_keys):
+            candidates |= self._buckets[band].get(key, set())
+        for candidate in candidates:
+            if np.mean(self._entries[candidate][3] == signature) >= self.threshold:
+                stats["near"] += 1
+                return True
+        self._evict(now, incoming=1)
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = (now, content_hash, band_keys, signature)
+        self._exact[content_hash] = entry_id
+        for band, key in enumerate(band_keys):
+            self._buckets[band][key].add(entry_id)
+        return False
+
+    def filter(self, texts: Iterable[str], source: str = "unknown") -> List[str]:
+        """
+        Returns the documents from `texts` that are not duplicates, in their original order.
+        """
+        texts = list(texts)
+        try:
+            unique = [text for text in texts if not self.is_duplicate(text, source)]
+            logger.debug(f"Deduplicated {source}: kept {len(unique)} of {len(texts)} documents")
+            return unique
+        except Exception as e:
+            logger.error(f"Error during deduplication of {source} documents: {e}")
+            return texts
+
+    def log_stats(self) -> None:
+        """
+        Logs how many documents were dropped per source since the deduplicator was created.
+        """
+        for source, stats in self.stats.items():
+            dropped = stats["exact"] + stats["near"]
+            logger.info(
+                f"Dedup {source}: dropped {dropped} of {stats['seen']} documents "
+                f"({stats['exact']} exact, {stats['near']} near-duplicate)"
+            )
@@ -0,0 +1,198 @@
+import glob
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.ipc
+    SCHEMA = pa.schema([
+        ("id", pa.string()),
+        ("source", pa.string()),
+        ("created_at", pa.timestamp("ms", tz="UTC")),
+        ("text", pa.string()),
+        ("like_count", pa.int64()),
+        ("retweet_count", pa.int64()),
+        ("reply_count", pa.int64()),
+        ("quote_count", pa.int64()),
+    ])
+except ImportError:
+    pa = None
+    SCHEMA = None
+
+METRIC_COLUMNS = ("like_count", "retweet_count", "reply_count", "quote_count")
+HOUR_FORMAT = "%Y%m%dT%H"
+
+def hour_partition(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime(HOUR_FORMAT)
+
+def engagement_labels(batch: Any, quantile: float = 0.5) -> np.ndarray:
+    """
+    1 for documents whose total engagement (likes, reposts, replies, quotes) is above the
+    given quantile of the batch, else 0. Meant as MemeModel training labels. `batch` is a
+    record batch, a table or a dict of metric columns.
+    """
+    engagement = sum(np.asarray(batch[name], dtype=np.int64) for name in METRIC_COLUMNS)
+    if not len(engagement):
+        return np.zeros(0, dtype=int)
+    return (engagement > np.quantile(engagement, quantile)).astype(int)
+
+class DocumentStore:
+    def __init__(self, root: str = "data/documents"):
+        """
+        Append-only columnar store of collected documents, partitioned by source and UTC hour:
+        `<root>/source=<source>/hour=<YYYYMMDDTHH>/part-*.arrow`. Every `append` writes new
+        Arrow IPC files (renamed into place, so readers never see partial files), keeping id,
+        timestamp, source, text and engagement metrics. Reads memory-map the files, so record
+        batches reference the page cache directly instead of being copied or parsed.
+        Requires pyarrow.
+        """
+        if pa is None:
+            raise ImportError("DocumentStore requires the pyarrow package")
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _partition_dir(self, source: str, hour: str) -> str:
+        return os.path.join(self.root, f"source={source}", f"hour={hour}")
+
+    def append(self, records: Iterable[Dict[str, Any]]) -> List[str]:
+        """
+        Writes records (dicts with id, source, created_at as epoch seconds, text and the metric
+        counts) and returns the paths of the new files, one per source/hour partition touched.
+        """
+        partitions: Dict[tuple, List[Dict[str, Any]]] = {}
+        for record in records:
+            partitions.setdefault((record["source"], hour_partition(record["created_at"])), []).append(record)
+        paths = []
+        stored = 0
+        for (source, hour), rows in partitions.items():
+            columns = {
+                "id": [str(row["id"]) for row in rows],
+                "source": [source] * len(rows),
+                "created_at": [int(row["created_at"] * 1000) for row in rows],
+                "text": [row["text"] for row in rows],
+            }
+            for name in METRIC_COLUMNS:
+                columns[name] = [int(row.get(name) or 0) for row in rows]
+            table = pa.Table.from_pydict(columns, schema=SCHEMA)
+            directory = self._partition_dir(source, hour)
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"part-{int(time.time() * 1000):013d}-{uuid.uuid4().hex[:8]}.arrow")
+            staging = os.path.join(directory, f".{os.path.basename(path)}.tmp")
+            try:
+                with pa.OSFile(staging, "wb") as sink, pa.ipc.new_file(sink, SCHEMA) as writer:
+                    writer.write_table(table)
+                os.replace(staging, path)
+            except Exception as e:
+                logger.error(f"Error writing {len(rows)} documents to {directory}: {e}")
+                if os.path.exists(staging):
+                    os.remove(staging)
+                continue
+            paths.append(path)
+            stored += len(rows)
+        logger.info(f"Stored {stored} documents in {len(paths)} files")
+        return paths
+
+    @staticmethod
+    def written_at(path: str) -> float:
+        """
+        Epoch seconds at which a part file was written, from its name.
+        """
+        return int(os.path.basename(path).split("-")[1]) / 1000.0
+
+    def files(self, sources: Optional[Sequence[str]] = None, start: Optional[float] = None,
+              end: Optional[float] = None, written_after: Optional[float] = None) -> List[str]:
+        """
+        Part files in (source, hour, write order), pruned by source, by the hour partitions
+        overlapping `[start, end)` (epoch seconds) and to files written at or after `written_after`.
+        """
+        first = hour_partition(start) if start is not None else None
+        last = hour_partition(end) if end is not None else None
+        paths = []
+        for source_dir in sorted(glob.glob(os.path.join(self.root, "source=*"))):
+            if sources is not None and source_dir.split("source=", 1)[1] not in sources:
+                continue
+            for hour_dir in sorted(glob.glob(os.path.join(source_dir, "hour=*"))):
+                hour = hour_dir.split("hour=", 1)[1]
+                if (first is not None and hour < first) or (last is not None and hour > last):
+                    continue
+                parts = sorted(glob.glob(os.path.join(hour_dir, "part-*.arrow")))
+                if written_after is not None:
+                    parts = [path for path in parts if self.written_at(path) >= written_after]
+                paths += parts
+        return paths
+
+    def iter_batches(self, sources: Optional[Sequence[str]] = None, start: Optional[float] = None,
+                     end: Optional[float] = None, columns: Optional[Sequence[str]] = None,
+                     paths: Optional[Sequence[str]] = None) -> Iterator[Any]:
+        """
+        Yields memory-mapped record batches, optionally restricted to `columns` and to
+        documents created in `[start, end)`. Selecting columns and the hour pruning are free;
+        the time filter only copies batches that straddle the range boundaries.
+        `paths` reads exactly these part files (e.g. from a `StoreCursor`) instead of `files()`.
+        """
+        start_ms = pa.scalar(int(start * 1000), SCHEMA.field("created_at").type) if start is not None else None
+        end_ms = pa.scalar(int(end * 1000), SCHEMA.field("created_at").type) if end is not None else None
+        for path in self.files(sources, start, end) if paths is None else paths:
+            try:
+                reader = pa.ipc.open_file(pa.memory_map(path, "r"))
+            except Exception as e:
+                logger.error(f"Skipping unreadable document file {path}: {e}")
+                continue
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                if start_ms is not None or end_ms is not None:
+                    created = batch.column("created_at")
+                    mask = None
+                    if start_ms is not None:
+                        mask = pc.greater_equal(created, start_ms)
+                    if end_ms is not None:
+                        before = pc.less(created, end_ms)
+                        mask = before if mask is None else pc.and_(mask, before)
+                    if not pc.all(mask).as_py():
+                        batch = batch.filter(mask)
+                if columns is not None:
+                    batch = batch.select(list(columns))
+                if batch.num_rows:
+                    yield batch
+
+    def read_table(self, sources: Optional[Sequence[str]] = None, start: Optional[float] = None,
+                   end: Optional[float] = None, columns: Optional[Sequence[str]] = None,
+                   paths: Optional[Sequence[str]] = None) -> Any:
+        """
+        All matching documents as one pyarrow Table (the batches are not copied).
+        """
+        schema = SCHEMA if columns is None else pa.schema([SCHEMA.field(name) for name in columns])
+        return pa.Table.from_batches(list(self.iter_batches(sources, start, end, columns, paths)), schema=schema)
+
+class StoreCursor:
+    def __init__(self, store: DocumentStore, since: float, grace: float = 60.0):
+        """
+        Tracks which part files a consumer has processed, by when they were written rather
+        than when their documents were posted, so late-arriving old posts are still picked up.
+        `pending()` lists unprocessed files written since `since`; `commit()` marks them done
+        once the consumer succeeded, so a failed cycle sees the same files again. Files written
+        up to `grace` seconds before the newest committed one are re-checked, which covers
+        writers whose clock or rename lagged; older ones are assumed processed.
+        """
+        self.store = store
+        self.since = since
+        self.grace = grace
+        self._done: Dict[str, float] = {}
+
+    def pending(self) -> List[str]:
+        return [path for path in self.store.files(written_after=self.since - self.grace) if path not in self._done]
+
+    def commit(self, paths: Iterable[str]) -> None:
+        for path in paths:
+            self._done[path] = DocumentStore.written_at(path)
+        if self._done:
+            self.since = max(self.since, max(self._done.values()))
+        self._done = {path: written for path, written in self._done.items() if written >= self.since - self.grace}
@@ -0,0 +1,215 @@
+import asyncio
+import logging
+import random
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+class TokenBucket:
+    def __init__(self, remaining: Optional[float] = None, reset_at: Optional[float] = None, headroom: int = 1):
+        """
+        Tracks the request budget of one endpoint as reported by its rate-limit headers.
+        `remaining` is None until the endpoint has told us its limit; `tracks_limits`
+        is None until we know whether the endpoint sends rate-limit headers at all.
+        """
+        self.remaining = remaining
+        self.reset_at = reset_at
+        self.headroom = headroom
+        self.tracks_limits: Optional[bool] = None
+        self.last_grant = 0.0
+        self.lock = asyncio.Lock()
+        self.probing = False
+        self.settled = asyncio.Event()
+
+    def update(self, remaining: Optional[float], reset_at: Optional[float]) -> None:
+        """
+        Replaces the local estimate with the server's view of the window.
+        """
+        if remaining is not None:
+            self.remaining = remaining
+            self.tracks_limits = True
+        elif self.tracks_limits is None:
+            self.tracks_limits = False
+        if reset_at is not None:
+            self.reset_at = reset_at
+
+    def delay(self, now: float) -> float:
+        """
+        Returns how long to wait before the next request so the budget is spread
+        evenly across the rest of the window instead of being burst into a 429.
+        """
+        if self.remaining is None or self.reset_at is None:
+            return 0.0
+        if now >= self.reset_at:
+            # The window has rolled over; the next response will tell us the new budget.
+            self.remaining = None
+            return 0.0
+        usable = self.remaining - self.headroom
+        if usable <= 0:
+            return self.reset_at - now
+        spacing = (self.reset_at - now) / usable
+        return max(0.0, self.last_grant + spacing - now)
+
+def parse_rate_limit_headers(headers: Mapping[str, str], now: float) -> Dict[str, Optional[float]]:
+    """
+    Extracts the remaining budget and absolute reset time from Twitter
+    (`x-rate-limit-*`, reset as epoch seconds) or Reddit (`X-Ratelimit-*`,
+    reset as seconds from now) response headers.
+    """
+    lowered = {key.lower(): value for key, value in headers.items()}
+    remaining = reset_at = None
+    try:
+        if 'x-rate-limit-remaining' in lowered:
+            remaining = float(lowered['x-rate-limit-remaining'])
+            if 'x-rate-limit-reset' in lowered:
+                reset_at = float(lowered['x-rate-limit-reset'])
+        elif 'x-ratelimit-remaining' in lowered:
+            remaining = float(lowered['x-ratelimit-remaining'])
+            if 'x-ratelimit-reset' in lowered:
+                reset_at = now + float(lowered['x-ratelimit-reset'])
+        if 'retry-after' in lowered:
+            reset_at = max(reset_at or 0.0, now + float(lowered['retry-after']))
+    except ValueError:
+        logger.debug(f"Ignoring malformed rate-limit headers: {lowered}")
+    return {"remaining": remaining, "reset_at": reset_at}
+
+class FetchScheduler:
+    def __init__(self, max_retries: int = 4, base_backoff: float = 0.5, max_backoff: float = 30.0,
+                 headroom: int = 1, clock: Callable[[], float] = time.time,
+                 sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep, max_buckets: int = 1024):
+        """
+        Paces and retries HTTP fetches shared by the API integrations and the scraper.
+        Keeps one token bucket per endpoint, fed from the rate-limit headers of each response.
+        At most `max_buckets` idle buckets are kept, least recently used ones are dropped first.
+        """
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.headroom = headroom
+        self.clock = clock
+        self.sleep = sleep
+        self.max_buckets = max_buckets
+        self.buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    @staticmethod
+    def endpoint_key(url: str) -> str:
+        """
+        Default bucket key: host and path, without the query string.
+        """
+        parts = urlsplit(url)
+        return f"{parts.netloc}{parts.path}"
+
+    def _bucket(self, endpoint: str) -> TokenBucket:
+        if endpoint in self.buckets:
+            self.buckets.move_to_end(endpoint)
+            return self.buckets[endpoint]
+        # Forget the least recently used endpoints, skipping buckets with requests in flight
+        for key in list(self.buckets):
+            if len(self.buckets) < self.max_buckets:
+                break
+            bucket = self.buckets[key]
+            if not bucket.lock.locked() and not bucket.probing:
+                del self.buckets[key]
+        bucket = self.buckets[endpoint] = TokenBucket(headroom=self.headroom)
+        return bucket
+
+    def _backoff(self, attempt: int) -> float:
+        """
+        Full-jitter exponential backoff.
+        """
+        return random.uniform(0, min(self.max_backoff, self.base_backoff * (2 ** attempt)))
+
+    async def _acquire(self, bucket: TokenBucket) -> bool:
+        """
+        Waits for the bucket to grant a request. While a rate-limited endpoint's budget is
+        unknown only one probe request is let through, so a cold start cannot burst into 429s.
+        Returns True if the caller is that probe and must call `_release_probe` afterwards.
+        """
+        async with bucket.lock:
+            while True:
+                if bucket.remaining is None and bucket.tracks_limits is not False:
+                    if bucket.probing:
+                        await bucket.settled.wait()
+                        continue
+                    bucket.probing = True
+                    bucket.settled.clear()
+                    bucket.last_grant = self.clock()
+                    return True
+                wait = bucket.delay(self.clock())
+                if wait <= 0:
+                    break
+                await self.sleep(wait)
+            bucket.last_grant = self.clock()
+            if bucket.remaining is not None:
+                bucket.remaining -= 1
+            return False
+
+    @staticmethod
+    def _release_probe(bucket: TokenBucket) -> None:
+        bucket.probing = False
+        bucket.settled.set()
+
+    @staticmethod
+    async def _read_capped(response: aiohttp.ClientResponse, max_bytes: int) -> str:
+        chunks = []
+        size = 0
+        async for chunk in response.content.iter_chunked(65536):
+            chunks.append(chunk[:max_bytes - size])
+            size += len(chunks[-1])
+            if size >= max_bytes:
+                logger.debug(f"Truncated body from {response.url} at {max_bytes} bytes")
+                break
+        return b"".join(chunks).decode(response.charset or "utf-8", errors="replace")
+
+    async def fetch(self, session: aiohttp.ClientSession, url: str, headers: Optional[Dict[str, str]] = None,
+                    params: Optional[Dict[str, Any]] = None, endpoint: Optional[str] = None,
+                    as_json: bool = True, max_bytes: Optional[int] = None, method: str = "GET",
+                    **request_kwargs: Any) -> Any:
+        """
+        Issues a request (GET unless `method` says otherwise) once the endpoint's budget
+        allows it and returns the decoded body.
+        With `max_bytes`, text bodies are truncated after that many bytes instead of
+        being read into memory in full.
+        Retries 429/5xx responses, connection errors and timeouts; raises the last
+        error once `max_retries` is exhausted or on any non-retryable status.
+        """
+        bucket = self._bucket(endpoint or self.endpoint_key(url))
+        attempt = 0
+        while True:
+            probe = await self._acquire(bucket)
+            try:
+                async with session.request(method, url, headers=headers, params=params, **request_kwargs) as response:
+                    limits = parse_rate_limit_headers(response.headers, self.clock())
+                    bucket.update(limits["remaining"], limits["reset_at"])
+                    if response.status == 429 and limits["reset_at"] is None:
+                        bucket.update(0, self.clock() + self._backoff(attempt))
+                    elif response.status == 429:
+                        bucket.update(0, None)
+                    if response.status in RETRYABLE_STATUSES and attempt < self.max_retries:
+                        logger.warning(f"Retryable status {response.status} from {url}, attempt {attempt + 1}")
+                        if response.status != 429:
+                            await self.sleep(self._backoff(attempt))
+                        attempt += 1
+                        continue
+                    response.raise_for_status()
+                    if as_json:
+                        return await response.json()
+                    if max_bytes is not None:
+                        return await self._read_capped(response, max_bytes)
+                    return await response.text()
+            except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError) as e:
+                if attempt >= self.max_retries:
+                    raise
+                logger.warning(f"Transient error fetching {url}: {e!r}, attempt {attempt + 1}")
+                await self.sleep(self._backoff(attempt))
+                attempt += 1
+            finally:
+                if probe:
+                    self._release_probe(bucket)
@@ -1,16 +1,21 @@
+import argparse
 import asyncio
+import collections
 import logging
+import time
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional
 from config.settings import settings
-from data_collection.api_integrations import APIIntegrations
-from trend_analysis.trend_detector import TrendDetector
-from trend_analysis.sentiment_analysis import SentimentAnalysis
-from meme_predictor.feature_extractor import FeatureExtractor
-from meme_predictor.meme_model import MemeModel
-from recommender.recommender_system import RecommenderSystem
-from recommender.user_profile import UserProfile
-from blockchain_integration.solana_connector import SolanaConnector
+from data_collection.document_store import METRIC_COLUMNS, engagement_labels
+from pipeline.components import Components
+from pipeline.dag_runner import PipelineRunner, Stage
 from error_handler import handle_error
 
+if TYPE_CHECKING:
+    from blockchain_integration.subscriptions import SolanaSubscriptions
+    from data_collection.document_store import StoreCursor
+    from pipeline.prefork import PreforkPool
+    from preprocessing.shared_tokenizer import SharedTokenizer
+
 # Setting up logging
 logging.basicConfig(
     level=settings.log_level,
@@ -18,59 +23,229 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-async def main():
+ROLES = ("all", "ingest", "score")
+# Read-only models each role can share with pre-forked workers (see pipeline.prefork)
+PREFORK_COMPONENTS = {"all": ["sentiment"], "ingest": [], "score": ["sentiment", "feature_extractor", "meme_model"]}
+
+async def follow_program_logs(subscriptions: "SolanaSubscriptions", program_id: str,
+                              buffer: Deque[Dict[str, Any]]) -> None:
+    """
+    Appends a record with the log lines of every transaction mentioning the program to
+    `buffer`, so on-chain activity joins the next cycle's documents.
+    """
+    async for notification in await subscriptions.logs_subscribe(program_id):
+        value = notification.get("value", {})
+        if value.get("err") is None and value.get("logs"):
+            record = {"id": value.get("signature"), "source": "solana", "created_at": time.time(),
+                      "text": " ".join(value["logs"])}
+            buffer.append({**record, **{name: 0 for name in METRIC_COLUMNS}})
+
+def build_pipeline(components: Components, wallet_address: str, role: str = "all", continuous: bool = False,
+                   onchain: Optional[Deque[Dict[str, Any]]] = None, lookback: float = 300.0,
+                   pool: Optional["PreforkPool"] = None) -> PipelineRunner:
+    """
+    Wires the components into a DAG for one process role: "all" collects, stores, analyzes
+    and trains; "ingest" only collects and appends to the document store; "score" scores the
+    documents stored since its last successful cycle (the last `lookback` seconds at first)
+    with the model and vectorizer bundle published by an "all" process, switching to a newer
+    bundle at the start of a cycle (re-forking `pool`). Components are only built when
+    a stage first uses them. Collection and the wallet lookup run on the event loop, everything
+    CPU-bound in the thread pool, or in the pre-forked `pool` for the models it preloaded.
+    In continuous mode the model is warm-started every cycle (`MemeModel.update`).
+    """
+    if role not in ROLES:
+        raise ValueError(f"Unknown role '{role}', expected one of {ROLES}")
+
+    def model_stage(name: str, component: str, method: str, inputs: List[str], outputs: List[str]) -> Stage:
+        if pool is not None and component in pool.preload:
+            return Stage(name, pool.task(component, method), inputs=inputs, outputs=outputs, executor="process")
+        return Stage(name, lambda *args: getattr(components.get(component), method)(*args),
+                     inputs=inputs, outputs=outputs)
+
+    async def collect() -> List[Dict[str, Any]]:
+        records = await components.api.gather_api_records(query="meme", subreddit="crypto")
+        if onchain:
+            records += [onchain.popleft() for _ in range(len(onchain))]
+        return records
+
+    def store(records: List[Dict[str, Any]]) -> List[str]:
+        return components.store.append(records) if components.store is not None else []
+
+    cursors: Dict[str, "StoreCursor"] = {}
+
+    def refresh_models() -> bool:
+        # Workers forked with the previous model (or whose restart failed) are forked again
+        refreshed = components.refresh_published()
+        if pool is not None and (refreshed or pool.executor is None):
+            pool.restart()
+        return refreshed
+
+    def load_unscored(refreshed: bool) -> tuple:
+        # Documents are picked by when they were stored, not posted, so late arrivals are scored too
+        if components.store is None:
+            raise RuntimeError("Scoring needs the document store (pyarrow)")
+        if "score" not in cursors:
+            from data_collection.document_store import StoreCursor
+            cursors["score"] = StoreCursor(components.store, since=time.time() - lookback)
+        paths = cursors["score"].pending()
+        table = components.store.read_table(columns=["text"], paths=paths)
+        return table.column("text").to_pylist(), paths
+
+    def mark_scored(paths: List[str], documents: List[str], sentiments: List[float], predictions: Any) -> List[str]:
+        # Only a fully scored cycle advances the cursor; otherwise the files are retried next cycle
+        if documents and (predictions is None or len(predictions) != len(documents) or len(sentiments) != len(documents)):
+            raise RuntimeError(f"Scoring {len(documents)} documents failed; they will be retried")
+        cursors["score"].commit(paths)
+        return paths
+
+    def deduplicate(records: List[Dict[str, Any]]) -> tuple:
+        # Drop duplicate and near-duplicate posts before the analysis stages
+        deduplicator = components.deduplicator
+        try:
+            unique = [record for record in records if not deduplicator.is_duplicate(record["text"], record["source"])]
+        except Exception as e:
+            logger.error(f"Error during deduplication: {e}")
+            unique = records
+        deduplicator.log_stats()
+        columns = {name: [record.get(name, 0) for record in unique] for name in METRIC_COLUMNS}
+        return [record["text"] for record in unique], engagement_labels(columns)
+
+    def tokenize(documents: List[str]) -> "SharedTokenizer":
+        from preprocessing.shared_tokenizer import SharedTokenizer
+        return SharedTokenizer().fit(documents)
+
+    def detect_trends(documents: List[str], shared_tokens: "SharedTokenizer") -> tuple:
+        trend_detector = components.trend_detector
+        trends = trend_detector.detect_trends(documents, shared_tokens=shared_tokens)
+        return trends, trend_detector.topics
+
+    def train(features: Any, y: Any) -> bool:
+        # Labels: whether a post's engagement is above the cycle's median
+        meme_model = components.meme_model
+        trained = meme_model.update(features, y) if continuous else meme_model.train(features, y)
+        if not trained:
+            raise RuntimeError("Model training failed; keeping the previously published model")
+        # Publish the model and vectorizer together for scoring-only processes
+        from meme_predictor.artifact_bundle import ArtifactBundle
+        if not ArtifactBundle(components.bundle_dir).save(components.feature_extractor, meme_model):
+            raise RuntimeError("Publishing the trained model failed")
+        return True
+
+    def recommend(topics: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Generate ranked recommendations from the structured topics
+        recommender, user_profile = components.recommender, components.user_profile
+        recommender.index_trends(topics)
+        return recommender.recommend_many(
+            {user_profile.user_id: user_profile.preferences.get("interests", [])}
+        ).get(user_profile.user_id, [])
+
+    async def balance() -> Optional[int]:
+        return await components.solana.get_balance(wallet_address=wallet_address)
+
+    stages = [Stage("collect", collect, outputs=["collected"], executor="async")] if role != "score" else []
+    if role == "ingest":
+        stages.append(Stage("store", store, inputs=["collected"], outputs=["stored"]))
+    elif role == "score":
+        stages += [
+            Stage("refresh", refresh_models, outputs=["refreshed"], executor="inline"),
+            Stage("load", load_unscored, inputs=["refreshed"], outputs=["documents", "files"]),
+            model_stage("sentiment", "sentiment", "analyze_sentiment", ["documents"], ["sentiments"]),
+            model_stage("features", "feature_extractor", "transform", ["documents"], ["features"]),
+            model_stage("predict", "meme_model", "predict", ["features"], ["predictions"]),
+            Stage("mark_scored", mark_scored, inputs=["files", "documents", "sentiments", "predictions"],
+                  outputs=["scored_files"]),
+        ]
+    else:
+        stages += [
+            Stage("store", store, inputs=["collected"], outputs=["stored"]),
+            Stage("deduplicate", deduplicate, inputs=["collected"], outputs=["documents", "labels"]),
+            # Tokenize once for both TF-IDF consumers
+            Stage("tokenize", tokenize, inputs=["documents"], outputs=["shared_tokens"]),
+            Stage("trends", detect_trends, inputs=["documents", "shared_tokens"], outputs=["trends", "topics"]),
+            model_stage("sentiment", "sentiment", "analyze_sentiment", ["documents"], ["sentiments"]),
+            Stage("features", lambda documents, shared_tokens: components.feature_extractor.fit_transform(
+                documents, shared_tokens), inputs=["documents", "shared_tokens"], outputs=["features"]),
+            Stage("train", train, inputs=["features", "labels"], outputs=["trained"]),
+            Stage("predict", lambda features, trained: components.meme_model.predict(features),
+                  inputs=["features", "trained"], outputs=["predictions"]),
+            Stage("recommend", recommend, inputs=["topics"], outputs=["recommendations"]),
+            Stage("balance", balance, outputs=["balance"], executor="async"),
+        ]
+    return PipelineRunner(stages, process_pool=pool)
+
+def report(context: Dict[str, Any], wallet_address: str) -> None:
+    if "balance" in context:
+        logger.info(f"Wallet Balance for {wallet_address}: {context.get('balance')} lamports")
+    if "stored" in context:
+        logger.info(f"Stored {len(context['stored'])} document files")
+    predictions = context.get("predictions")
+    if predictions is not None and "recommendations" not in context:
+        logger.info(f"Scored {len(predictions)} documents")
+    # Print recommendations
+    for rec in context.get("recommendations", []):
+        logger.info(f"Recommendation ({rec['score']:.3f}): {rec['recommendation']}")
+
+async def main(continuous: bool = False, interval: float = 300.0, max_cycles: Optional[int] = None,
+               metrics_port: Optional[int] = None, profile_dir: Optional[str] = None, role: str = "all",
+               prefork: int = 0):
     try:
-        # Initialize components
-        api = APIIntegrations(
-            twitter_bearer_token=settings.twitter_bearer_token,
-            reddit_client_id=settings.reddit_client_id,
-            reddit_client_secret=settings.reddit_client_secret
-        )
-        trend_detector = TrendDetector()
-        sentiment_analyzer = SentimentAnalysis()
-        feature_extractor = FeatureExtractor()
-        meme_model = MemeModel()
-        recommender = RecommenderSystem()
-        user_profile = UserProfile(user_id="user123")
-        solana = SolanaConnector(rpc_url=settings.solana_rpc_url)
-
-        # Collect data from APIs
-        documents = await api.gather_api_data(query="meme", subreddit="crypto")
-
-        # Detect trends
-        trends = trend_detector.detect_trends(documents)
-
-        # Sentiment analysis
-        sentiments = sentiment_analyzer.analyze_sentiment(documents)
-
-        # Feature extraction
-        features = feature_extractor.fit_transform(documents)
-
-        # Train the model (using synthetic labels for demo)
-        import numpy as np
-        y = np.random.randint(0, 2, size=features.shape[0])
-        meme_model.train(features, y)
-
-        # Meme success prediction
-        predictions = meme_model.predict(features)
-
-        # Generate recommendations
-        recommendations = recommender.generate_recommendations(trends, user_profile.preferences)
-
-        # Blockchain interaction example
+        # Components are built lazily, so startup only pays for what this role uses
+        components = Components(settings, continuous=continuous, pretrained=role == "score")
         wallet_address = "YourWalletAddressHere"
-        balance = await solana.get_balance(wallet_address=wallet_address)
-        logger.info(f"Wallet Balance for {wallet_address}: {balance} lamports")
 
-        # Print recommendations
-        for rec in recommendations:
-            logger.info(f"Recommendation: {rec}")
+        pool = None
+        if prefork > 0 and PREFORK_COMPONENTS[role]:
+            from pipeline.prefork import PreforkPool
+            pool = PreforkPool(components, PREFORK_COMPONENTS[role], workers=prefork).start()
+
+        metrics_server = None
+        if metrics_port is not None:
+            from monitoring.metrics import MetricsServer
+            metrics_server = MetricsServer()
+            await metrics_server.start(port=metrics_port)
+
+        follower = None
+        onchain: Deque[Dict[str, Any]] = collections.deque(maxlen=10_000)
+        if continuous and role != "score":
+            program_id, = settings.require("On-chain log following", "smart_contract_program_id")
+            follower = asyncio.ensure_future(follow_program_logs(components.subscriptions, program_id, onchain))
 
-        # Close blockchain connections
-        await solana.close()
+        runner = build_pipeline(components, wallet_address, role=role, continuous=continuous, onchain=onchain,
+                                lookback=interval, pool=pool)
+        if profile_dir:
+            runner.profile_next_cycle(profile_dir)
+        try:
+            if continuous:
+                await runner.run_forever(dict, interval, max_cycles=max_cycles,
+                                         on_cycle=lambda context: report(context, wallet_address))
+            else:
+                report(await runner.run_once(), wallet_address)
+        finally:
+            runner.close()
+            # Close API and blockchain connections
+            await components.close()
+            if follower is not None:
+                await follower
+            if pool is not None:
+                pool.close()
+            if metrics_server is not None:
+                await metrics_server.stop()
 
     except Exception as e:
         handle_error(e)
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Run the meme trend pipeline once or on a schedule.")
+    parser.add_argument("--continuous", action="store_true", help="Run a cycle every --interval seconds")
+    parser.add_argument("--interval", type=float, default=300.0)
+    parser.add_argument("--cycles", type=int, default=None, help="Stop after this many cycles")
+    parser.add_argument("--metrics-port", type=int, default=None, help="Serve Prometheus metrics on this port")
+    parser.add_argument("--profile-dir", default=None, help="Profile the first cycle into this directory")
+    parser.add_argument("--role", choices=ROLES, default="all",
+                        help="all: collect, analyze and train; ingest: collect and store; score: score stored documents")
+    parser.add_argument("--prefork", type=int, default=0,
+                        help="Fork this many workers sharing the pre-loaded models")
+    args = parser.parse_args()
+    asyncio.run(main(continuous=args.continuous, interval=args.interval, max_cycles=args.cycles,
+                     metrics_port=args.metrics_port, profile_dir=args.profile_dir, role=args.role,
+                     prefork=args.prefork))
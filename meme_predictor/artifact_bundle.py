@@ -0,0 +1,178 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+import sklearn
+import xgboost as xgb
+from meme_predictor.feature_extractor import FeatureExtractor
+from meme_predictor.meme_model import MemeModel
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+MODEL_FILE = "model.ubj"
+MANIFEST_FILE = "manifest.json"
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class ArtifactBundle:
+    def __init__(self, bundle_dir: str = "models/bundle"):
+        """
+        Directory holding a trained model and its vectorizer without pickles: the booster in
+        XGBoost's native UBJSON format, vocabulary and IDF weights as `.npy` arrays, and a
+        manifest with library versions and a size and SHA-256 per file. Hashing-mode
+        vectorizers are the recommended bundle mode: their IDF and document-frequency arrays
+        are used straight from `mmap_mode='r'` maps, so worker processes share one page-cached
+        copy. Vocabulary mode still avoids pickles, but every process rebuilds its own term
+        dictionary and IDF diagonal from the arrays.
+        """
+        self.bundle_dir = bundle_dir
+        self.manifest_path = os.path.join(bundle_dir, MANIFEST_FILE)
+
+    def _vectorizer_arrays(self, feature_extractor: FeatureExtractor) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+        vectorizer = feature_extractor.vectorizer
+        params = {
+            "hashing": feature_extractor.hashing,
+            "ngram_range": list(vectorizer.ngram_range),
+            "stop_words": vectorizer.stop_words,
+            "sublinear_tf": vectorizer.sublinear_tf,
+            "use_idf": vectorizer.use_idf,
+            "norm": vectorizer.norm,
+        }
+        arrays = {}
+        if feature_extractor.hashing:
+            params["n_features"] = vectorizer.n_features
+            params["n_documents"] = int(vectorizer.n_documents_)
+            arrays["document_frequency"] = vectorizer.document_frequency_
+            if vectorizer.idf_ is not None:
+                arrays["idf"] = vectorizer.idf_
+        else:
+            params["max_features"] = vectorizer.max_features
+            terms = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+            arrays["vocabulary"] = np.array(terms, dtype=str)
+            if vectorizer.use_idf:
+                arrays["idf"] = vectorizer.idf_
+        return params, arrays
+
+    def save(self, feature_extractor: FeatureExtractor, meme_model: MemeModel) -> bool:
+        """
+        Writes the bundle to a staging directory and swaps it into place, so readers never
+        see a half-written bundle. Returns whether the bundle was saved.
+        """
+        staging = f"{self.bundle_dir}.tmp-{os.getpid()}"
+        try:
+            shutil.rmtree(staging, ignore_errors=True)
+            os.makedirs(staging)
+            booster = meme_model.model.get_booster()
+            booster.save_model(os.path.join(staging, MODEL_FILE))
+            params, arrays = self._vectorizer_arrays(feature_extractor)
+            for name, array in arrays.items():
+                np.save(os.path.join(staging, f"{name}.npy"), np.ascontiguousarray(array))
+            files = [MODEL_FILE] + [f"{name}.npy" for name in arrays]
+            manifest = {
+                "format_version": FORMAT_VERSION,
+                "created_at": time.time(),
+                "versions": {"xgboost": xgb.__version__, "scikit-learn": sklearn.__version__,
+                             "numpy": np.__version__},
+                "vectorizer": params,
+                "model": {"num_features": booster.num_features(),
+                          "num_boosted_rounds": booster.num_boosted_rounds()},
+                "files": {name: {"sha256": file_sha256(os.path.join(staging, name)),
+                                 "bytes": os.path.getsize(os.path.join(staging, name))} for name in files},
+            }
+            with open(os.path.join(staging, MANIFEST_FILE), "w") as f:
+                json.dump(manifest, f, indent=2)
+            if os.path.exists(self.bundle_dir):
+                retired = f"{self.bundle_dir}.old-{os.getpid()}"
+                os.replace(self.bundle_dir, retired)
+                os.replace(staging, self.bundle_dir)
+                shutil.rmtree(retired, ignore_errors=True)
+            else:
+                os.makedirs(os.path.dirname(os.path.abspath(self.bundle_dir)), exist_ok=True)
+                os.replace(staging, self.bundle_dir)
+            logger.info(f"Artifact bundle saved to {self.bundle_dir}")
+            return True
+        except Exception as e:
+            shutil.rmtree(staging, ignore_errors=True)
+            logger.error(f"Error saving artifact bundle: {e}")
+            return False
+
+    def read_manifest(self) -> Dict[str, Any]:
+        with open(self.manifest_path) as f:
+            manifest = json.load(f)
+        if manifest.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported bundle format version {manifest.get('format_version')}")
+        return manifest
+
+    def verify(self, manifest: Optional[Dict[str, Any]] = None, checksums: bool = False) -> None:
+        """
+        Raises ValueError if any bundled file is missing or differs in size from its manifest
+        entry. With `checksums` every file is also hashed and compared with its SHA-256, which
+        reads the whole bundle.
+        """
+        manifest = manifest or self.read_manifest()
+        for name, entry in manifest["files"].items():
+            path = os.path.join(self.bundle_dir, name)
+            if not os.path.exists(path) or os.path.getsize(path) != entry["bytes"]:
+                raise ValueError(f"Size mismatch for {path}")
+            if checksums and file_sha256(path) != entry["sha256"]:
+                raise ValueError(f"Checksum mismatch for {path}")
+
+    def _load_array(self, name: str, mmap: bool) -> np.ndarray:
+        return np.load(os.path.join(self.bundle_dir, f"{name}.npy"), mmap_mode="r" if mmap else None)
+
+    def _load_feature_extractor(self, params: Dict[str, Any], mmap: bool) -> FeatureExtractor:
+        ngram_range = tuple(params["ngram_range"])
+        if params["hashing"]:
+            feature_extractor = FeatureExtractor(ngram_range=ngram_range, hashing=True, n_features=params["n_features"])
+            vectorizer = feature_extractor.vectorizer
+            vectorizer.n_documents_ = params["n_documents"]
+            vectorizer.document_frequency_ = self._load_array("document_frequency", mmap)
+            if params["use_idf"]:
+                vectorizer.idf_ = self._load_array("idf", mmap)
+        else:
+            feature_extractor = FeatureExtractor(max_features=params["max_features"], ngram_range=ngram_range)
+            vectorizer = feature_extractor.vectorizer
+            # The term dictionary is built in memory either way, so mapping the array gains nothing
+            terms = self._load_array("vocabulary", mmap=False)
+            vectorizer.vocabulary_ = dict(zip(terms.tolist(), range(len(terms))))
+            vectorizer.fixed_vocabulary_ = False
+            vectorizer.use_idf = params["use_idf"]
+            if params["use_idf"]:
+                vectorizer.idf_ = self._load_array("idf", mmap)
+        vectorizer.stop_words = params["stop_words"]
+        vectorizer.sublinear_tf = params["sublinear_tf"]
+        vectorizer.norm = params["norm"]
+        return feature_extractor
+
+    def load(self, mmap: bool = True, verify: bool = True, checksums: bool = False,
+             model_path: str = "models/meme_model.joblib") -> Optional[Tuple[FeatureExtractor, MemeModel]]:
+        """
+        Loads the feature extractor and model, first checking file sizes when `verify` is set
+        and also SHA-256 checksums when `checksums` is set (see `verify`). Returns None if the
+        bundle is missing, corrupt or of an unknown format version.
+        """
+        try:
+            manifest = self.read_manifest()
+            if verify:
+                self.verify(manifest, checksums=checksums)
+            if manifest["versions"]["xgboost"] != xgb.__version__:
+                logger.warning(f"Bundle was written by xgboost {manifest['versions']['xgboost']}, "
+                               f"running {xgb.__version__}")
+            feature_extractor = self._load_feature_extractor(manifest["vectorizer"], mmap)
+            meme_model = MemeModel(model_path=model_path)
+            meme_model._attach_booster(xgb.Booster(model_file=os.path.join(self.bundle_dir, MODEL_FILE)))
+            logger.info(f"Artifact bundle loaded from {self.bundle_dir}")
+            return feature_extractor, meme_model
+        except Exception as e:
+            logger.error(f"Error loading artifact bundle: {e}")
+            return None
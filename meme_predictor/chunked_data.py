@@ -0,0 +1,99 @@
+import glob
+import json
+import logging
+import os
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple, Union
+import numpy as np
+import scipy.sparse as sp
+import xgboost as xgb
+
+logger = logging.getLogger(__name__)
+
+Chunk = Tuple[Any, Any]
+ChunkSource = Union[Iterable[Chunk], Callable[[], Iterable[Chunk]]]
+
+def iterate_chunks(source: ChunkSource) -> Iterator[Chunk]:
+    """
+    Starts a fresh pass over a chunk source: a re-iterable (list, ChunkCache) or a callable returning one.
+    """
+    return iter(source() if callable(source) else source)
+
+class ChunkIterator(xgb.DataIter):
+    def __init__(self, source: ChunkSource, cache_prefix: Optional[str] = None):
+        """
+        Feeds `(X, y)` chunks to XGBoost one at a time. XGBoost may make several passes,
+        so `source` must be re-iterable. With `cache_prefix`, XGBoost builds an
+        external-memory DMatrix whose pages live under that prefix.
+        """
+        self._source = source
+        self._iterator = None
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data: Callable) -> int:
+        if self._iterator is None:
+            self._iterator = iterate_chunks(self._source)
+        try:
+            X, y = next(self._iterator)
+        except StopIteration:
+            return 0
+        input_data(data=X, label=y)
+        return 1
+
+    def reset(self) -> None:
+        self._iterator = None
+
+class ChunkCache:
+    def __init__(self, cache_dir: str):
+        """
+        On-disk copy of a chunk stream: one compressed sparse `.npz` of features and one `.npy`
+        of labels per chunk, plus a manifest written last, so a re-run can replay the stream
+        from disk without re-featurizing and only an interrupted write is ever rebuilt.
+        """
+        self.cache_dir = cache_dir
+        self.manifest_path = os.path.join(cache_dir, "manifest.json")
+
+    @property
+    def complete(self) -> bool:
+        return os.path.exists(self.manifest_path)
+
+    @property
+    def key(self) -> Optional[str]:
+        """
+        The key the cached stream was written with, or None.
+        """
+        with open(self.manifest_path) as f:
+            return json.load(f).get("key")
+
+    def clear(self) -> None:
+        """
+        Removes the cached stream, manifest first so a partial removal never looks complete.
+        """
+        if self.complete:
+            os.remove(self.manifest_path)
+        for name in glob.glob(os.path.join(self.cache_dir, "chunk_*")):
+            os.remove(name)
+
+    def write(self, chunks: Iterable[Chunk], key: Optional[str] = None) -> None:
+        """
+        Writes a single pass over `chunks` to disk, holding one chunk in memory at a time.
+        `key` (e.g. a dataset version) is stored in the manifest to detect stale caches.
+        """
+        self.clear()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        n_chunks = n_rows = 0
+        for X, y in chunks:
+            sp.save_npz(os.path.join(self.cache_dir, f"chunk_{n_chunks:06d}_X.npz"), sp.csr_matrix(X))
+            np.save(os.path.join(self.cache_dir, f"chunk_{n_chunks:06d}_y.npy"), np.asarray(y))
+            n_chunks += 1
+            n_rows += X.shape[0]
+        with open(self.manifest_path, "w") as f:
+            json.dump({"n_chunks": n_chunks, "n_rows": n_rows, "key": key}, f)
+        logger.info(f"Cached {n_rows} rows in {n_chunks} chunks under {self.cache_dir}")
+
+    def __iter__(self) -> Iterator[Chunk]:
+        with open(self.manifest_path) as f:
+            n_chunks = json.load(f)["n_chunks"]
+        for i in range(n_chunks):
+            X = sp.load_npz(os.path.join(self.cache_dir, f"chunk_{i:06d}_X.npz"))
+            y = np.load(os.path.join(self.cache_dir, f"chunk_{i:06d}_y.npy"))
+            yield X, y
@@ -1,47 +1,92 @@
 import logging
 from sklearn.feature_extraction.text import TfidfVectorizer
-from typing import List, Any
+from typing import List, Any, Iterable, Iterator, Optional
 import joblib
+from meme_predictor.hashing_vectorizer import HashingTfidfVectorizer
+from monitoring.metrics import DOCUMENTS, stage_timer
+from preprocessing.shared_tokenizer import SharedTokenizer
 
 logger = logging.getLogger(__name__)
 
 class FeatureExtractor:
-    def __init__(self, max_features: int = 10000, ngram_range: tuple = (1, 2)):
+    def __init__(self, max_features: int = 10000, ngram_range: tuple = (1, 2), hashing: bool = False,
+                 n_features: int = 2 ** 20):
         """
         Initializes the feature extractor with the specified parameters.
+        With `hashing=True` features are hashed into `n_features` columns instead of a fitted
+        vocabulary (`max_features` is unused), so featurization is stateless apart from IDF
+        weights and can be sharded across processes or streamed in chunks.
         """
-        self.vectorizer = TfidfVectorizer(
-            max_features=max_features,
-            ngram_range=ngram_range,
-            stop_words='english',
-            sublinear_tf=True
-        )
-        logger.info("FeatureExtractor initialized with TfidfVectorizer")
+        self.hashing = hashing
+        if hashing:
+            self.vectorizer = HashingTfidfVectorizer(
+                n_features=n_features,
+                ngram_range=ngram_range,
+                stop_words='english',
+                sublinear_tf=True
+            )
+        else:
+            self.vectorizer = TfidfVectorizer(
+                max_features=max_features,
+                ngram_range=ngram_range,
+                stop_words='english',
+                sublinear_tf=True
+            )
+        logger.info(f"FeatureExtractor initialized with {type(self.vectorizer).__name__}")
 
-    def fit_transform(self, documents: List[str]) -> Any:
+    @stage_timer("features_fit")
+    def fit_transform(self, documents: List[str], shared_tokens: Optional[SharedTokenizer] = None) -> Any:
         """
         Extracts and fits TF-IDF features from the provided documents.
+        With `shared_tokens` fitted on the same documents, features are derived from its cached
+        counts instead of tokenizing the documents again (hashing mode hashes the documents).
         """
         try:
-            features = self.vectorizer.fit_transform(documents)
+            if shared_tokens is not None and not self.hashing:
+                features = shared_tokens.tfidf_for(self.vectorizer)
+            else:
+                features = self.vectorizer.fit_transform(documents)
+            DOCUMENTS.inc(features.shape[0], stage="features_fit")
             logger.debug("Features extracted and vectorizer fitted.")
             return features
         except Exception as e:
             logger.error(f"Error in fit_transform: {e}")
             return None
 
+    @stage_timer("features_transform")
     def transform(self, documents: List[str]) -> Any:
         """
         Transforms new documents using the fitted vectorizer.
         """
         try:
             features = self.vectorizer.transform(documents)
+            DOCUMENTS.inc(features.shape[0], stage="features_transform")
             logger.debug("New data transformed using existing vectorizer.")
             return features
         except Exception as e:
             logger.error(f"Error in transform: {e}")
             return None
 
+    def fit_chunks(self, chunks: Iterable[List[str]], n_jobs: int = 1) -> None:
+        """
+        Fits IDF weights over a stream of document chunks in hashing mode, using `n_jobs` processes.
+        """
+        if not self.hashing:
+            raise ValueError("fit_chunks requires FeatureExtractor(hashing=True)")
+        try:
+            self.vectorizer.partial_fit_chunks(chunks, n_jobs=n_jobs)
+            logger.debug(f"IDF weights fitted on {self.vectorizer.n_documents_} documents.")
+        except Exception as e:
+            logger.error(f"Error in fit_chunks: {e}")
+
+    def transform_chunks(self, chunks: Iterable[List[str]], n_jobs: int = 1) -> Iterator[Any]:
+        """
+        Yields a CSR feature matrix per chunk of documents in hashing mode, using `n_jobs` processes.
+        """
+        if not self.hashing:
+            raise ValueError("transform_chunks requires FeatureExtractor(hashing=True)")
+        return self.vectorizer.transform_chunks(chunks, n_jobs=n_jobs)
+
     def save_vectorizer(self, filepath: str) -> None:
         """
         Saves the fitted vectorizer to a file.
@@ -0,0 +1,140 @@
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+logger = logging.getLogger(__name__)
+
+_worker_vectorizer = None
+
+def _init_worker(vectorizer: "HashingTfidfVectorizer") -> None:
+    global _worker_vectorizer
+    _worker_vectorizer = vectorizer
+
+def _transform_in_worker(documents: List[str]) -> sp.csr_matrix:
+    return _worker_vectorizer.transform(documents)
+
+def _count_in_worker(documents: List[str]) -> Tuple[np.ndarray, int]:
+    return _worker_vectorizer.document_frequency(documents), len(documents)
+
+def _ordered_map(executor: ProcessPoolExecutor, fn, chunks: Iterable[List[str]], max_in_flight: int) -> Iterator:
+    """
+    Like `executor.map`, but only pulls `max_in_flight` chunks ahead of the consumer so
+    an unbounded chunk iterator never has to be materialized.
+    """
+    pending = []
+    for chunk in chunks:
+        pending.append(executor.submit(fn, chunk))
+        if len(pending) >= max_in_flight:
+            yield pending.pop(0).result()
+    for future in pending:
+        yield future.result()
+
+class HashingTfidfVectorizer:
+    def __init__(self, n_features: int = 2 ** 20, ngram_range: tuple = (1, 2), stop_words: str = 'english',
+                 sublinear_tf: bool = True, use_idf: bool = True, norm: Optional[str] = 'l2'):
+        """
+        TF-IDF over a hashed feature space. Tokenization is stateless, so any process can
+        transform documents without a fitted vocabulary; the only learned state is the
+        document frequency per hashed column, which can be accumulated chunk by chunk.
+        """
+        self.n_features = n_features
+        self.ngram_range = ngram_range
+        self.stop_words = stop_words
+        self.sublinear_tf = sublinear_tf
+        self.use_idf = use_idf
+        self.norm = norm
+        self.hasher = HashingVectorizer(
+            n_features=n_features, ngram_range=ngram_range, stop_words=stop_words,
+            alternate_sign=False, norm=None, dtype=np.float32
+        )
+        self.n_documents_ = 0
+        self.document_frequency_ = np.zeros(n_features, dtype=np.int64)
+        self.idf_: Optional[np.ndarray] = None
+
+    def document_frequency(self, documents: List[str]) -> np.ndarray:
+        """
+        Number of documents each hashed column occurs in.
+        """
+        counts = self.hasher.transform(documents)
+        return np.bincount(counts.indices, minlength=self.n_features)
+
+    def _update_idf(self, document_frequency: np.ndarray, n_documents: int) -> None:
+        # Not in place: a loaded bundle maps these counts read-only.
+        self.document_frequency_ = self.document_frequency_ + document_frequency
+        self.n_documents_ += n_documents
+        # Smoothed IDF, as computed by scikit-learn's TfidfTransformer.
+        self.idf_ = (np.log((1 + self.n_documents_) / (1 + self.document_frequency_)) + 1).astype(np.float32)
+
+    def partial_fit(self, documents: List[str]) -> "HashingTfidfVectorizer":
+        """
+        Adds a chunk of documents to the IDF statistics.
+        """
+        if self.use_idf:
+            self._update_idf(self.document_frequency(documents), len(documents))
+        return self
+
+    def fit(self, documents: List[str]) -> "HashingTfidfVectorizer":
+        """
+        Fits IDF weights from scratch on the documents.
+        """
+        self.n_documents_ = 0
+        self.document_frequency_ = np.zeros(self.n_features, dtype=np.int64)
+        return self.partial_fit(documents)
+
+    def _weight(self, counts: sp.csr_matrix) -> sp.csr_matrix:
+        if self.sublinear_tf:
+            np.log(counts.data, counts.data)
+            counts.data += 1
+        if self.use_idf:
+            if self.idf_ is None:
+                raise ValueError("IDF weights have not been fitted")
+            counts.data *= self.idf_[counts.indices]
+        if self.norm:
+            counts = normalize(counts, norm=self.norm, copy=False)
+        return counts
+
+    def transform(self, documents: List[str]) -> sp.csr_matrix:
+        """
+        Returns the weighted CSR feature matrix for the documents.
+        """
+        return self._weight(self.hasher.transform(documents))
+
+    def fit_transform(self, documents: List[str]) -> sp.csr_matrix:
+        """
+        Fits IDF weights on the documents and returns their feature matrix, hashing them only once.
+        """
+        counts = self.hasher.transform(documents)
+        if self.use_idf:
+            self.n_documents_ = 0
+            self.document_frequency_ = np.zeros(self.n_features, dtype=np.int64)
+            self._update_idf(np.bincount(counts.indices, minlength=self.n_features), counts.shape[0])
+        return self._weight(counts)
+
+    def partial_fit_chunks(self, chunks: Iterable[List[str]], n_jobs: int = 1) -> "HashingTfidfVectorizer":
+        """
+        Accumulates IDF statistics over a stream of document chunks, hashing them in
+        `n_jobs` worker processes. Only one chunk per worker is held in memory at a time.
+        """
+        if n_jobs <= 1:
+            for chunk in chunks:
+                self.partial_fit(chunk)
+            return self
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(self,)) as executor:
+            for document_frequency, n_documents in _ordered_map(executor, _count_in_worker, chunks, 2 * n_jobs):
+                self._update_idf(document_frequency, n_documents)
+        return self
+
+    def transform_chunks(self, chunks: Iterable[List[str]], n_jobs: int = 1) -> Iterator[sp.csr_matrix]:
+        """
+        Yields one CSR feature matrix per chunk, in order, transforming in `n_jobs` worker processes.
+        """
+        if n_jobs <= 1:
+            for chunk in chunks:
+                yield self.transform(chunk)
+            return
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(self,)) as executor:
+            yield from _ordered_map(executor, _transform_in_worker, chunks, 2 * n_jobs)
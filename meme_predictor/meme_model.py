@@ -1,16 +1,31 @@
+import contextlib
+import glob
 import logging
+import os
+import re
+import tempfile
+import numpy as np
+import scipy.sparse as sp
+import xgboost as xgb
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report
 from xgboost import XGBClassifier
 import joblib
-from typing import Any
+from typing import Any, Callable, Optional, Tuple
+from meme_predictor.chunked_data import ChunkCache, ChunkIterator, ChunkSource
+from monitoring.metrics import DOCUMENTS, stage_timer
 
 logger = logging.getLogger(__name__)
 
 class MemeModel:
-    def __init__(self, model_path: str = "models/meme_model.joblib"):
+    def __init__(self, model_path: str = "models/meme_model.joblib", n_jobs: Optional[int] = None,
+                 tree_method: str = "hist", update_trees: int = 30, max_trees: int = 600,
+                 refit_every: int = 12, keep_checkpoints: int = 5):
         """
         Initializes the meme prediction model with specified parameters.
+        `update` adds `update_trees` trees per call and falls back to a full refit every
+        `refit_every` updates or once the booster would exceed `max_trees` trees.
+        The newest `keep_checkpoints` boosters are kept next to `model_path`.
         """
         self.model = XGBClassifier(
             n_estimators=300,
@@ -20,14 +35,23 @@ class MemeModel:
             colsample_bytree=0.7,
             objective='binary:logistic',
             eval_metric='logloss',
-            use_label_encoder=False
+            use_label_encoder=False,
+            tree_method=tree_method,
+            n_jobs=n_jobs
         )
         self.model_path = model_path
+        self.n_jobs = n_jobs
+        self.update_trees = update_trees
+        self.max_trees = max_trees
+        self.refit_every = refit_every
+        self.keep_checkpoints = keep_checkpoints
+        self.checkpoint_dir = f"{os.path.splitext(model_path)[0]}_checkpoints"
         logger.info("MemeModel initialized with XGBoost classifier")
 
-    def train(self, X: Any, y: Any) -> None:
+    @stage_timer("model_train")
+    def train(self, X: Any, y: Any) -> bool:
         """
-        Trains the meme prediction model.
+        Trains the meme prediction model. Returns False (after logging) if training failed.
         """
         try:
             X_train, X_val, y_train, y_val = train_test_split(
@@ -42,21 +66,205 @@ class MemeModel:
             predictions = self.model.predict(X_val)
             report = classification_report(y_val, predictions)
             logger.info(f"Training completed successfully\n{report}")
+            return True
         except Exception as e:
             logger.error(f"Error training meme prediction model: {e}")
+            return False
 
+    def _booster_params(self, n_jobs: Optional[int] = None) -> dict:
+        """
+        Native booster parameters equivalent to the configured XGBClassifier, using the histogram method.
+        """
+        params = {k: v for k, v in self.model.get_xgb_params().items() if v is not None}
+        params["tree_method"] = "hist"
+        if n_jobs is not None:
+            params["nthread"] = n_jobs
+        return params
+
+    def _attach_booster(self, booster: xgb.Booster) -> None:
+        """
+        Installs a natively trained booster into the sklearn wrapper so predict/save keep working.
+        """
+        self.model._Booster = booster
+        self.model.n_classes_ = 2
+        self.model.classes_ = np.array([0, 1])
+
+    @stage_timer("model_train_chunks")
+    def train_chunks(self, chunks: ChunkSource, eval_set: Optional[Tuple[Any, Any]] = None,
+                     external_memory: bool = False, cache_dir: Optional[str] = None,
+                     n_jobs: Optional[int] = None, max_bin: int = 256, cache_key: Optional[str] = None) -> bool:
+        """
+        Trains on a stream of `(X, y)` chunks without materializing the full matrix.
+        By default the chunks are quantized into a compact QuantileDMatrix; with
+        `external_memory=True` XGBoost pages the data through disk instead.
+        With `cache_dir`, the first run writes the chunks to disk and later runs replay them
+        from there, so `chunks` may be a one-shot generator and is not re-featurized;
+        otherwise `chunks` must be re-iterable (a list or a callable returning an iterator).
+        `cache_key` identifies the data (e.g. a dataset version): a cache written under a
+        different key is rebuilt from `chunks`. Returns False (after logging) if training failed.
+        """
+        try:
+            source = chunks
+            if cache_dir is not None:
+                cache = ChunkCache(os.path.join(cache_dir, "chunks"))
+                if cache.complete and cache.key != cache_key:
+                    logger.warning(f"Chunk cache in {cache.cache_dir} was written for key {cache.key!r}, "
+                                   f"not {cache_key!r}; rebuilding it")
+                if not cache.complete or cache.key != cache_key:
+                    cache.write(chunks() if callable(chunks) else chunks, key=cache_key)
+                elif cache_key is None:
+                    logger.warning(f"Replaying the chunks cached in {cache.cache_dir}; the chunks passed in are "
+                                   f"not read. Pass cache_key to rebuild the cache when the data changes.")
+                else:
+                    logger.info(f"Replaying the chunks cached in {cache.cache_dir} for key {cache_key!r}")
+                source = cache
+            with contextlib.ExitStack() as stack:
+                if external_memory:
+                    if cache_dir:
+                        pages_dir = os.path.join(cache_dir, "pages")
+                        os.makedirs(pages_dir, exist_ok=True)
+                    else:
+                        # Pages are only needed while training; remove them afterwards
+                        pages_dir = stack.enter_context(tempfile.TemporaryDirectory(prefix="meme_xgb_"))
+                    dtrain = xgb.DMatrix(ChunkIterator(source, cache_prefix=os.path.join(pages_dir, "train")),
+                                         nthread=n_jobs)
+                else:
+                    dtrain = xgb.QuantileDMatrix(ChunkIterator(source), max_bin=max_bin, nthread=n_jobs)
+                params = self._booster_params(n_jobs)
+                params["max_bin"] = max_bin
+                evals = []
+                if eval_set is not None:
+                    evals = [(xgb.DMatrix(eval_set[0], label=eval_set[1], nthread=n_jobs), "validation")]
+                booster = xgb.train(
+                    params, dtrain, num_boost_round=self.model.n_estimators, evals=evals,
+                    early_stopping_rounds=20 if evals else None, verbose_eval=False
+                )
+                n_rows = dtrain.num_row()
+                del dtrain
+            self._attach_booster(booster)
+            logger.info(f"Chunked training completed on {n_rows} rows with {booster.num_boosted_rounds()} trees")
+            return True
+        except Exception as e:
+            logger.error(f"Error training meme prediction model on chunks: {e}")
+            return False
+
+    def _current_booster(self) -> Optional[xgb.Booster]:
+        try:
+            return self.model.get_booster()
+        except Exception:
+            return None
+
+    def needs_full_refit(self) -> bool:
+        """
+        Whether the next `update` will retrain from scratch instead of adding trees.
+        """
+        booster = self._current_booster()
+        if booster is None:
+            return True
+        updates = int(booster.attr("updates_since_refit") or 0)
+        return updates >= self.refit_every or booster.num_boosted_rounds() + self.update_trees > self.max_trees
+
+    @stage_timer("model_update")
+    def update(self, X: Any, y: Any, full_data: Optional[Callable[[], Tuple[Any, Any]]] = None) -> bool:
+        """
+        Continues training the current booster on new data by adding `update_trees` trees,
+        then writes a versioned checkpoint. When a full refit is due (see `needs_full_refit`)
+        the model is retrained from scratch on `full_data()` if given, else on `X, y`.
+        Warm starts assume the feature columns mean the same thing across calls, i.e. a
+        fixed fitted vectorizer or the hashing mode of FeatureExtractor.
+        Returns False (after logging) if the update or refit failed.
+        """
+        try:
+            if self.needs_full_refit():
+                X_full, y_full = full_data() if full_data is not None else (X, y)
+                if not self.train(X_full, y_full):
+                    return False
+                updates = 0
+            else:
+                booster = self.model.get_booster()
+                updates = int(booster.attr("updates_since_refit") or 0) + 1
+                if booster.attr("best_iteration") is not None:
+                    # Continue from the early-stopped model, not the trees trained past it.
+                    booster = booster[:int(booster.attr("best_iteration")) + 1]
+                    booster.set_attr(best_iteration=None, best_ntree_limit=None, best_score=None)
+                dtrain = xgb.DMatrix(X, label=y, nthread=self.n_jobs)
+                booster = xgb.train(self._booster_params(self.n_jobs), dtrain,
+                                    num_boost_round=self.update_trees, xgb_model=booster)
+                self._attach_booster(booster)
+                logger.info(f"Model updated with {self.update_trees} trees on {dtrain.num_row()} rows "
+                            f"({booster.num_boosted_rounds()} trees total)")
+            self.model.get_booster().set_attr(updates_since_refit=str(updates))
+            self.save_checkpoint()
+            return True
+        except Exception as e:
+            logger.error(f"Error updating meme prediction model: {e}")
+            return False
+
+    def _checkpoints(self) -> list:
+        return sorted(glob.glob(os.path.join(self.checkpoint_dir, "v*.ubj")))
+
+    def save_checkpoint(self) -> Optional[str]:
+        """
+        Saves the booster as the next numbered checkpoint in native UBJSON format and prunes old ones.
+        """
+        try:
+            os.makedirs(self.checkpoint_dir, exist_ok=True)
+            existing = self._checkpoints()
+            version = int(re.search(r"v(\d+)\.ubj$", existing[-1]).group(1)) + 1 if existing else 1
+            path = os.path.join(self.checkpoint_dir, f"v{version:05d}.ubj")
+            self.model.get_booster().save_model(path)
+            for stale in self._checkpoints()[:-self.keep_checkpoints]:
+                os.remove(stale)
+            logger.info(f"Model checkpoint saved to {path}")
+            return path
+        except Exception as e:
+            logger.error(f"Error saving model checkpoint: {e}")
+            return None
+
+    def load_latest_checkpoint(self) -> bool:
+        """
+        Loads the newest checkpoint, if any, so `update` continues from it. Returns whether one was loaded.
+        """
+        try:
+            checkpoints = self._checkpoints()
+            if not checkpoints:
+                return False
+            self._attach_booster(xgb.Booster(model_file=checkpoints[-1]))
+            logger.info(f"Model checkpoint loaded from {checkpoints[-1]}")
+            return True
+        except Exception as e:
+            logger.error(f"Error loading model checkpoint: {e}")
+            return False
+
+    @stage_timer("model_predict")
     def predict(self, X: Any) -> Any:
         """
         Makes predictions about meme success with probability scores.
         """
         try:
             predictions = self.model.predict_proba(X)[:, 1]
+            DOCUMENTS.inc(len(predictions), stage="model_predict")
             logger.info("Meme prediction completed successfully")
             return predictions
         except Exception as e:
             logger.error(f"Error in meme prediction: {e}")
             return None
 
+    def predict_raw(self, X: Any) -> Any:
+        """
+        Success probabilities straight from the booster, skipping the sklearn wrapper.
+        Meant for small, latency-bound batches. Dense input goes through `inplace_predict`;
+        sparse input goes through a DMatrix, because XGBoost's in-place CSR path allocates
+        buffers sized to the full feature space and is far slower on wide TF-IDF matrices.
+        """
+        booster = self.model.get_booster()
+        best_iteration = booster.attr("best_iteration")
+        iteration_range = (0, int(best_iteration) + 1) if best_iteration is not None else (0, 0)
+        if sp.issparse(X):
+            return booster.predict(xgb.DMatrix(X, nthread=self.n_jobs), iteration_range=iteration_range,
+                                   validate_features=False)
+        return booster.inplace_predict(X, iteration_range=iteration_range, validate_features=False)
+
     def save_model(self) -> None:
         """
         Saves the trained model to a file.
@@ -0,0 +1,199 @@
+import itertools
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import xgboost as xgb
+from scipy.stats import loguniform, uniform
+from sklearn.metrics import log_loss, roc_auc_score
+from sklearn.model_selection import ParameterSampler, TimeSeriesSplit
+from meme_predictor.meme_model import MemeModel
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEARCH_SPACE = {
+    "max_depth": [3, 4, 6, 8, 10, 12],
+    "learning_rate": loguniform(0.02, 0.3),
+    "subsample": uniform(0.5, 0.5),
+    "colsample_bytree": uniform(0.5, 0.5),
+    "min_child_weight": [1, 3, 5, 10],
+    "reg_lambda": loguniform(0.1, 10.0),
+}
+
+_worker_state: Dict[str, Any] = {}
+
+def _init_worker(X: Any, y: np.ndarray, folds: List[Tuple[np.ndarray, np.ndarray]], max_bin: int, nthread: int) -> None:
+    """
+    Receives the data once per worker process; fold matrices are binned on first use and cached.
+    """
+    _worker_state.clear()
+    _worker_state.update(X=X, y=y, folds=folds, max_bin=max_bin, nthread=nthread, matrices={})
+
+def _fold_matrices(fold: int) -> Tuple[xgb.QuantileDMatrix, xgb.QuantileDMatrix]:
+    """
+    Quantile-binned train/validation matrices for a fold, built once per worker and reused by every trial.
+    """
+    matrices = _worker_state["matrices"]
+    if fold not in matrices:
+        X, y = _worker_state["X"], _worker_state["y"]
+        train_index, valid_index = _worker_state["folds"][fold]
+        nthread = _worker_state["nthread"]
+        dtrain = xgb.QuantileDMatrix(X[train_index], label=y[train_index], max_bin=_worker_state["max_bin"],
+                                     nthread=nthread)
+        dvalid = xgb.QuantileDMatrix(X[valid_index], label=y[valid_index], ref=dtrain, nthread=nthread)
+        matrices[fold] = (dtrain, dvalid)
+    return matrices[fold]
+
+def _single_row_latency(booster: xgb.Booster, row: Any, repeats: int = 20) -> float:
+    """
+    Median milliseconds to score one post, the way the scoring server does.
+    """
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        booster.predict(xgb.DMatrix(row, nthread=1), validate_features=False)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings) * 1000.0)
+
+def _evaluate(params: Dict[str, Any], num_rounds: int, metric: str) -> Dict[str, Any]:
+    """
+    Trains one configuration on every fold and returns its mean validation score, train time and latency.
+    """
+    scores, train_seconds, latencies = [], 0.0, []
+    y = _worker_state["y"]
+    for fold, (_, valid_index) in enumerate(_worker_state["folds"]):
+        dtrain, dvalid = _fold_matrices(fold)
+        start = time.perf_counter()
+        booster = xgb.train(params, dtrain, num_boost_round=num_rounds)
+        train_seconds += time.perf_counter() - start
+        probabilities = booster.predict(dvalid)
+        y_valid = y[valid_index]
+        if metric == "auc":
+            scores.append(roc_auc_score(y_valid, probabilities))
+        else:
+            scores.append(log_loss(y_valid, probabilities, labels=[0, 1]))
+        latencies.append(_single_row_latency(booster, _worker_state["X"][valid_index[:1]]))
+    return {
+        "score": float(np.mean(scores)),
+        "score_std": float(np.std(scores)),
+        "train_seconds": train_seconds,
+        "latency_ms": float(np.median(latencies)),
+    }
+
+class HyperparameterSearch:
+    def __init__(self, meme_model: Optional[MemeModel] = None, search_space: Optional[Dict[str, Any]] = None,
+                 n_candidates: int = 27, factor: int = 3, min_rounds: int = 30, max_rounds: int = 300,
+                 n_splits: int = 3, metric: str = "logloss", n_jobs: int = 1, threads_per_trial: int = 1,
+                 max_bin: int = 256, random_state: int = 42):
+        """
+        Randomized search over XGBoost parameters with successive halving: every candidate is
+        trained for `min_rounds` boosting rounds, the best `1 / factor` move on with `factor`
+        times the rounds, until one remains or `max_rounds` is reached. Each configuration is
+        scored by time-series cross-validation (later rows validate models fit on earlier ones,
+        so rows must be in time order). Trials run in `n_jobs` processes, each binning a fold's
+        matrices once and reusing them for every trial it runs.
+        `metric` is "logloss" (lower is better) or "auc" (higher is better).
+        """
+        if metric not in ("logloss", "auc"):
+            raise ValueError(f"Unsupported metric: {metric}")
+        self.meme_model = meme_model or MemeModel()
+        self.search_space = search_space or DEFAULT_SEARCH_SPACE
+        self.n_candidates = n_candidates
+        self.factor = factor
+        self.min_rounds = min_rounds
+        self.max_rounds = max_rounds
+        self.n_splits = n_splits
+        self.metric = metric
+        self.n_jobs = n_jobs
+        self.threads_per_trial = threads_per_trial
+        self.max_bin = max_bin
+        self.random_state = random_state
+        self.leaderboard: List[Dict[str, Any]] = []
+        self.best_params_: Optional[Dict[str, Any]] = None
+        self.best_rounds_: Optional[int] = None
+
+    def _trial_params(self, candidate: Dict[str, Any]) -> Dict[str, Any]:
+        params = self.meme_model._booster_params(self.threads_per_trial)
+        params.update(candidate)
+        params["max_bin"] = self.max_bin
+        params["eval_metric"] = self.metric
+        return params
+
+    def _run_rung(self, executor: Optional[ProcessPoolExecutor], candidates: List[Dict[str, Any]],
+                  num_rounds: int) -> List[Dict[str, Any]]:
+        trial_params = [self._trial_params(candidate) for candidate in candidates]
+        if executor is None:
+            results = [_evaluate(params, num_rounds, self.metric) for params in trial_params]
+        else:
+            futures = [executor.submit(_evaluate, params, num_rounds, self.metric) for params in trial_params]
+            results = [future.result() for future in futures]
+        return [dict(params=candidate, rounds=num_rounds, **result) for candidate, result in zip(candidates, results)]
+
+    def _rank_key(self, entry: Dict[str, Any]) -> float:
+        return -entry["score"] if self.metric == "auc" else entry["score"]
+
+    def fit(self, X: Any, y: Any) -> List[Dict[str, Any]]:
+        """
+        Runs the search and returns the leaderboard, best configuration first.
+        """
+        y = np.asarray(y)
+        folds = list(TimeSeriesSplit(n_splits=self.n_splits).split(np.zeros(len(y))))
+        candidates = [
+            {name: value.item() if isinstance(value, np.generic) else value for name, value in candidate.items()}
+            for candidate in ParameterSampler(self.search_space, self.n_candidates, random_state=self.random_state)
+        ]
+        init_args = (X, y, folds, self.max_bin, self.threads_per_trial)
+        executor = None
+        if self.n_jobs > 1:
+            executor = ProcessPoolExecutor(max_workers=self.n_jobs, initializer=_init_worker, initargs=init_args)
+        else:
+            _init_worker(*init_args)
+        self.leaderboard = []
+        try:
+            num_rounds = self.min_rounds
+            for rung in itertools.count():
+                entries = self._run_rung(executor, candidates, num_rounds)
+                for entry in entries:
+                    entry["rung"] = rung
+                entries.sort(key=self._rank_key)
+                self.leaderboard += entries
+                logger.info(f"Rung {rung}: {len(entries)} candidates at {num_rounds} rounds, "
+                            f"best {self.metric} {entries[0]['score']:.4f}")
+                if len(entries) == 1 or num_rounds >= self.max_rounds:
+                    break
+                candidates = [entry["params"] for entry in entries[:max(1, len(entries) // self.factor)]]
+                num_rounds = min(num_rounds * self.factor, self.max_rounds)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            _worker_state.clear()
+        self.leaderboard.sort(key=lambda entry: (-entry["rung"], self._rank_key(entry)))
+        self.best_params_ = self.leaderboard[0]["params"]
+        self.best_rounds_ = self.leaderboard[0]["rounds"]
+        return self.leaderboard
+
+    def apply_best(self) -> MemeModel:
+        """
+        Configures the wrapped MemeModel with the winning parameters and number of trees.
+        """
+        if self.best_params_ is None:
+            raise ValueError("Call fit before apply_best")
+        self.meme_model.model.set_params(n_estimators=self.best_rounds_, **self.best_params_)
+        return self.meme_model
+
+    def write_leaderboard(self, path: str) -> None:
+        """
+        Writes the leaderboard as JSON.
+        """
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(path, "w") as f:
+                json.dump({"metric": self.metric, "leaderboard": self.leaderboard}, f, indent=2)
+            logger.info(f"Leaderboard with {len(self.leaderboard)} trials written to {path}")
+        except Exception as e:
+            logger.error(f"Error writing leaderboard: {e}")
@@ -0,0 +1,241 @@
+import argparse
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from aiohttp import web
+from meme_predictor.artifact_bundle import ArtifactBundle
+from meme_predictor.feature_extractor import FeatureExtractor
+from meme_predictor.meme_model import MemeModel
+
+logger = logging.getLogger(__name__)
+
+class LatencyTracker:
+    def __init__(self, window: int = 10000):
+        """
+        Keeps the last `window` request latencies (milliseconds) for percentile reporting.
+        """
+        self.samples: deque = deque(maxlen=window)
+        self.count = 0
+
+    def record(self, milliseconds: float) -> None:
+        self.samples.append(milliseconds)
+        self.count += 1
+
+    def snapshot(self) -> Dict[str, float]:
+        """
+        Returns the request count and p50/p90/p99/max latency over the window.
+        """
+        if not self.samples:
+            return {"count": self.count}
+        p50, p90, p99 = np.percentile(np.fromiter(self.samples, dtype=np.float64), [50, 90, 99])
+        return {"count": self.count, "p50_ms": float(p50), "p90_ms": float(p90),
+                "p99_ms": float(p99), "max_ms": float(max(self.samples))}
+
+class MicroBatcher:
+    def __init__(self, score_batch: Callable[[List[str]], Sequence[float]], max_batch_size: int = 64,
+                 max_wait_ms: float = 2.0):
+        """
+        Coalesces concurrent single-text requests into one `score_batch` call. A batch is
+        scored as soon as it is full or `max_wait_ms` after its first request arrived,
+        so an idle server adds at most that much latency to a lone request. `score_batch`
+        runs in the loop's default executor so the event loop keeps accepting requests meanwhile.
+        """
+        self.score_batch = score_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.latency = LatencyTracker()
+        self.batches = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def submit(self, text: str) -> float:
+        """
+        Queues one text and waits for its score.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self) -> List[Tuple[str, asyncio.Future, float]]:
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            try:
+                texts = [text for text, _, _ in batch]
+                scores = await asyncio.get_running_loop().run_in_executor(None, self.score_batch, texts)
+                self.batches += 1
+                done = time.perf_counter()
+                for (_, future, queued_at), score in zip(batch, scores):
+                    self.latency.record((done - queued_at) * 1000.0)
+                    if not future.done():
+                        future.set_result(float(score))
+                if len(scores) != len(batch):
+                    raise ValueError(f"Got {len(scores)} scores for a batch of {len(batch)} texts")
+            except Exception as e:
+                logger.error(f"Error scoring batch of {len(batch)} texts: {e}")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+class ScoringServer:
+    def __init__(self, feature_extractor: FeatureExtractor, meme_model: MemeModel, max_batch_size: int = 64,
+                 max_wait_ms: float = 2.0, n_jobs: Optional[int] = 1):
+        """
+        Long-running HTTP scoring service around a fitted vectorizer and trained booster,
+        both loaded once. Concurrent requests are micro-batched and scored through
+        `MemeModel.predict_raw`. `n_jobs` caps booster threads; small batches gain little
+        from more and contend with the event loop.
+        """
+        self.feature_extractor = feature_extractor
+        self.meme_model = meme_model
+        if n_jobs is not None:
+            meme_model.model.get_booster().set_param({"nthread": n_jobs})
+        self.batcher = MicroBatcher(self.score_texts, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+        self._runner: Optional[web.AppRunner] = None
+
+    @classmethod
+    def from_paths(cls, vectorizer_path: str, model_path: str, **kwargs: Any) -> "ScoringServer":
+        """
+        Loads the vectorizer and model saved by `FeatureExtractor.save_vectorizer` and `MemeModel.save_model`.
+        """
+        feature_extractor = FeatureExtractor()
+        feature_extractor.load_vectorizer(vectorizer_path)
+        meme_model = MemeModel(model_path=model_path)
+        meme_model.load_model()
+        return cls(feature_extractor, meme_model, **kwargs)
+
+    @classmethod
+    def from_bundle(cls, bundle_dir: str, **kwargs: Any) -> "ScoringServer":
+        """
+        Loads the vectorizer and model from an `ArtifactBundle` (hashing-mode arrays stay memory-mapped).
+        """
+        loaded = ArtifactBundle(bundle_dir).load()
+        if loaded is None:
+            raise ValueError(f"Could not load artifact bundle from {bundle_dir}")
+        return cls(*loaded, **kwargs)
+
+    def score_texts(self, texts: List[str]) -> np.ndarray:
+        """
+        Featurizes and scores a batch of texts synchronously.
+        """
+        return self.meme_model.predict_raw(self.feature_extractor.vectorizer.transform(texts))
+
+    async def handle_score(self, request: web.Request) -> web.Response:
+        """
+        `POST /score` with `{"text": ...}` returns `{"score": ...}`; `{"texts": [...]}` returns `{"scores": [...]}`.
+        """
+        try:
+            payload = await request.json()
+        except ValueError:
+            return web.json_response({"error": "invalid JSON"}, status=400)
+        if not isinstance(payload, dict):
+            return web.json_response({"error": "expected a JSON object"}, status=400)
+        texts = payload.get("texts")
+        if texts is None and isinstance(payload.get("text"), str):
+            return web.json_response({"score": await self.batcher.submit(payload["text"])})
+        if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+            return web.json_response({"error": "expected 'text' or a list of 'texts'"}, status=400)
+        scores = await asyncio.gather(*(self.batcher.submit(text) for text in texts))
+        return web.json_response({"scores": list(scores)})
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        metrics = self.batcher.latency.snapshot()
+        metrics["batches"] = self.batcher.batches
+        return web.json_response(metrics)
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        return web.json_response({"status": "ok"})
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/score", self.handle_score)
+        app.router.add_get("/metrics", self.handle_metrics)
+        app.router.add_get("/health", self.handle_health)
+        app.on_startup.append(self._on_startup)
+        app.on_cleanup.append(self._on_cleanup)
+        return app
+
+    async def _on_startup(self, app: web.Application) -> None:
+        self.batcher.start()
+
+    async def _on_cleanup(self, app: web.Application) -> None:
+        await self.batcher.stop()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080, unix_path: Optional[str] = None) -> str:
+        """
+        Starts serving on a TCP port, or on a Unix socket when `unix_path` is given. Returns the bound address.
+        """
+        self._runner = web.AppRunner(self.build_app())
+        await self._runner.setup()
+        if unix_path is not None:
+            site = web.UnixSite(self._runner, unix_path)
+            await site.start()
+            address = unix_path
+        else:
+            site = web.TCPSite(self._runner, host, port)
+            await site.start()
+            address = "http://%s:%d" % site._server.sockets[0].getsockname()[:2]
+        logger.info(f"Scoring server listening on {address}")
+        return address
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+async def serve(args: argparse.Namespace) -> None:
+    options = dict(max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms, n_jobs=args.threads)
+    if args.bundle:
+        server = ScoringServer.from_bundle(args.bundle, **options)
+    else:
+        server = ScoringServer.from_paths(args.vectorizer, args.model, **options)
+    await server.start(host=args.host, port=args.port, unix_path=args.unix_socket)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve meme success scores over HTTP.")
+    parser.add_argument("--bundle", default=None, help="Artifact bundle directory; overrides --vectorizer/--model")
+    parser.add_argument("--vectorizer", default="models/vectorizer.joblib")
+    parser.add_argument("--model", default="models/meme_model.joblib")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--unix-socket", default=None)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--threads", type=int, default=1)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    asyncio.run(serve(parser.parse_args()))
@@ -0,0 +1,249 @@
+import asyncio
+import bisect
+import functools
+import logging
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+def _format_labels(key: LabelKey, extra: Iterable[Tuple[str, str]] = ()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str = ""):
+        """
+        Monotonic count per label set, e.g. requests or documents processed.
+        """
+        self.name = name
+        self.help = help
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(_label_key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{_format_labels(key)} {_format_value(value)}" for key, value in self._values.items()]
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        """
+        Sets the current value, e.g. a queue depth or a cache size.
+        """
+        with self._lock:
+            self._values[_label_key(labels)] = float(value)
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str = "", buckets: Iterable[float] = DEFAULT_BUCKETS, window: int = 2048):
+        """
+        Distribution of observations (usually seconds) in cumulative Prometheus buckets.
+        The last `window` observations per label set are also kept for exact local percentiles.
+        """
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self.window = window
+        self._series: Dict[LabelKey, Tuple[List[int], List[float], Deque[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0, 0], deque(maxlen=self.window))
+            counts, totals, recent = series
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            totals[0] += value
+            totals[1] += 1
+            recent.append(value)
+
+    def time(self, **labels: Any) -> "Timer":
+        return Timer(self, labels)
+
+    def count(self, **labels: Any) -> int:
+        series = self._series.get(_label_key(labels))
+        return 0 if series is None else int(series[1][1])
+
+    def snapshot(self, **labels: Any) -> Dict[str, float]:
+        """
+        Count and p50/p90/p99/max over the recent window, in the observed unit.
+        """
+        with self._lock:
+            series = self._series.get(_label_key(labels))
+            values = sorted(series[2]) if series is not None else []
+        if not values:
+            return {"count": 0}
+        pick = lambda q: values[min(len(values) - 1, int(q * len(values)))]
+        return {"count": self.count(**labels), "p50": pick(0.5), "p90": pick(0.9), "p99": pick(0.99),
+                "max": values[-1]}
+
+    def samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, (counts, (total, count), _) in self._series.items():
+                cumulative = 0
+                for bound, n in zip(self.buckets + (math.inf,), counts):
+                    cumulative += n
+                    lines.append(f"{self.name}_bucket{_format_labels(key, [('le', _format_value(bound))])} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(total)}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {int(count)}")
+        return lines
+
+class Timer:
+    def __init__(self, histogram: Histogram, labels: Dict[str, Any]):
+        """
+        Observes elapsed wall time into `histogram`; works as a context manager or as a
+        decorator on plain and async functions.
+        """
+        self.histogram = histogram
+        self.labels = labels
+        self.elapsed = 0.0
+
+    def __enter__(self) -> "Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.elapsed = time.perf_counter() - self._start
+        self.histogram.observe(self.elapsed, **self.labels)
+
+    def __call__(self, func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def timed_async(*args, **kwargs):
+                with Timer(self.histogram, self.labels):
+                    return await func(*args, **kwargs)
+            return timed_async
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            with Timer(self.histogram, self.labels):
+                return func(*args, **kwargs)
+        return timed
+
+class MetricsRegistry:
+    def __init__(self):
+        """
+        Named metrics of one process. Getting a metric that already exists returns it,
+        so modules can declare the metrics they use at import time.
+        """
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls: type, name: str, help: str, **kwargs: Any) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, **kwargs)
+            elif type(metric) is not cls:
+                raise ValueError(f"Metric {name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help: str = "") -> Counter:
+        return self._get(Counter, name, help)
+
+    def gauge(self, name: str, help: str = "") -> Gauge:
+        return self._get(Gauge, name, help)
+
+    def histogram(self, name: str, help: str = "", buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, buckets=buckets)
+
+    def get(self, name: str) -> Optional[Any]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """
+        All metrics in the Prometheus text exposition format (version 0.0.4).
+        """
+        lines = []
+        for name in sorted(self._metrics):
+            metric = self._metrics[name]
+            if metric.help:
+                lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines += metric.samples()
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+# Shared metrics used by the instrumented components.
+STAGE_SECONDS = REGISTRY.histogram("stage_seconds", "Wall time of one call of a processing stage")
+DOCUMENTS = REGISTRY.counter("documents_processed_total", "Documents processed per stage")
+REQUESTS = REGISTRY.counter("requests_total", "Outbound requests by service and outcome")
+REQUEST_SECONDS = REGISTRY.histogram("request_seconds", "Outbound request latency by service")
+CACHE_LOOKUPS = REGISTRY.counter("cache_lookups_total", "Cache lookups by cache and result (hit or miss)")
+
+def stage_timer(stage: str) -> Timer:
+    """
+    Timer for `stage_seconds{stage=...}`; use as `with stage_timer("trends"):` or as a decorator.
+    """
+    return STAGE_SECONDS.time(stage=stage)
+
+def record_cache(cache: str, hits: int, misses: int) -> None:
+    CACHE_LOOKUPS.inc(hits, cache=cache, result="hit")
+    CACHE_LOOKUPS.inc(misses, cache=cache, result="miss")
+
+class MetricsServer:
+    def __init__(self, registry: MetricsRegistry = REGISTRY):
+        """
+        Local HTTP endpoint serving the registry at GET /metrics for a Prometheus scraper.
+        """
+        self.registry = registry
+        self._runner: Optional[web.AppRunner] = None
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(text=self.registry.render(), content_type="text/plain", charset="utf-8",
+                            headers={"X-Content-Type-Options": "nosniff"})
+
+    async def start(self, host: str = "127.0.0.1", port: int = 9108) -> Tuple[str, int]:
+        """
+        Starts serving and returns the bound `(host, port)`; pass port 0 for an ephemeral port.
+        """
+        app = web.Application()
+        app.router.add_get("/metrics", self.handle_metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        address = site._server.sockets[0].getsockname()[:2]
+        logger.info(f"Serving metrics on http://{address[0]}:{address[1]}/metrics")
+        return address
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
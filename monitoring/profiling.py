@@ -0,0 +1,100 @@
+import cProfile
+import contextlib
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+class StackSampler:
+    def __init__(self, interval: float = 0.005, include_idle: bool = False):
+        """
+        Low-overhead sampling profiler covering every thread, including executor workers that
+        cProfile never sees. Every `interval` seconds it records each thread's Python stack;
+        `write_collapsed` emits the folded-stack format that flamegraph.pl, speedscope and
+        `py-spy record --format raw` use, so the output can be compared directly with py-spy.
+        """
+        self.interval = interval
+        self.include_idle = include_idle
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        me = threading.get_ident()
+        names: Dict[int, str] = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if not self.include_idle and stack and stack[0].startswith(("wait ", "select ", "_worker ", "sleep ")):
+                continue
+            self.stacks[";".join([names.get(ident, str(ident))] + stack[::-1])] += 1
+        self.samples += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> "StackSampler":
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def write_collapsed(self, path: str) -> None:
+        """
+        Writes one `frame;frame;frame count` line per distinct stack.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        logger.info(f"Wrote {len(self.stacks)} sampled stacks ({self.samples} samples) to {path}")
+
+@contextlib.contextmanager
+def profile_block(output_dir: str = "profiles", label: str = "cycle", sample_interval: float = 0.005,
+                  top: int = 25) -> Iterator[None]:
+    """
+    Profiles the enclosed block (meant for a single pipeline cycle): cProfile on the calling
+    thread, saved as `<label>-<time>.prof` for snakeviz/pstats, plus a `StackSampler` over all
+    threads saved as `<label>-<time>.folded`. The top functions by cumulative time are logged.
+    """
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    base = os.path.join(output_dir, f"{label}-{stamp}")
+    os.makedirs(output_dir, exist_ok=True)
+    profiler = cProfile.Profile()
+    sampler = StackSampler(interval=sample_interval).start()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        sampler.stop()
+        try:
+            profiler.dump_stats(f"{base}.prof")
+            sampler.write_collapsed(f"{base}.folded")
+            report = io.StringIO()
+            stats = pstats.Stats(profiler, stream=report)
+            stats.sort_stats("cumulative").print_stats(top)
+            logger.info(f"Profile of {label} written to {base}.prof; top {top} functions by cumulative time:\n"
+                        f"{report.getvalue()}")
+        except Exception as e:
+            logger.error(f"Error writing profile for {label}: {e}")
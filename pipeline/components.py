@@ -0,0 +1,193 @@
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from config.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+class Components:
+    def __init__(self, settings: Settings, continuous: bool = False, pretrained: bool = False,
+                 model_dir: str = "models", store_root: str = "data/documents", user_id: str = "user123",
+                 instances: Optional[Dict[str, Any]] = None):
+        """
+        Builds the pipeline components on first use: `components.sentiment` imports
+        transformers and loads the model the first time a stage needs it, and a process that
+        only ingests never imports the ML stack. Each component validates just the settings it
+        needs when it is built. With `pretrained=True` the model and vectorizer are loaded
+        together from the `ArtifactBundle` a training process published in `model_dir`, for
+        scoring-only processes (see `refresh_published`). `instances`
+        supplies ready-made components (shared clients, test doubles) instead of building them.
+        Building is thread-safe; every component is built at most once.
+        """
+        self.settings = settings
+        self.continuous = continuous
+        self.pretrained = pretrained
+        self.model_dir = model_dir
+        self.store_root = store_root
+        self.user_id = user_id
+        self._factories: Dict[str, Callable[[], Any]] = {
+            "api": self._api,
+            "deduplicator": self._deduplicator,
+            "store": self._store,
+            "trend_detector": self._trend_detector,
+            "sentiment": self._sentiment,
+            "feature_extractor": self._feature_extractor,
+            "meme_model": self._meme_model,
+            "recommender": self._recommender,
+            "user_profile": self._user_profile,
+            "solana": self._solana,
+            "subscriptions": self._subscriptions,
+        }
+        self._instances: Dict[str, Any] = dict(instances or {})
+        self._locks = {name: threading.Lock() for name in self._factories}
+        self._published_lock = threading.Lock()
+        self._published: Optional[Tuple[Any, Any]] = None
+        self.published_at: Optional[float] = None
+
+    @property
+    def model_path(self) -> str:
+        return os.path.join(self.model_dir, "meme_model.joblib")
+
+    @property
+    def bundle_dir(self) -> str:
+        return os.path.join(self.model_dir, "bundle")
+
+    def get(self, name: str) -> Any:
+        """
+        The named component, building it on first access.
+        """
+        if name in self._instances:
+            return self._instances[name]
+        if name not in self._factories:
+            raise KeyError(f"Unknown component '{name}', expected one of {sorted(self._factories)}")
+        with self._locks[name]:
+            if name not in self._instances:
+                self._instances[name] = self._factories[name]()
+                logger.debug(f"Built component {name}")
+        return self._instances[name]
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_") or name not in self._factories:
+            raise AttributeError(name)
+        return self.get(name)
+
+    @property
+    def loaded(self) -> List[str]:
+        return list(self._instances)
+
+    def preload(self, names: Iterable[str]) -> None:
+        """
+        Builds the named components now and loads their models, e.g. before forking workers.
+        """
+        for name in names:
+            component = self.get(name)
+            if hasattr(component, "load"):
+                component.load()
+
+    def _api(self) -> Any:
+        from data_collection.api_integrations import APIIntegrations
+        token, client_id, client_secret = self.settings.require(
+            "API collection", "twitter_bearer_token", "reddit_client_id", "reddit_client_secret"
+        )
+        return APIIntegrations(twitter_bearer_token=token, reddit_client_id=client_id,
+                               reddit_client_secret=client_secret)
+
+    def _deduplicator(self) -> Any:
+        from data_collection.deduplicator import Deduplicator
+        return Deduplicator()
+
+    def _store(self) -> Any:
+        from data_collection.document_store import DocumentStore
+        try:
+            return DocumentStore(self.store_root)
+        except ImportError as e:
+            logger.warning(f"Collected documents will not be persisted: {e}")
+            return None
+
+    def _trend_detector(self) -> Any:
+        from trend_analysis.trend_detector import TrendDetector
+        return TrendDetector()
+
+    def _sentiment(self) -> Any:
+        from trend_analysis.sentiment_analysis import SentimentAnalysis
+        return SentimentAnalysis()
+
+    def _load_published(self) -> Tuple[Any, Any]:
+        """
+        The published feature extractor and model, loaded from one bundle so they always match.
+        """
+        with self._published_lock:
+            if self._published is None:
+                from meme_predictor.artifact_bundle import ArtifactBundle
+                bundle = ArtifactBundle(self.bundle_dir)
+                if not os.path.exists(bundle.manifest_path):
+                    raise FileNotFoundError(f"No published model in {self.bundle_dir}")
+                # Read before loading: a bundle swapped in meanwhile then still counts as newer
+                published_at = bundle.read_manifest()["created_at"]
+                loaded = bundle.load(model_path=self.model_path)
+                if loaded is None:
+                    raise ValueError(f"Could not load the published model from {self.bundle_dir}")
+                self._published, self.published_at = loaded, published_at
+            return self._published
+
+    def refresh_published(self) -> bool:
+        """
+        Drops the pretrained feature extractor and model if a newer bundle was published since
+        they were loaded, so their next use loads it. Returns whether they were dropped.
+        """
+        if not self.pretrained or self._published is None:
+            return False
+        from meme_predictor.artifact_bundle import ArtifactBundle
+        try:
+            published_at = ArtifactBundle(self.bundle_dir).read_manifest()["created_at"]
+        except Exception as e:
+            logger.warning(f"Could not check {self.bundle_dir} for a newer model: {e}")
+            return False
+        if published_at == self.published_at:
+            return False
+        with self._published_lock:
+            self._published = None
+            for name in ("feature_extractor", "meme_model"):
+                self._instances.pop(name, None)
+        logger.info(f"A newer model was published in {self.bundle_dir}; reloading it")
+        return True
+
+    def _feature_extractor(self) -> Any:
+        if self.pretrained:
+            return self._load_published()[0]
+        from meme_predictor.feature_extractor import FeatureExtractor
+        # A hashed feature space keeps columns stable across cycles, so the model can be warm-started
+        return FeatureExtractor(hashing=self.continuous, n_features=2 ** 18)
+
+    def _meme_model(self) -> Any:
+        if self.pretrained:
+            return self._load_published()[1]
+        from meme_predictor.meme_model import MemeModel
+        return MemeModel(model_path=self.model_path)
+
+    def _recommender(self) -> Any:
+        from recommender.recommender_system import RecommenderSystem
+        return RecommenderSystem()
+
+    def _user_profile(self) -> Any:
+        from recommender.user_profile import UserProfile
+        return UserProfile(user_id=self.user_id)
+
+    def _solana(self) -> Any:
+        from blockchain_integration.solana_connector import SolanaConnector
+        rpc_url, = self.settings.require("Solana", "solana_rpc_url")
+        return SolanaConnector(rpc_url=rpc_url)
+
+    def _subscriptions(self) -> Any:
+        from blockchain_integration.subscriptions import SolanaSubscriptions, ws_url_for
+        rpc_url, = self.settings.require("Solana subscriptions", "solana_rpc_url")
+        return SolanaSubscriptions(self.settings.solana_ws_url or ws_url_for(rpc_url))
+
+    async def close(self) -> None:
+        """
+        Closes the network clients that were built.
+        """
+        for name in ("subscriptions", "api", "solana"):
+            if self._instances.get(name) is not None:
+                await self._instances[name].close()
@@ -0,0 +1,237 @@
+import asyncio
+import contextlib
+import functools
+import inspect
+import logging
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+from monitoring.metrics import REGISTRY
+from monitoring.profiling import profile_block
+
+logger = logging.getLogger(__name__)
+
+EXECUTORS = ("async", "thread", "process", "inline")
+
+PIPELINE_STAGE_SECONDS = REGISTRY.histogram("pipeline_stage_seconds", "Wall time of a pipeline stage per cycle")
+PIPELINE_FAILURES = REGISTRY.counter("pipeline_stage_failures_total", "Pipeline stages that failed or were skipped")
+
+class Stage:
+    def __init__(self, name: str, func: Callable[..., Any], inputs: Sequence[str] = (),
+                 outputs: Sequence[str] = (), executor: str = "thread"):
+        """
+        One step of a pipeline: `func(*inputs)` produces `outputs` (a single value for one
+        output, a tuple for several). `executor` says where it runs: "async" awaits a coroutine
+        on the event loop, "thread" and "process" run blocking work in the runner's pools via
+        `run_in_executor`, and "inline" calls it on the loop (only for trivial glue).
+        Process stages need a picklable, module-level `func` and picklable inputs.
+        """
+        if executor not in EXECUTORS:
+            raise ValueError(f"Unknown executor '{executor}' for stage {name}, expected one of {EXECUTORS}")
+        if executor == "async" and not inspect.iscoroutinefunction(func):
+            raise ValueError(f"Stage {name} uses the async executor but is not a coroutine function")
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.executor = executor
+
+    def __repr__(self) -> str:
+        return f"Stage({self.name!r}, {self.inputs} -> {self.outputs}, {self.executor})"
+
+def topological_order(stages: Sequence[Stage], initial: Iterable[str] = ()) -> List[Stage]:
+    """
+    Orders stages so every input is produced before it is consumed. Raises ValueError for
+    duplicate names or outputs, inputs nobody produces, and cycles.
+    """
+    producers: Dict[str, Stage] = {}
+    names = set()
+    for stage in stages:
+        if stage.name in names:
+            raise ValueError(f"Duplicate stage name '{stage.name}'")
+        names.add(stage.name)
+        for output in stage.outputs:
+            if output in producers or output in initial:
+                raise ValueError(f"Value '{output}' is produced more than once")
+            producers[output] = stage
+    available = set(initial)
+    ordered: List[Stage] = []
+    remaining = list(stages)
+    while remaining:
+        ready = [stage for stage in remaining if all(name in available for name in stage.inputs)]
+        if not ready:
+            missing = {name for stage in remaining for name in stage.inputs
+                       if name not in available and name not in producers}
+            if missing:
+                raise ValueError(f"No stage produces {sorted(missing)}")
+            raise ValueError(f"Pipeline has a cycle among {[stage.name for stage in remaining]}")
+        for stage in ready:
+            ordered.append(stage)
+            available.update(stage.outputs)
+            remaining.remove(stage)
+    return ordered
+
+class PipelineRunner:
+    def __init__(self, stages: Sequence[Stage], initial: Iterable[str] = (), thread_workers: Optional[int] = None,
+                 process_workers: int = 0, process_pool: Optional[Executor] = None):
+        """
+        Runs a DAG of stages, starting each one as soon as its inputs exist, so independent
+        stages (e.g. sentiment and topic modeling) overlap in the thread/process pools while
+        the event loop stays free for I/O. `initial` names the values passed to `run_once`.
+        When a stage fails its dependents are skipped; unrelated branches still complete.
+        `process_pool` runs process stages in an existing pool (e.g. `pipeline.prefork`
+        workers), which the runner does not shut down.
+        """
+        self.stages = topological_order(stages, initial)
+        self.initial = list(initial)
+        self.thread_workers = thread_workers
+        self.process_workers = process_workers
+        self.last_timings: Dict[str, float] = {}
+        self.last_failures: Dict[str, str] = {}
+        self.cycles = 0
+        self._threads: Optional[Executor] = None
+        self._processes: Optional[Executor] = None
+        self._external_processes = process_pool
+        self._stop: Optional[asyncio.Event] = None
+        self._profile_dir: Optional[str] = None
+
+    def _executor(self, kind: str) -> Executor:
+        if kind == "process" and self._external_processes is not None:
+            return self._external_processes
+        if kind == "process" and self.process_workers > 0:
+            if self._processes is None:
+                self._processes = ProcessPoolExecutor(max_workers=self.process_workers)
+            return self._processes
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(max_workers=self.thread_workers, thread_name_prefix="pipeline")
+        return self._threads
+
+    async def _run_stage(self, stage: Stage, args: List[Any]) -> Any:
+        if stage.executor == "async":
+            return await stage.func(*args)
+        if stage.executor == "inline":
+            return stage.func(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor(stage.executor), functools.partial(stage.func, *args))
+
+    async def _timed(self, stage: Stage, context: Dict[str, Any]) -> Any:
+        start = time.perf_counter()
+        try:
+            return await self._run_stage(stage, [context[name] for name in stage.inputs])
+        finally:
+            self.last_timings[stage.name] = time.perf_counter() - start
+            PIPELINE_STAGE_SECONDS.observe(self.last_timings[stage.name], stage=stage.name)
+
+    @staticmethod
+    def _store(stage: Stage, result: Any, context: Dict[str, Any]) -> None:
+        if len(stage.outputs) == 1:
+            context[stage.outputs[0]] = result
+        elif stage.outputs:
+            if len(result) != len(stage.outputs):
+                raise ValueError(f"Stage {stage.name} returned {len(result)} values for outputs {stage.outputs}")
+            context.update(zip(stage.outputs, result))
+
+    async def run_once(self, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Runs every stage once and returns the context of all produced values.
+        Per-stage wall times are left in `last_timings` and errors in `last_failures`.
+        """
+        context = dict(context or {})
+        missing = [name for name in self.initial if name not in context]
+        if missing:
+            raise ValueError(f"Missing initial pipeline values {missing}")
+        profile_dir, self._profile_dir = self._profile_dir, None
+        profiling = profile_block(profile_dir, label=f"cycle{self.cycles + 1}") if profile_dir else contextlib.nullcontext()
+        with profiling:
+            await self._run_cycle(context)
+        return context
+
+    def profile_next_cycle(self, output_dir: str = "profiles") -> None:
+        """
+        Profiles the next cycle only; see `monitoring.profiling.profile_block`.
+        """
+        self._profile_dir = output_dir
+
+    async def _run_cycle(self, context: Dict[str, Any]) -> None:
+        self.last_timings = {}
+        self.last_failures = {}
+        cycle_start = time.perf_counter()
+        pending = list(self.stages)
+        running: Dict[asyncio.Future, Stage] = {}
+        failed_values = set()
+        while pending or running:
+            for stage in list(pending):
+                if any(name in failed_values for name in stage.inputs):
+                    pending.remove(stage)
+                    failed_values.update(stage.outputs)
+                    self.last_failures[stage.name] = "skipped: an input failed"
+                    PIPELINE_FAILURES.inc(stage=stage.name, reason="skipped")
+                elif all(name in context for name in stage.inputs):
+                    pending.remove(stage)
+                    running[asyncio.ensure_future(self._timed(stage, context))] = stage
+            if not running:
+                break
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                try:
+                    self._store(stage, future.result(), context)
+                except Exception as e:
+                    logger.error(f"Pipeline stage {stage.name} failed: {e!r}")
+                    self.last_failures[stage.name] = repr(e)
+                    PIPELINE_FAILURES.inc(stage=stage.name, reason="error")
+                    failed_values.update(stage.outputs)
+        self.cycles += 1
+        self.last_timings["total"] = time.perf_counter() - cycle_start
+        PIPELINE_STAGE_SECONDS.observe(self.last_timings["total"], stage="total")
+        self.log_timings()
+
+    def log_timings(self) -> None:
+        """
+        Logs the wall time of every stage in the last cycle.
+        """
+        stages = ", ".join(f"{name}={seconds * 1000:.1f}ms" for name, seconds in self.last_timings.items()
+                           if name != "total")
+        logger.info(f"Pipeline cycle {self.cycles} took {self.last_timings.get('total', 0.0):.3f}s ({stages})")
+
+    async def run_forever(self, make_context: Callable[[], Dict[str, Any]], interval: float,
+                          max_cycles: Optional[int] = None,
+                          on_cycle: Optional[Callable[[Dict[str, Any]], Any]] = None) -> None:
+        """
+        Runs a cycle every `interval` seconds (measured start to start; a cycle that overruns
+        starts the next one immediately) until `stop()` is called or `max_cycles` have run.
+        A cycle that raises is logged and the schedule continues.
+        """
+        self._stop = asyncio.Event()
+        cycles = 0
+        while not self._stop.is_set() and (max_cycles is None or cycles < max_cycles):
+            started = time.monotonic()
+            try:
+                context = await self.run_once(make_context())
+                if on_cycle is not None:
+                    on_cycle(context)
+            except Exception as e:
+                logger.error(f"Pipeline cycle failed: {e!r}")
+            cycles += 1
+            if max_cycles is not None and cycles >= max_cycles:
+                break
+            try:
+                await asyncio.wait_for(self._stop.wait(), max(0.0, interval - (time.monotonic() - started)))
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self) -> None:
+        """
+        Asks `run_forever` to return after the current cycle.
+        """
+        if self._stop is not None:
+            self._stop.set()
+
+    def close(self) -> None:
+        """
+        Shuts down the worker pools.
+        """
+        for pool in (self._threads, self._processes):
+            if pool is not None:
+                pool.shutdown(wait=True)
+        self._threads = self._processes = None
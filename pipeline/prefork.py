@@ -0,0 +1,81 @@
+import functools
+import gc
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import Any, Callable, Optional, Sequence
+from pipeline.components import Components
+
+logger = logging.getLogger(__name__)
+
+# Components inherited by the forked workers; set in the parent just before forking.
+_components: Optional[Components] = None
+
+def call(name: str, method: str, *args: Any) -> Any:
+    """
+    Runs `method` of a pre-loaded component inside a worker.
+    """
+    return getattr(_components.get(name), method)(*args)
+
+class PreforkPool(Executor):
+    def __init__(self, components: Components, preload: Sequence[str], workers: int = 2):
+        """
+        Pool of worker processes forked after the `preload` components (and their models) are
+        loaded in the parent, so workers start warm in milliseconds and share the model
+        weights copy-on-write instead of each loading a private copy. The parent's heap is
+        moved to the permanent GC generation before forking so garbage collection in the
+        workers does not touch (and thereby copy) the shared pages. Requires the fork start
+        method (Linux/macOS). The parent must not have run threaded inference (torch/OpenMP)
+        before `start()`, since those runtimes do not survive a fork. The pool is itself an
+        executor, so a `PipelineRunner` keeps using it across `restart()`.
+        """
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise RuntimeError("Pre-forked workers require the fork start method")
+        self.components = components
+        self.preload = list(preload)
+        self.workers = workers
+        self.executor: Optional[ProcessPoolExecutor] = None
+
+    def start(self) -> "PreforkPool":
+        """
+        Loads the components and forks all workers, returning once every worker is up.
+        """
+        global _components
+        self.components.preload(self.preload)
+        _components = self.components
+        gc.collect()
+        gc.freeze()
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("fork"))
+        # With the fork start method the first submission forks every worker
+        self.executor.submit(os.getpid).result()
+        logger.info(f"Forked {self.workers} workers sharing {', '.join(self.preload) or 'no components'}")
+        return self
+
+    def restart(self) -> "PreforkPool":
+        """
+        Replaces the workers with fresh forks, e.g. after the parent dropped a component so that
+        `start()` loads a newer model.
+        """
+        self.close()
+        return self.start()
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+        if self.executor is None:
+            raise RuntimeError("The pre-forked workers are not running")
+        return self.executor.submit(fn, *args, **kwargs)
+
+    def task(self, name: str, method: str) -> Callable[..., Any]:
+        """
+        Picklable callable running `method` of component `name` in a worker, for process stages
+        of a `PipelineRunner` created with `process_pool=pool`.
+        """
+        if name not in self.preload:
+            logger.warning(f"Component {name} was not pre-loaded; every worker will load its own copy")
+        return functools.partial(call, name, method)
+
+    def close(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+        gc.unfreeze()
@@ -0,0 +1,90 @@
+import logging
+from typing import List, Optional, Tuple
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer, TfidfVectorizer
+
+logger = logging.getLogger(__name__)
+
+class SharedTokenizer:
+    def __init__(self, ngram_range: Tuple[int, int] = (1, 2), stop_words: str = 'english'):
+        """
+        Tokenizes each document once into an n-gram count matrix that several TF-IDF consumers
+        (TrendDetector, FeatureExtractor) can derive their own filtered, weighted matrices from.
+        """
+        self.vectorizer = CountVectorizer(ngram_range=ngram_range, stop_words=stop_words)
+        self.counts = None
+        self.feature_names = None
+        self._ngram_lengths = None
+
+    def fit(self, documents: List[str]) -> "SharedTokenizer":
+        """
+        Tokenizes the documents and caches their count matrix.
+        """
+        self.counts = self.vectorizer.fit_transform(documents).tocsc()
+        # Built straight from the vocabulary; get_feature_names_out re-sorts it and is far slower.
+        vocabulary = self.vectorizer.vocabulary_
+        terms = list(vocabulary.keys())
+        columns = np.fromiter(vocabulary.values(), dtype=np.int64, count=len(vocabulary))
+        self.feature_names = np.empty(len(terms), dtype=object)
+        self.feature_names[columns] = terms
+        self._ngram_lengths = np.empty(len(terms), dtype=np.int64)
+        self._ngram_lengths[columns] = np.fromiter((term.count(' ') + 1 for term in terms), dtype=np.int64, count=len(terms))
+        logger.debug(f"Tokenized {self.counts.shape[0]} documents into {self.counts.shape[1]} n-grams")
+        return self
+
+    @property
+    def n_documents(self) -> int:
+        return 0 if self.counts is None else self.counts.shape[0]
+
+    def select(self, ngram_range: Tuple[int, int] = (1, 1), min_df: float = 1, max_df: float = 1.0,
+               max_features: Optional[int] = None) -> Tuple[sp.csr_matrix, np.ndarray]:
+        """
+        Returns the count columns and feature names a CountVectorizer with these parameters
+        would have produced, pruned by document frequency exactly as scikit-learn does.
+        """
+        if self.counts is None:
+            raise ValueError("SharedTokenizer has not been fitted")
+        low, high = self.vectorizer.ngram_range
+        if ngram_range[0] < low or ngram_range[1] > high:
+            raise ValueError(f"ngram_range {ngram_range} is not covered by the shared tokens {self.vectorizer.ngram_range}")
+        columns = np.flatnonzero((self._ngram_lengths >= ngram_range[0]) & (self._ngram_lengths <= ngram_range[1]))
+        X = self.counts[:, columns]
+        n_docs = X.shape[0]
+        max_doc_count = max_df if isinstance(max_df, (int, np.integer)) else max_df * n_docs
+        min_doc_count = min_df if isinstance(min_df, (int, np.integer)) else min_df * n_docs
+        dfs = np.diff(X.indptr)
+        mask = (dfs <= max_doc_count) & (dfs >= min_doc_count)
+        if max_features is not None and mask.sum() > max_features:
+            tfs = np.asarray(X.sum(axis=0)).ravel()
+            keep = np.where(mask)[0][(-tfs[mask]).argsort()[:max_features]]
+            mask = np.zeros(len(dfs), dtype=bool)
+            mask[keep] = True
+        kept = np.flatnonzero(mask)
+        if not len(kept):
+            raise ValueError("After pruning, no terms remain. Try a lower min_df or a higher max_df.")
+        return X[:, kept].tocsr(), self.feature_names[columns[kept]]
+
+    def tfidf_for(self, vectorizer: TfidfVectorizer) -> sp.csr_matrix:
+        """
+        Computes the matrix `vectorizer.fit_transform(documents)` would return from the cached
+        tokens, and installs the resulting vocabulary and IDF weights on `vectorizer` so it can
+        `transform` new documents afterwards as if it had been fitted itself.
+        """
+        if vectorizer.stop_words != self.vectorizer.stop_words or vectorizer.analyzer != 'word' \
+                or vectorizer.token_pattern != self.vectorizer.token_pattern or not vectorizer.lowercase:
+            raise ValueError("Vectorizer tokenization does not match the shared tokenizer")
+        counts, names = self.select(
+            ngram_range=vectorizer.ngram_range, min_df=vectorizer.min_df,
+            max_df=vectorizer.max_df, max_features=vectorizer.max_features
+        )
+        transformer = TfidfTransformer(
+            norm=vectorizer.norm, use_idf=vectorizer.use_idf,
+            smooth_idf=vectorizer.smooth_idf, sublinear_tf=vectorizer.sublinear_tf
+        )
+        tfidf = transformer.fit_transform(counts.astype(vectorizer.dtype))
+        # Mirror the state TfidfVectorizer.fit leaves behind.
+        vectorizer.vocabulary_ = {name: index for index, name in enumerate(names)}
+        vectorizer.fixed_vocabulary_ = False
+        vectorizer._tfidf = transformer
+        return tfidf
@@ -0,0 +1,134 @@
+import logging
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Mapping, Sequence, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+def normalize_interest(name: str) -> str:
+    return " ".join(name.lower().split())
+
+class ProfileStore:
+    def __init__(self, path: str = "data/profiles.sqlite", cache_size: int = 100_000, ttl_seconds: float = 300.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        SQLite-backed user profiles. Interests are interned to integer IDs and each profile is
+        stored as one packed int32 array, so a cohort loads with a handful of `IN` queries.
+        Reads go through a bounded LRU cache whose entries expire after `ttl_seconds`.
+        """
+        self.path = path
+        self.cache_size = cache_size
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, np.ndarray]]" = OrderedDict()
+        self._interest_ids: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS interests (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS profiles (user_id TEXT PRIMARY KEY, interest_ids BLOB NOT NULL, updated_at REAL)"
+        )
+        self._db.commit()
+        self._interest_ids = {name: interest_id for interest_id, name in self._db.execute("SELECT id, name FROM interests")}
+
+    def interest_ids(self, names: Iterable[str]) -> np.ndarray:
+        """
+        Integer IDs of the given interests, assigning new IDs to unseen ones.
+        """
+        normalized = [normalize_interest(name) for name in names]
+        new = sorted({name for name in normalized if name and name not in self._interest_ids})
+        if new:
+            self._db.executemany("INSERT OR IGNORE INTO interests (name) VALUES (?)", [(name,) for name in new])
+            self._db.commit()
+            for start in range(0, len(new), 500):
+                chunk = new[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._db.execute(f"SELECT id, name FROM interests WHERE name IN ({placeholders})", chunk)
+                for interest_id, name in rows:
+                    self._interest_ids[name] = interest_id
+        return np.unique(np.array([self._interest_ids[name] for name in normalized if name], dtype=np.int32))
+
+    def interest_vocabulary(self) -> List[str]:
+        """
+        Interest names indexed by ID; index 0 is unused.
+        """
+        names = [""] * (max(self._interest_ids.values(), default=0) + 1)
+        for name, interest_id in self._interest_ids.items():
+            names[interest_id] = name
+        return names
+
+    def _remember(self, user_id: str, interest_ids: np.ndarray) -> None:
+        self._entries[user_id] = (self.clock() + self.ttl_seconds, interest_ids)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.cache_size:
+            self._entries.popitem(last=False)
+
+    def put_many(self, profiles: Mapping[str, Iterable[str]]) -> None:
+        """
+        Stores the interests of many users in a single transaction.
+        """
+        now = time.time()
+        profiles = {user_id: list(interests) for user_id, interests in profiles.items()}
+        # Intern every new interest up front, so the per-user encoding below never touches the database.
+        self.interest_ids(name for interests in profiles.values() for name in interests)
+        rows = []
+        for user_id, interests in profiles.items():
+            interest_ids = self.interest_ids(interests)
+            rows.append((user_id, interest_ids.tobytes(), now))
+            self._remember(user_id, interest_ids)
+        if rows:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO profiles (user_id, interest_ids, updated_at) VALUES (?, ?, ?)", rows
+            )
+            self._db.commit()
+
+    def get_many(self, user_ids: Sequence[str]) -> Dict[str, np.ndarray]:
+        """
+        Returns the interest IDs of whichever users have a stored profile.
+        """
+        found: Dict[str, np.ndarray] = {}
+        missing = []
+        now = self.clock()
+        for user_id in user_ids:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                found[user_id] = entry[1]
+            else:
+                missing.append(user_id)
+        self.hits += len(found)
+        self.misses += len(missing)
+        for start in range(0, len(missing), 500):
+            chunk = missing[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._db.execute(f"SELECT user_id, interest_ids FROM profiles WHERE user_id IN ({placeholders})", chunk)
+            for user_id, blob in rows:
+                found[user_id] = np.frombuffer(blob, dtype=np.int32)
+                self._remember(user_id, found[user_id])
+        return found
+
+    def get_preferences(self, user_id: str) -> Dict[str, List[str]]:
+        """
+        One user's preferences in the `{"interests": [...]}` form `UserProfile` exposes; empty if unknown.
+        """
+        interest_ids = self.get_many([user_id]).get(user_id)
+        if interest_ids is None:
+            return {}
+        names = self.interest_vocabulary()
+        return {"interests": [names[interest_id] for interest_id in interest_ids.tolist()]}
+
+    def close(self) -> None:
+        """
+        Closes the database connection.
+        """
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -1,13 +1,32 @@
 import logging
-from typing import List, Dict
+import re
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple
+import numpy as np
+import scipy.sparse as sp
+from sklearn.preprocessing import normalize
 
 logger = logging.getLogger(__name__)
 
+_TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lower-cased word tokens, split the same way as the trend vectorizers.
+    """
+    return _TOKEN_PATTERN.findall(text.lower())
+
 class RecommenderSystem:
-    def __init__(self):
+    def __init__(self, block_size: int = 65536):
         """
         Initializes the RecommenderSystem.
+        `index_trends` builds a token x trend index from structured topics; users are then
+        scored against every trend in one sparse product, `block_size` users at a time.
         """
+        self.block_size = block_size
+        self.vocabulary: Dict[str, int] = {}
+        self.trend_ids = np.zeros(0, dtype=np.int64)
+        self.trend_labels: List[str] = []
+        self.trend_matrix = sp.csr_matrix((0, 0))
         logger.info("RecommenderSystem initialized")
 
     def generate_recommendations(self, trends: List[str], user_preferences: Dict[str, List[str]]) -> List[str]:
@@ -26,3 +45,126 @@ class RecommenderSystem:
         except Exception as e:
             logger.error(f"Error generating recommendations: {e}")
             return []
+
+    def index_trends(self, topics: Sequence[Mapping[str, Any]]) -> None:
+        """
+        Indexes structured topics as produced in `TrendDetector.topics` (`id`, `label` and a
+        `terms` dict of term weights). Each term's weight is credited to each of its tokens,
+        so an interest like "crypto" matches the bigram "crypto twitter"; every trend's
+        token weights are L2-normalized so long topics do not dominate.
+        """
+        vocabulary: Dict[str, int] = {}
+        rows, columns, weights = [], [], []
+        for row, topic in enumerate(topics):
+            for term, weight in topic["terms"].items():
+                for token in tokenize(term):
+                    rows.append(row)
+                    columns.append(vocabulary.setdefault(token, len(vocabulary)))
+                    weights.append(weight)
+        # Duplicate (trend, token) entries are summed on conversion.
+        matrix = sp.csr_matrix((weights, (rows, columns)), shape=(len(topics), len(vocabulary)), dtype=np.float32)
+        self.trend_matrix = normalize(matrix)
+        self.vocabulary = vocabulary
+        self.trend_ids = np.array([topic["id"] for topic in topics], dtype=np.int64)
+        self.trend_labels = [topic.get("label", f"Trend {topic['id']}") for topic in topics]
+        logger.info(f"Indexed {len(topics)} trends over {len(vocabulary)} tokens")
+
+    def user_matrix(self, interests: Iterable[Iterable[str]]) -> sp.csr_matrix:
+        """
+        Binary users x tokens matrix of interests over the indexed vocabulary; unknown tokens are dropped.
+        """
+        indptr, indices = [0], []
+        for user_interests in interests:
+            columns = {self.vocabulary[token] for interest in user_interests for token in tokenize(interest)
+                       if token in self.vocabulary}
+            indices.extend(sorted(columns))
+            indptr.append(len(indices))
+        data = np.ones(len(indices), dtype=np.float32)
+        return sp.csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, len(self.vocabulary)))
+
+    def interest_matrix(self, interest_names: Sequence[str]) -> sp.csr_matrix:
+        """
+        Interests x tokens matrix mapping each interest ID (the position in `interest_names`)
+        to the indexed tokens it contains.
+        """
+        return self.user_matrix([name] for name in interest_names)
+
+    def user_matrix_from_ids(self, interest_ids: Sequence[np.ndarray], interests: sp.csr_matrix) -> sp.csr_matrix:
+        """
+        Binary users x tokens matrix built from integer interest IDs with no per-interest string work.
+        """
+        lengths = np.array([len(ids) for ids in interest_ids], dtype=np.int64)
+        indptr = np.concatenate([[0], np.cumsum(lengths)])
+        indices = np.concatenate(list(interest_ids)) if len(interest_ids) else np.zeros(0, dtype=np.int32)
+        by_interest = sp.csr_matrix(
+            (np.ones(len(indices), dtype=np.float32), indices, indptr), shape=(len(interest_ids), interests.shape[0])
+        )
+        users = by_interest @ interests
+        users.data[:] = 1.0
+        return users
+
+    def recommend_cohort(self, store: Any, user_ids: Sequence[Any], k: int = 5) -> Dict[Any, List[Dict[str, Any]]]:
+        """
+        Like `recommend_many`, but loads the cohort's profiles from a `ProfileStore` in bulk and
+        works on their interest IDs. Users without a stored profile are left out.
+        """
+        try:
+            profiles = store.get_many(user_ids)
+            found = [user_id for user_id in user_ids if user_id in profiles]
+            users = self.user_matrix_from_ids([profiles[u] for u in found],
+                                              self.interest_matrix(store.interest_vocabulary()))
+            return self._format(found, *self.score_users(users, k=k))
+        except Exception as e:
+            logger.error(f"Error generating cohort recommendations: {e}")
+            return {}
+
+    def score_users(self, users: sp.csr_matrix, k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Scores every user against every trend and returns the `k` best per user as two
+        (users x k) arrays: row positions into the indexed trends and scores, best first.
+        Trends a user has no overlap with score 0.
+        """
+        k = min(k, self.trend_matrix.shape[0])
+        top_rows = np.zeros((users.shape[0], k), dtype=np.int64)
+        top_scores = np.zeros((users.shape[0], k), dtype=np.float32)
+        if k == 0:
+            return top_rows, top_scores
+        trends_by_token = self.trend_matrix.T.tocsr()
+        for start in range(0, users.shape[0], self.block_size):
+            block = (users[start:start + self.block_size] @ trends_by_token).toarray()
+            candidates = np.argpartition(-block, k - 1, axis=1)[:, :k]
+            candidate_scores = np.take_along_axis(block, candidates, axis=1)
+            order = np.argsort(-candidate_scores, axis=1, kind="stable")
+            top_rows[start:start + len(block)] = np.take_along_axis(candidates, order, axis=1)
+            top_scores[start:start + len(block)] = np.take_along_axis(candidate_scores, order, axis=1)
+        return top_rows, top_scores
+
+    def _format(self, user_ids: Sequence[Any], top_rows: np.ndarray,
+                top_scores: np.ndarray) -> Dict[Any, List[Dict[str, Any]]]:
+        recommendations = {}
+        for user_id, rows, scores in zip(user_ids, top_rows.tolist(), top_scores.tolist()):
+            recommendations[user_id] = [
+                {
+                    "trend_id": int(self.trend_ids[row]),
+                    "trend": self.trend_labels[row],
+                    "score": score,
+                    "recommendation": f"Create a meme coin based on {self.trend_labels[row]}"
+                }
+                for row, score in zip(rows, scores) if score > 0
+            ]
+        logger.info(f"Generated recommendations for {len(user_ids)} users")
+        return recommendations
+
+    def recommend_many(self, user_interests: Mapping[Any, Iterable[str]],
+                       k: int = 5) -> Dict[Any, List[Dict[str, Any]]]:
+        """
+        Returns up to `k` ranked recommendations per user ID, each with the trend ID, label
+        and score. Users without any matching trend get an empty list.
+        """
+        try:
+            user_ids = list(user_interests)
+            users = self.user_matrix(user_interests[u] for u in user_ids)
+            return self._format(user_ids, *self.score_users(users, k=k))
+        except Exception as e:
+            logger.error(f"Error generating recommendations: {e}")
+            return {}
@@ -1,14 +1,17 @@
 import logging
-from typing import Dict, List
+from typing import Dict, List, Optional
+from recommender.profile_store import ProfileStore
 
 logger = logging.getLogger(__name__)
 
 class UserProfile:
-    def __init__(self, user_id: str):
+    def __init__(self, user_id: str, store: Optional[ProfileStore] = None):
         """
-        Initializes the UserProfile with the provided user ID and loads preferences.
+        Initializes the UserProfile with the provided user ID and loads preferences,
+        from `store` when given. For many users at once use `ProfileStore.get_many`.
         """
         self.user_id = user_id
+        self.store = store
         self.preferences = self.load_preferences()
 
     def load_preferences(self) -> Dict[str, List[str]]:
@@ -17,6 +20,11 @@ class UserProfile:
         For demonstration, it uses static data.
         """
         try:
+            if self.store is not None:
+                preferences = self.store.get_preferences(self.user_id)
+                if preferences:
+                    logger.info(f"Preferences loaded for user {self.user_id} from the profile store")
+                    return preferences
             # In a real-world scenario, this method would fetch preferences from a database or other data source
             preferences = {
                 "interests": ["crypto", "memes", "AI", "gaming", "NFTs"]
@@ -0,0 +1,179 @@
+import asyncio
+import base64
+import pytest
+from aiohttp import web
+from solana.keypair import Keypair
+from solana.transaction import Transaction
+
+class SolanaRPCStub:
+    """
+    Local JSON-RPC server with the subset of the Solana RPC API the connector uses.
+    Enforces the node's 100-key limit on getMultipleAccounts and records every call.
+    Transactions signed with a blockhash in `dropped_blockhashes` are accepted but never land,
+    and each getBlockHeight call advances the chain by `height_step` blocks.
+    """
+    def __init__(self):
+        self.balances = {}
+        self.statuses = {}
+        self.calls = []
+        self.http_requests = 0
+        self.blockhash = "EkSnNWid2cvwEVnVx9aBqawnmiCNiDgp3gUdkDPTKN1N"
+        self.block_height = 1000
+        self.height_step = 0
+        self.dropped_blockhashes = set()
+        self._blockhash_height = self.block_height
+
+    def getMultipleAccounts(self, addresses, config=None):
+        if len(addresses) > 100:
+            raise ValueError("Too many inputs provided; max 100")
+        return {"context": {"slot": 1}, "value": [
+            {"lamports": self.balances[a], "owner": "11111111111111111111111111111111", "data": ["", "base64"],
+             "executable": False, "rentEpoch": 0} if a in self.balances else None
+            for a in addresses
+        ]}
+
+    def getBalance(self, address, config=None):
+        return {"context": {"slot": 1}, "value": self.balances.get(address, 0)}
+
+    def getLatestBlockhash(self, config=None):
+        if self.block_height != self._blockhash_height:
+            self.blockhash = str(Keypair().public_key)
+            self._blockhash_height = self.block_height
+        return {"context": {"slot": 1},
+                "value": {"blockhash": self.blockhash, "lastValidBlockHeight": self.block_height + 150}}
+
+    def getBlockHeight(self, config=None):
+        self.block_height += self.height_step
+        return self.block_height
+
+    def sendTransaction(self, encoded, config=None):
+        transaction = Transaction.deserialize(base64.b64decode(encoded))
+        signature = str(transaction.signature())
+        if str(transaction.recent_blockhash) in self.dropped_blockhashes:
+            return signature
+        self.statuses.setdefault(signature, {"slot": 1, "confirmations": None, "err": None,
+                                             "confirmationStatus": "confirmed"})
+        return signature
+
+    def getSignatureStatuses(self, signatures, config=None):
+        return {"context": {"slot": 1}, "value": [self.statuses.get(s) for s in signatures]}
+
+    def _dispatch(self, request):
+        self.calls.append(request["method"])
+        try:
+            result = getattr(self, request["method"])(*request.get("params", []))
+            return {"jsonrpc": "2.0", "id": request["id"], "result": result}
+        except Exception as e:
+            return {"jsonrpc": "2.0", "id": request["id"], "error": {"code": -32602, "message": str(e)}}
+
+    async def handle(self, request):
+        self.http_requests += 1
+        payload = await request.json()
+        if isinstance(payload, list):
+            return web.json_response([self._dispatch(item) for item in payload])
+        return web.json_response(self._dispatch(payload))
+
+    def run(self, scenario):
+        """
+        Serves the stub on an ephemeral port and runs `scenario(url)` against it.
+        """
+        async def run():
+            app = web.Application()
+            app.router.add_post("/", self.handle)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            try:
+                return await scenario(f"http://127.0.0.1:{port}/")
+            finally:
+                await runner.cleanup()
+        return asyncio.run(run())
+
+class SolanaWebsocketStub:
+    """
+    Local websocket server speaking the Solana subscription protocol.
+    """
+    def __init__(self):
+        self.subscribe_calls = []
+        self.unsubscribe_calls = []
+        self.subscriptions = {}
+        self.connections = []
+        self._next_id = 100
+
+    async def handle(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections.append(ws)
+        async for message in ws:
+            payload = message.json()
+            if payload["method"].endswith("Unsubscribe"):
+                self.unsubscribe_calls.append(payload["method"])
+                self.subscriptions.pop(payload["params"][0], None)
+                await ws.send_json({"jsonrpc": "2.0", "id": payload["id"], "result": True})
+                continue
+            self._next_id += 1
+            self.subscribe_calls.append(payload["method"])
+            self.subscriptions[self._next_id] = (ws, payload["method"], payload["params"])
+            await ws.send_json({"jsonrpc": "2.0", "id": payload["id"], "result": self._next_id})
+        return ws
+
+    async def wait_for_subscriptions(self, count):
+        while len(self.subscriptions) < count:
+            await asyncio.sleep(0.01)
+
+    async def publish(self, method, result):
+        """
+        Sends a notification to every open subscription made with `method`.
+        """
+        notification = method.replace("Subscribe", "Notification")
+        for subscription_id, (ws, subscribed, _) in list(self.subscriptions.items()):
+            if subscribed == method and not ws.closed:
+                await ws.send_json({"jsonrpc": "2.0", "method": notification,
+                                    "params": {"subscription": subscription_id, "result": result}})
+
+    async def send_raw(self, data):
+        """
+        Sends a raw text frame on every open connection.
+        """
+        for ws in self.connections:
+            if not ws.closed:
+                await ws.send_str(data)
+
+    async def drop_connections(self):
+        self.subscriptions.clear()
+        for ws in self.connections:
+            await ws.close()
+
+    def run(self, scenario):
+        """
+        Serves the stub on an ephemeral port and runs `scenario(url)` against it.
+        """
+        async def run():
+            app = web.Application()
+            app.router.add_get("/", self.handle)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            try:
+                return await asyncio.wait_for(scenario(f"ws://127.0.0.1:{port}/"), 10)
+            finally:
+                await runner.cleanup()
+        return asyncio.run(run())
+
+@pytest.fixture
+def solana_stub():
+    """
+    Fixture providing a fresh local Solana JSON-RPC stub.
+    """
+    return SolanaRPCStub()
+
+@pytest.fixture
+def solana_ws_stub():
+    """
+    Fixture providing a fresh local Solana websocket stub.
+    """
+    return SolanaWebsocketStub()
@@ -0,0 +1,96 @@
+import asyncio
+import pytest
+from aiohttp import web
+from data_collection import api_integrations
+from data_collection.api_integrations import APIIntegrations
+
+TWEET_PAGES = {
+    None: {"data": [{"id": "3", "text": "doge to the moon"}, {"id": "2", "text": "pepe season"}],
+           "meta": {"newest_id": "3", "next_token": "page2"}},
+    "page2": {"data": [{"id": "1", "text": "bonk rally"}], "meta": {"newest_id": "1"}},
+}
+
+REDDIT_PAGES = {
+    None: {"data": {"children": [{"data": {"name": "t3_b", "title": "New meme coin launch"}}], "after": "t3_b"}},
+    "t3_b": {"data": {"children": [{"data": {"name": "t3_a", "title": "Is WIF done?"}}], "after": None}},
+}
+
+def make_stub_app(requests_seen):
+    """
+    Builds a local stub serving paginated Twitter and Reddit responses.
+    """
+    async def twitter(request):
+        requests_seen.append(("twitter", request.remote, dict(request.query)))
+        if "since_id" in request.query:
+            return web.json_response({"meta": {}})
+        return web.json_response(TWEET_PAGES[request.query.get("next_token")])
+
+    async def reddit(request):
+        requests_seen.append(("reddit", request.remote, dict(request.query)))
+        if "before" in request.query:
+            return web.json_response({"data": {"children": [], "after": None}})
+        return web.json_response(REDDIT_PAGES[request.query.get("after")])
+
+    app = web.Application()
+    app.router.add_get("/2/tweets/search/recent", twitter)
+    app.router.add_get("/r/{subreddit}/new.json", reddit)
+    return app
+
+@pytest.fixture
+def stub_api(monkeypatch):
+    """
+    Fixture that starts the stub server and points APIIntegrations at it.
+    """
+    requests_seen = []
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(make_stub_app(requests_seen))
+    loop.run_until_complete(runner.setup())
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    loop.run_until_complete(site.start())
+    port = site._server.sockets[0].getsockname()[1]
+    monkeypatch.setattr(api_integrations, "TWITTER_SEARCH_URL", f"http://127.0.0.1:{port}/2/tweets/search/recent")
+    monkeypatch.setattr(api_integrations, "REDDIT_NEW_URL", f"http://127.0.0.1:{port}/r/{{subreddit}}/new.json")
+    yield loop, requests_seen
+    loop.run_until_complete(runner.cleanup())
+    loop.close()
+
+def test_stream_api_data_paginates_both_sources(stub_api):
+    """
+    Test that streaming follows next_token/after pages and yields every document.
+    """
+    loop, requests_seen = stub_api
+    api = APIIntegrations("token", "id", "secret")
+
+    async def collect():
+        documents = [doc async for doc in api.stream_api_data("meme", "crypto", poll_interval=0, max_polls=2)]
+        await api.close()
+        return documents
+
+    documents = loop.run_until_complete(collect())
+    assert sorted(documents) == sorted([
+        "doge to the moon", "pepe season", "bonk rally", "New meme coin launch", "Is WIF done?"
+    ])
+    twitter_params = [params for source, _, params in requests_seen if source == "twitter"]
+    assert twitter_params[1]["next_token"] == "page2"
+    assert twitter_params[2]["since_id"] == "3", "Second poll should only ask for newer tweets"
+    reddit_params = [params for source, _, params in requests_seen if source == "reddit"]
+    assert reddit_params[2]["before"] == "t3_b", "Second poll should only ask for newer posts"
+
+def test_fetches_reuse_shared_session(stub_api):
+    """
+    Test that repeated fetches go through one pooled session.
+    """
+    loop, _ = stub_api
+    api = APIIntegrations("token", "id", "secret")
+
+    async def fetch_twice():
+        await api.fetch_twitter_data("meme")
+        first = api._session
+        await api.fetch_reddit_data("crypto")
+        second = api._session
+        await api.close()
+        return first, second
+
+    first, second = loop.run_until_complete(fetch_twice())
+    assert first is second
+    assert api._session is None
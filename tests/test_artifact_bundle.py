@@ -0,0 +1,75 @@
+import json
+import numpy as np
+import pytest
+from meme_predictor.artifact_bundle import ArtifactBundle
+from meme_predictor.feature_extractor import FeatureExtractor
+from meme_predictor.meme_model import MemeModel
+
+@pytest.fixture(params=[False, True], ids=["tfidf", "hashing"])
+def trained_components(request, tmp_path):
+    """
+    Fixture fitting a vectorizer (vocabulary or hashing mode) and model on synthetic posts.
+    """
+    rng = np.random.default_rng(0)
+    words = ["moon", "pump", "doge", "pepe", "rug", "dump", "scam", "whale", "bonk", "wif"]
+    documents = [" ".join(rng.choice(words, size=6)) for _ in range(200)]
+    y = np.array([int("moon" in doc) for doc in documents])
+    feature_extractor = FeatureExtractor(hashing=request.param, n_features=2 ** 12)
+    features = feature_extractor.fit_transform(documents)
+    meme_model = MemeModel(model_path=str(tmp_path / "model.joblib"), n_jobs=1)
+    meme_model.train(features, y)
+    return feature_extractor, meme_model, documents
+
+def test_bundle_round_trip(trained_components, tmp_path):
+    """
+    Test that a loaded bundle featurizes and scores exactly like the objects that wrote it.
+    """
+    feature_extractor, meme_model, documents = trained_components
+    bundle = ArtifactBundle(str(tmp_path / "bundle"))
+    assert bundle.save(feature_extractor, meme_model)
+    loaded_extractor, loaded_model = bundle.load()
+    expected = feature_extractor.transform(documents)
+    actual = loaded_extractor.transform(documents)
+    assert (abs(actual - expected) > 1e-6).nnz == 0
+    assert np.allclose(loaded_model.predict_raw(actual), meme_model.predict(expected), atol=1e-6)
+    assert isinstance(loaded_extractor.vectorizer.idf_, np.ndarray)
+
+    manifest = bundle.read_manifest()
+    assert "model.ubj" in manifest["files"] and "idf.npy" in manifest["files"]
+
+def test_bundle_hashing_arrays_are_memory_mapped(trained_components, tmp_path):
+    """
+    Test that hashing-mode IDF weights are mapped read-only and still accept further fitting.
+    """
+    feature_extractor, meme_model, documents = trained_components
+    if not feature_extractor.hashing:
+        pytest.skip("vocabulary mode rebuilds its IDF diagonal")
+    bundle = ArtifactBundle(str(tmp_path / "bundle"))
+    bundle.save(feature_extractor, meme_model)
+    loaded_extractor, _ = bundle.load()
+    assert isinstance(loaded_extractor.vectorizer.idf_, np.memmap)
+    loaded_extractor.vectorizer.partial_fit(documents[:10])
+    assert loaded_extractor.vectorizer.n_documents_ == len(documents) + 10
+
+def test_bundle_rejects_corrupted_files(trained_components, tmp_path):
+    """
+    Test that size checks refuse a truncated bundle and checksums refuse a tampered one.
+    """
+    feature_extractor, meme_model, _ = trained_components
+    bundle = ArtifactBundle(str(tmp_path / "bundle"))
+    bundle.save(feature_extractor, meme_model)
+    with open(tmp_path / "bundle" / "idf.npy", "r+b") as f:
+        f.seek(-4, 2)
+        f.write(b"\x00\x00\x80\x7f")
+    assert bundle.load(checksums=True) is None
+    assert bundle.load() is not None, "Same-size tampering is only caught by checksums"
+
+    with open(tmp_path / "bundle" / "model.ubj", "r+b") as f:
+        f.truncate(16)
+    assert bundle.load() is None
+    assert bundle.load(verify=False) is None, "A truncated booster does not parse"
+
+    manifest = json.loads((tmp_path / "bundle" / "manifest.json").read_text())
+    manifest["format_version"] = 99
+    (tmp_path / "bundle" / "manifest.json").write_text(json.dumps(manifest))
+    assert bundle.load(verify=False) is None
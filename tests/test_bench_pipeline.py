@@ -0,0 +1,49 @@
+import asyncio
+from benchmarks.bench_pipeline import collect, compare
+from benchmarks.service_stubs import ServiceStubs
+from benchmarks.synthetic_corpus import SyntheticCorpus
+from blockchain_integration.solana_connector import SolanaConnector
+
+def test_synthetic_corpus_is_reproducible():
+    """
+    Test that corpora are deterministic per seed and carry duplicates and engagement labels.
+    """
+    a, b = SyntheticCorpus(500, seed=3), SyntheticCorpus(500, seed=3)
+    assert a.texts == b.texts and (a.likes == b.likes).all()
+    assert a.texts != SyntheticCorpus(500, seed=4).texts
+    assert any(text.startswith("RT @") for text in a.texts)
+    assert 0.3 < a.labels().mean() < 0.6
+    tweet = a.tweet(int(a.tweet_rows[0]))
+    assert set(tweet) == {"id", "text", "created_at", "public_metrics"}
+
+def test_stubs_replay_the_corpus_through_the_real_clients():
+    """
+    Test that paginated collection returns every document and balances resolve through the RPC stub.
+    """
+    corpus = SyntheticCorpus(730, seed=1)
+
+    async def scenario():
+        stubs = ServiceStubs(corpus)
+        await stubs.start()
+        try:
+            collected = await collect(stubs, max_results=50)
+            connector = SolanaConnector(rpc_url=stubs.rpc_url)
+            balances = await connector.get_balances(["11111111111111111111111111111111"])
+            await connector.close()
+            return collected, balances, dict(stubs.requests)
+        finally:
+            await stubs.stop()
+
+    collected, balances, requests = asyncio.run(scenario())
+    assert collected == corpus.documents_by_source()
+    assert requests["twitter"] == -(-len(corpus.tweet_rows) // 50)
+    assert balances["11111111111111111111111111111111"] == ServiceStubs.lamports("11111111111111111111111111111111")
+
+def test_compare_flags_only_significant_regressions():
+    """
+    Test that comparisons flag slow stages but ignore noise on very short ones.
+    """
+    baseline = {"results": [{"docs": 10, "stages": {"train": {"seconds": 1.0}, "tiny": {"seconds": 0.001}}}]}
+    current = {"results": [{"docs": 10, "stages": {"train": {"seconds": 1.5}, "tiny": {"seconds": 0.01}}}]}
+    assert compare(current, baseline, tolerance=0.15) == ["10:train"]
+    assert compare(baseline, baseline, tolerance=0.15) == []
@@ -0,0 +1,76 @@
+import asyncio
+import pytest
+from aiohttp import web
+from data_collection.data_scraper import DataScraper
+
+@pytest.mark.parametrize("parse_workers", [0, 1])
+def test_scrape_stream_bounds_concurrency_and_body_size(parse_workers):
+    """
+    Test that scrape_stream yields every page, never exceeds the concurrency cap and truncates large bodies.
+    """
+    in_flight = {"now": 0, "peak": 0}
+
+    async def page(request):
+        in_flight["now"] += 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+        body = f"<html><body><p>page {request.match_info['n']}</p> " + "x" * 5000 + "</body></html>"
+        return web.Response(text=body, content_type="text/html")
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/page/{n}", page)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        scraper = DataScraper([f"http://127.0.0.1:{port}/page/{n}" for n in range(30)],
+                              max_concurrency=3, parse_workers=parse_workers, max_body_bytes=1000)
+        try:
+            return [item async for item in scraper.scrape_stream()]
+        finally:
+            scraper.close()
+            await runner.cleanup()
+
+    results = asyncio.run(run())
+    assert len(results) == 30
+    assert in_flight["peak"] <= 3
+    assert all(len(text) <= 1000 for _, text in results)
+    assert sorted(text.split()[1] for _, text in results) == sorted(str(n) for n in range(30))
+
+def test_scrape_stream_surfaces_url_iterator_errors():
+    """
+    Test that a failing URL iterator ends the stream with its error instead of hanging.
+    """
+    async def page(request):
+        return web.Response(text=f"<p>page {request.match_info['n']}</p>", content_type="text/html")
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/page/{n}", page)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        def urls():
+            yield f"http://127.0.0.1:{port}/page/1"
+            yield f"http://127.0.0.1:{port}/page/2"
+            raise RuntimeError("url source went away")
+
+        scraper = DataScraper([], max_concurrency=3, parse_workers=0)
+        results = []
+        try:
+            with pytest.raises(RuntimeError, match="url source went away"):
+                async for item in scraper.scrape_stream(urls()):
+                    results.append(item)
+            return results
+        finally:
+            scraper.close()
+            await runner.cleanup()
+
+    results = asyncio.run(asyncio.wait_for(run(), 10))
+    assert sorted(text.split()[1] for _, text in results) == ["1", "2"]
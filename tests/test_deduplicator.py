@@ -0,0 +1,47 @@
+import pytest
+from data_collection.deduplicator import Deduplicator
+
+@pytest.fixture
+def sample_documents():
+    """
+    Fixture with retweets, copy-paste shills and one unrelated post.
+    """
+    return [
+        "Pepe coin is about to explode, get in before the listing https://t.co/abc",
+        "RT @shill: Pepe coin is about to explode, get in before the listing https://t.co/xyz",
+        "Pepe coin is about to explode!! get in before the listing",
+        "Pepe coin is about to explode, get in before the big listing",
+        "Solana validators upgraded to the new release overnight",
+    ]
+
+def test_deduplicator_drops_exact_and_near_duplicates(sample_documents):
+    """
+    Test that retweets and copy-paste variants are dropped and counted per source.
+    """
+    deduplicator = Deduplicator()
+    unique = deduplicator.filter(sample_documents, source="twitter")
+    assert unique == [sample_documents[0], sample_documents[4]]
+    stats = deduplicator.stats["twitter"]
+    assert stats["seen"] == 5
+    assert stats["exact"] == 2, "Retweet and punctuation variant normalize to the same text"
+    assert stats["near"] == 1, "One-word edit should be caught by MinHash"
+
+def test_deduplicator_forgets_documents_outside_window():
+    """
+    Test that the index only remembers documents within the time window.
+    """
+    deduplicator = Deduplicator(window_seconds=60)
+    assert not deduplicator.is_duplicate("wif is going to the moon", timestamp=0)
+    assert deduplicator.is_duplicate("wif is going to the moon", timestamp=30)
+    assert not deduplicator.is_duplicate("wif is going to the moon", timestamp=120)
+    assert len(deduplicator._entries) == 1
+
+def test_deduplicator_respects_max_entries():
+    """
+    Test that the index never grows beyond max_entries.
+    """
+    deduplicator = Deduplicator(max_entries=10)
+    for i in range(50):
+        deduplicator.is_duplicate(f"unique post number {i} about token {i * 7919}", timestamp=i)
+    assert len(deduplicator._entries) == 10
+    assert sum(len(bucket) for bucket in deduplicator._buckets[0].values()) == 10
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from data_collection.api_integrations import reddit_record, tweet_record
+
+pa = pytest.importorskip("pyarrow")
+from data_collection.document_store import DocumentStore, engagement_labels  # noqa: E402
+
+HOUR = 1_700_000_000 - 1_700_000_000 % 3600
+
+def make_records():
+    tweets = [tweet_record({"id": str(i), "text": f"pepe {i}", "created_at": f"2023-11-14T22:{i:02d}:00.000Z",
+                            "public_metrics": {"like_count": i, "retweet_count": 1, "reply_count": 0,
+                                               "quote_count": 0}})
+              for i in range(10)]
+    posts = [reddit_record({"name": f"t3_{i}", "title": f"doge {i}", "created_utc": HOUR + 3600 + i,
+                            "score": 100 * i, "num_comments": 2})
+             for i in range(5)]
+    return tweets + posts
+
+def test_append_partitions_by_source_and_hour(tmp_path):
+    """
+    Test that appends land in source/hour partitions and round-trip ids, timestamps and metrics.
+    """
+    store = DocumentStore(str(tmp_path))
+    paths = store.append(make_records())
+    assert len(paths) == 2
+    assert sorted(p.split(str(tmp_path))[1].split("/")[1] for p in paths) == ["source=reddit", "source=twitter"]
+    store.append(make_records()[:3])
+    assert len(store.files(sources=["twitter"])) == 2, "Appends never rewrite existing files"
+
+    table = store.read_table(sources=["twitter"])
+    assert table.num_rows == 13
+    assert table.column("id").to_pylist()[:3] == ["0", "1", "2"]
+    assert table.column("like_count").to_pylist()[:10] == list(range(10))
+    assert table.column("created_at")[0].as_py().timestamp() == 1_700_000_000 - 1_700_000_000 % 86400 + 22 * 3600
+
+def test_batches_are_memory_mapped_and_filtered(tmp_path):
+    """
+    Test column projection, time-range filtering and zero-copy reads.
+    """
+    store = DocumentStore(str(tmp_path))
+    store.append(make_records())
+    reddit_hour = HOUR + 3600
+    assert store.files(start=reddit_hour) == store.files(sources=["reddit"]), "Older hour partitions are pruned"
+
+    batches = list(store.iter_batches(sources=["reddit"], start=reddit_hour + 1, end=reddit_hour + 4,
+                                      columns=["id", "text"]))
+    assert [row["id"] for batch in batches for row in batch.to_pylist()] == ["t3_1", "t3_2", "t3_3"]
+    assert batches[0].schema.names == ["id", "text"]
+
+    before = pa.total_allocated_bytes()
+    whole = list(store.iter_batches())
+    assert sum(batch.num_rows for batch in whole) == 15
+    assert pa.total_allocated_bytes() == before, "Unfiltered reads should not copy out of the memory map"
+
+def test_engagement_labels_replace_random_labels(tmp_path):
+    """
+    Test that stored engagement yields balanced labels for training.
+    """
+    store = DocumentStore(str(tmp_path))
+    store.append(make_records())
+    table = store.read_table(sources=["twitter"])
+    labels = engagement_labels(table)
+    assert labels.tolist() == [0] * 5 + [1] * 5
+    assert engagement_labels({"like_count": [], "retweet_count": [], "reply_count": [], "quote_count": []}).size == 0
+    columns = {"like_count": [5, 0], "retweet_count": [0, 0], "reply_count": [0, 1], "quote_count": [0, 0]}
+    assert np.array_equal(engagement_labels(columns), [1, 0])
@@ -0,0 +1,44 @@
+import random
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from meme_predictor.feature_extractor import FeatureExtractor
+
+@pytest.fixture
+def corpus():
+    """
+    Fixture generating a small random corpus.
+    """
+    rng = random.Random(1)
+    words = ["pepe", "doge", "moon", "rug", "pump", "solana", "whale", "launch", "frog", "chart"]
+    return [" ".join(rng.choices(words, k=rng.randint(2, 10))) for _ in range(300)]
+
+def test_hashing_mode_matches_tfidf_weights(corpus):
+    """
+    Test that hashed features carry the same TF-IDF weights as the vocabulary-based path.
+    """
+    expected = TfidfVectorizer(ngram_range=(1, 2), stop_words='english', sublinear_tf=True).fit_transform(corpus)
+    actual = FeatureExtractor(hashing=True).fit_transform(corpus)
+    assert actual.shape == (len(corpus), 2 ** 20)
+    for row in range(len(corpus)):
+        assert np.allclose(np.sort(actual[row].data), np.sort(expected[row].data), atol=1e-6)
+
+def test_hashing_chunks_match_single_pass(corpus):
+    """
+    Test that chunked, multi-process fitting and transforming reproduce the in-memory result.
+    """
+    single = FeatureExtractor(hashing=True, n_features=2 ** 12)
+    expected = single.fit_transform(corpus)
+    chunked = FeatureExtractor(hashing=True, n_features=2 ** 12)
+    chunks = [corpus[i:i + 70] for i in range(0, len(corpus), 70)]
+    chunked.fit_chunks(iter(chunks), n_jobs=2)
+    parts = list(chunked.transform_chunks(iter(chunks), n_jobs=2))
+    assert [part.shape[0] for part in parts] == [len(chunk) for chunk in chunks]
+    assert np.allclose(np.vstack([part.toarray() for part in parts]), expected.toarray())
+
+def test_chunk_methods_require_hashing_mode(corpus):
+    """
+    Test that the streaming API is refused for the vocabulary-based vectorizer.
+    """
+    with pytest.raises(ValueError):
+        FeatureExtractor().transform_chunks([corpus])
@@ -0,0 +1,146 @@
+import asyncio
+import time
+import aiohttp
+import pytest
+from aiohttp import web
+from data_collection.fetch_scheduler import FetchScheduler, parse_rate_limit_headers
+
+class RateLimitedStub:
+    """
+    Local stub that enforces a fixed-window limit and reports it via rate-limit headers.
+    """
+    def __init__(self, limit: int, window: float, style: str = "twitter"):
+        self.limit = limit
+        self.window = window
+        self.style = style
+        self.window_start = time.time()
+        self.used = 0
+        self.served = 0
+        self.throttled = 0
+        self.fail_next = 0
+
+    def headers(self, now: float):
+        remaining = max(self.limit - self.used, 0)
+        reset_at = self.window_start + self.window
+        if self.style == "twitter":
+            return {"x-rate-limit-limit": str(self.limit), "x-rate-limit-remaining": str(remaining),
+                    "x-rate-limit-reset": str(reset_at)}
+        return {"X-Ratelimit-Used": str(self.used), "X-Ratelimit-Remaining": str(remaining),
+                "X-Ratelimit-Reset": str(reset_at - now)}
+
+    async def handle(self, request):
+        now = time.time()
+        if now >= self.window_start + self.window:
+            self.window_start = now
+            self.used = 0
+        if self.fail_next:
+            self.fail_next -= 1
+            return web.Response(status=503)
+        if self.used >= self.limit:
+            self.throttled += 1
+            return web.json_response({"error": "rate limited"}, status=429, headers=self.headers(now))
+        self.used += 1
+        self.served += 1
+        return web.json_response({"ok": True}, headers=self.headers(now))
+
+def run_against_stub(stub, scenario):
+    """
+    Starts the stub on an ephemeral port and runs `scenario(session, url)` against it.
+    """
+    async def run():
+        app = web.Application()
+        app.router.add_get("/endpoint", stub.handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            async with aiohttp.ClientSession() as session:
+                return await scenario(session, f"http://127.0.0.1:{port}/endpoint")
+        finally:
+            await runner.cleanup()
+    return asyncio.run(run())
+
+@pytest.mark.parametrize("style", ["twitter", "reddit"])
+def test_scheduler_paces_under_limit(style):
+    """
+    Test that paced requests all succeed without tripping the stub's limit and use most of its budget.
+    """
+    stub = RateLimitedStub(limit=5, window=0.5, style=style)
+    scheduler = FetchScheduler(base_backoff=0.01)
+    n_requests = 15
+
+    async def scenario(session, url):
+        start = time.perf_counter()
+        results = await asyncio.gather(*[scheduler.fetch(session, url) for _ in range(n_requests)])
+        return results, time.perf_counter() - start
+
+    results, elapsed = run_against_stub(stub, scenario)
+    assert all(result == {"ok": True} for result in results)
+    assert stub.served == n_requests
+    # Only the first burst, before any headers have been seen, may overrun the window.
+    assert stub.throttled <= n_requests - stub.limit
+    limit_rate = stub.limit / stub.window
+    assert 0.3 * limit_rate <= n_requests / elapsed <= limit_rate
+
+def test_scheduler_sequential_requests_never_throttled():
+    """
+    Test that once the budget is known, pacing keeps a sequential client below the limit.
+    """
+    stub = RateLimitedStub(limit=4, window=0.4)
+    scheduler = FetchScheduler(base_backoff=0.01)
+
+    async def scenario(session, url):
+        for _ in range(10):
+            await scheduler.fetch(session, url)
+
+    run_against_stub(stub, scenario)
+    assert stub.served == 10
+    assert stub.throttled == 0
+
+def test_scheduler_retries_transient_errors():
+    """
+    Test that 5xx responses are retried with backoff and eventually succeed.
+    """
+    stub = RateLimitedStub(limit=100, window=10)
+    stub.fail_next = 2
+    scheduler = FetchScheduler(base_backoff=0.01)
+
+    async def scenario(session, url):
+        return await scheduler.fetch(session, url)
+
+    assert run_against_stub(stub, scenario) == {"ok": True}
+
+def test_scheduler_gives_up_after_max_retries():
+    """
+    Test that the last error is raised once retries are exhausted.
+    """
+    stub = RateLimitedStub(limit=100, window=10)
+    stub.fail_next = 5
+    scheduler = FetchScheduler(max_retries=2, base_backoff=0.01)
+
+    async def scenario(session, url):
+        return await scheduler.fetch(session, url)
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        run_against_stub(stub, scenario)
+
+def test_parse_rate_limit_headers():
+    """
+    Test that Twitter epoch resets and Reddit relative resets map to the same absolute form.
+    """
+    twitter = parse_rate_limit_headers({"x-rate-limit-remaining": "3", "x-rate-limit-reset": "1060"}, now=1000.0)
+    reddit = parse_rate_limit_headers({"X-Ratelimit-Remaining": "3.0", "X-Ratelimit-Reset": "60"}, now=1000.0)
+    assert twitter == reddit == {"remaining": 3.0, "reset_at": 1060.0}
+
+def test_scheduler_bounds_bucket_count():
+    """
+    Test that buckets of many distinct endpoints are evicted least recently used first.
+    """
+    scheduler = FetchScheduler(max_buckets=3)
+    hot = scheduler._bucket("example.com/hot")
+    for i in range(10):
+        scheduler._bucket(f"example.com/page/{i}")
+        assert scheduler._bucket("example.com/hot") is hot
+    assert list(scheduler.buckets) == ["example.com/page/8", "example.com/page/9", "example.com/hot"]
@@ -1,3 +1,5 @@
+import os
+import tempfile
 import pytest
 import numpy as np
 from meme_predictor.meme_model import MemeModel
@@ -40,3 +42,68 @@ def test_model_save_load():
     new_model = MemeModel(model_path="test_model.joblib")
     new_model.load_model()  # Load the model
     assert new_model.model is not None, "Model should be loaded successfully"
+
+@pytest.mark.parametrize("external_memory", [False, True])
+def test_meme_model_chunked_training(sample_data, tmp_path, external_memory):
+    """
+    Test that the model trains from a one-shot chunk generator and replays it from the disk cache.
+    """
+    X, y = sample_data
+    chunks = ((X[i:i + 25], y[i:i + 25]) for i in range(0, len(X), 25))
+    model = MemeModel(model_path=str(tmp_path / "chunked.joblib"), n_jobs=1)
+    model.train_chunks(chunks, external_memory=external_memory, cache_dir=str(tmp_path / "cache"))
+    predictions = model.predict(X)
+    assert predictions is not None and len(predictions) == X.shape[0]
+
+    rerun = MemeModel(n_jobs=1)
+    rerun.train_chunks(iter(()), external_memory=external_memory, cache_dir=str(tmp_path / "cache"))
+    assert np.allclose(rerun.predict(X), predictions), "Re-run should train on the cached chunks"
+
+def test_meme_model_chunk_cache_is_keyed(sample_data, tmp_path):
+    """
+    Test that a cache written for other data is rebuilt instead of silently replayed.
+    """
+    X, y = sample_data
+    cache_dir = str(tmp_path / "cache")
+    first = MemeModel(n_jobs=1)
+    assert first.train_chunks([(X, y)], cache_dir=cache_dir, cache_key="v1")
+    flipped = MemeModel(n_jobs=1)
+    assert flipped.train_chunks([(X, 1 - y)], cache_dir=cache_dir, cache_key="v2")
+    assert not np.allclose(flipped.predict(X), first.predict(X)), "A new key retrains on the new chunks"
+    replay = MemeModel(n_jobs=1)
+    replay.train_chunks(iter(()), cache_dir=cache_dir, cache_key="v2")
+    assert np.allclose(replay.predict(X), flipped.predict(X))
+
+def test_meme_model_external_memory_cleans_up_pages(sample_data, tmp_path, monkeypatch):
+    """
+    Test that external-memory training without a cache_dir removes its temporary pages.
+    """
+    X, y = sample_data
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    model = MemeModel(n_jobs=1)
+    assert model.train_chunks([(X[:50], y[:50]), (X[50:], y[50:])], external_memory=True)
+    assert len(model.predict(X)) == X.shape[0]
+    assert os.listdir(tmp_path) == []
+
+def test_meme_model_warm_start_updates(sample_data, tmp_path):
+    """
+    Test that updates add trees, refit on schedule, and resume from the latest checkpoint.
+    """
+    X, y = sample_data
+    path = str(tmp_path / "warm.joblib")
+    model = MemeModel(model_path=path, n_jobs=1, update_trees=5, refit_every=2, keep_checkpoints=2)
+    assert model.update(X, y)
+    booster = model.model.get_booster()
+    # The warm start continues from the early-stopped model, dropping trees past best_iteration
+    best_iteration = booster.attr("best_iteration")
+    trees = int(best_iteration) + 1 if best_iteration is not None else booster.num_boosted_rounds()
+    assert model.update(X, y)
+    assert model.model.get_booster().num_boosted_rounds() == trees + 5
+    assert model.update(X, y)
+    assert model.needs_full_refit(), "Refit is due after refit_every updates"
+    assert len(model._checkpoints()) == 2, "Only the newest checkpoints are kept"
+
+    resumed = MemeModel(model_path=path, n_jobs=1)
+    assert resumed.load_latest_checkpoint()
+    assert np.allclose(resumed.predict(X), model.predict(X))
+    assert resumed.model.get_booster().attr("updates_since_refit") == "2"
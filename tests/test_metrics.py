@@ -0,0 +1,111 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+import aiohttp
+from monitoring.metrics import DOCUMENTS, MetricsRegistry, MetricsServer, REGISTRY
+from monitoring.profiling import StackSampler, profile_block
+from meme_predictor.feature_extractor import FeatureExtractor
+from blockchain_integration.rpc_client import SolanaRPC
+
+def test_registry_renders_prometheus_text():
+    """
+    Test counters, gauges and histograms in the Prometheus exposition format.
+    """
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests")
+    requests.inc(service="twitter", outcome="ok")
+    requests.inc(2, service="twitter", outcome="ok")
+    registry.gauge("queue_depth").set(7)
+    latency = registry.histogram("latency_seconds", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value, stage="trends")
+    text = registry.render()
+    assert '# TYPE requests_total counter' in text
+    assert 'requests_total{outcome="ok",service="twitter"} 3' in text
+    assert 'queue_depth 7' in text
+    assert 'latency_seconds_bucket{stage="trends",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{stage="trends",le="1"} 2' in text
+    assert 'latency_seconds_bucket{stage="trends",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{stage="trends"} 3' in text
+    assert registry.counter("requests_total") is requests
+    assert latency.snapshot(stage="trends")["max"] == 5.0
+
+def test_timer_as_decorator_and_context_manager():
+    """
+    Test that timers observe wall time for plain functions, coroutines and with-blocks.
+    """
+    latency = MetricsRegistry().histogram("work_seconds")
+
+    @latency.time(kind="sync")
+    def work():
+        time.sleep(0.01)
+        return 1
+
+    @latency.time(kind="async")
+    async def work_async():
+        await asyncio.sleep(0.01)
+        return 2
+
+    with latency.time(kind="block") as timer:
+        time.sleep(0.01)
+    assert work() == 1 and asyncio.run(work_async()) == 2
+    assert timer.elapsed >= 0.01
+    for kind in ("sync", "async", "block"):
+        assert latency.count(kind=kind) == 1 and latency.snapshot(kind=kind)["p50"] >= 0.009
+
+def test_components_report_to_the_shared_registry(solana_stub):
+    """
+    Test that instrumented components feed the metrics served on /metrics.
+    """
+    before = DOCUMENTS.value(stage="features_fit")
+    FeatureExtractor().fit_transform(["pepe to the moon", "doge pumps again", "frog memes"])
+    assert DOCUMENTS.value(stage="features_fit") == before + 3
+
+    solana_stub.balances = {"A": 5}
+
+    async def scenario(url):
+        rpc = SolanaRPC(url)
+        await rpc.get_balances(["A", "B"])
+        await rpc.get_balances(["A", "B"])
+        await rpc.close()
+        server = MetricsServer()
+        host, port = await server.start(port=0)
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"http://{host}:{port}/metrics") as response:
+                body = await response.text()
+        await server.stop()
+        return body
+
+    body = solana_stub.run(scenario)
+    assert 'rpc_calls_total{method="getMultipleAccounts",outcome="ok"}' in body
+    assert 'cache_lookups_total{cache="solana_accounts",result="hit"}' in body
+    assert 'stage_seconds_bucket{stage="features_fit",le="+Inf"}' in body
+    assert REGISTRY.get("request_seconds").count(service="solana_rpc") >= 1
+
+def test_profile_block_covers_worker_threads(tmp_path, caplog):
+    """
+    Test that a profiled block writes a cProfile dump and folded stacks that include other threads,
+    and logs its top functions.
+    """
+    def busy():
+        end = time.perf_counter() + 0.2
+        while time.perf_counter() < end:
+            sum(range(1000))
+
+    with caplog.at_level(logging.INFO, logger="monitoring.profiling"), \
+            profile_block(str(tmp_path), label="cycle", sample_interval=0.002):
+        worker = threading.Thread(target=busy, name="worker")
+        worker.start()
+        worker.join()
+    files = sorted(os.listdir(tmp_path))
+    assert [os.path.splitext(f)[1] for f in files] == [".folded", ".prof"]
+    folded = open(os.path.join(tmp_path, files[0])).read()
+    assert any(line.startswith("worker;") and "busy" in line for line in folded.splitlines())
+    assert any("cumulative time" in message and "ncalls" in message for message in caplog.messages)
+
+    sampler = StackSampler(interval=0.001).start()
+    time.sleep(0.02)
+    sampler.stop()
+    assert sampler.samples > 0
@@ -0,0 +1,39 @@
+import json
+import numpy as np
+import pytest
+from meme_predictor.meme_model import MemeModel
+from meme_predictor.model_tuning import HyperparameterSearch
+
+@pytest.fixture
+def time_ordered_data():
+    """
+    Fixture with a learnable binary target over time-ordered rows.
+    """
+    rng = np.random.default_rng(0)
+    X = rng.random((300, 8))
+    y = (X[:, 0] + 0.2 * rng.random(300) > 0.6).astype(int)
+    return X, y
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_successive_halving_leaderboard(time_ordered_data, tmp_path, n_jobs):
+    """
+    Test that halving narrows candidates, ranks the leaderboard and configures the model.
+    """
+    X, y = time_ordered_data
+    search = HyperparameterSearch(
+        MemeModel(n_jobs=1), n_candidates=9, factor=3, min_rounds=5, max_rounds=45, n_splits=2, n_jobs=n_jobs
+    )
+    leaderboard = search.fit(X, y)
+    assert [sum(entry["rung"] == rung for entry in leaderboard) for rung in range(3)] == [9, 3, 1]
+    assert leaderboard[0]["rounds"] == 45 and leaderboard[0]["params"] == search.best_params_
+    assert all(entry["train_seconds"] > 0 and entry["latency_ms"] > 0 for entry in leaderboard)
+    first_rung = [entry["score"] for entry in leaderboard if entry["rung"] == 0]
+    assert first_rung == sorted(first_rung)
+
+    model = search.apply_best()
+    assert model.model.get_params()["max_depth"] == search.best_params_["max_depth"]
+    assert model.model.n_estimators == 45
+
+    path = tmp_path / "leaderboard.json"
+    search.write_leaderboard(str(path))
+    assert len(json.loads(path.read_text())["leaderboard"]) == 13
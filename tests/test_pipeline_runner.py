@@ -0,0 +1,80 @@
+import asyncio
+import operator
+import time
+import pytest
+from pipeline.dag_runner import PipelineRunner, Stage, topological_order
+
+def test_independent_stages_overlap_off_the_event_loop():
+    """
+    Test that independent blocking stages run concurrently while the event loop keeps serving coroutines.
+    """
+    ticks = []
+
+    async def heartbeat():
+        for _ in range(5):
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.02)
+        return len(ticks)
+
+    runner = PipelineRunner([
+        Stage("load", lambda: [1, 2, 3], outputs=["documents"]),
+        Stage("slow_a", lambda docs: time.sleep(0.2) or sum(docs), inputs=["documents"], outputs=["a"]),
+        Stage("slow_b", lambda docs: time.sleep(0.2) or len(docs), inputs=["documents"], outputs=["b"]),
+        Stage("split", lambda a, b: (a + b, a - b), inputs=["a", "b"], outputs=["plus", "minus"]),
+        Stage("heartbeat", heartbeat, outputs=["ticks"], executor="async"),
+        Stage("add", operator.add, inputs=["plus", "minus"], outputs=["total"], executor="process"),
+    ], process_workers=1)
+    try:
+        context = asyncio.run(runner.run_once())
+    finally:
+        runner.close()
+    assert context["plus"] == 9 and context["minus"] == 3 and context["total"] == 12
+    assert context["ticks"] == 5, "The event loop was blocked by a thread stage"
+    assert runner.last_timings["total"] < 0.35, "slow_a and slow_b should overlap"
+    assert set(runner.last_timings) == {"load", "slow_a", "slow_b", "split", "heartbeat", "add", "total"}
+
+def test_failed_stage_skips_only_its_dependents():
+    """
+    Test that a failing stage skips downstream stages while unrelated branches still run.
+    """
+    def broken(docs):
+        raise RuntimeError("model exploded")
+
+    runner = PipelineRunner([
+        Stage("predict", broken, inputs=["documents"], outputs=["predictions"]),
+        Stage("report", lambda predictions: predictions, inputs=["predictions"], outputs=["report"]),
+        Stage("count", len, inputs=["documents"], outputs=["count"], executor="inline"),
+    ], initial=["documents"])
+    context = asyncio.run(runner.run_once({"documents": ["a", "b"]}))
+    runner.close()
+    assert context["count"] == 2 and "report" not in context
+    assert "model exploded" in runner.last_failures["predict"]
+    assert runner.last_failures["report"].startswith("skipped")
+
+def test_graph_validation():
+    """
+    Test that cycles, missing producers and duplicate outputs are rejected up front.
+    """
+    with pytest.raises(ValueError, match="cycle"):
+        topological_order([Stage("a", len, ["y"], ["x"]), Stage("b", len, ["x"], ["y"])])
+    with pytest.raises(ValueError, match="No stage produces"):
+        topological_order([Stage("a", len, ["missing"], ["x"])])
+    with pytest.raises(ValueError, match="more than once"):
+        topological_order([Stage("a", len, [], ["x"]), Stage("b", len, [], ["x"])])
+    ordered = topological_order([Stage("b", len, ["x"], ["y"]), Stage("a", len, ["seed"], ["x"])], initial=["seed"])
+    assert [stage.name for stage in ordered] == ["a", "b"]
+
+def test_run_forever_on_a_schedule():
+    """
+    Test that the continuous loop runs the requested number of cycles at the given interval.
+    """
+    seen = []
+    runner = PipelineRunner([Stage("double", lambda n: 2 * n, ["n"], ["doubled"])], initial=["n"])
+    counter = iter(range(100))
+    start = time.perf_counter()
+    asyncio.run(runner.run_forever(lambda: {"n": next(counter)}, interval=0.05, max_cycles=3,
+                                   on_cycle=lambda context: seen.append(context["doubled"])))
+    runner.close()
+    assert seen == [0, 2, 4]
+    assert runner.cycles == 3
+    assert time.perf_counter() - start >= 0.1
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+from recommender.profile_store import ProfileStore
+from recommender.recommender_system import RecommenderSystem
+from recommender.user_profile import UserProfile
+
+class FakeClock:
+    """
+    Manually advanced clock for TTL tests.
+    """
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def store(tmp_path):
+    """
+    Fixture with a small on-disk store and a controllable clock.
+    """
+    clock = FakeClock()
+    profile_store = ProfileStore(str(tmp_path / "profiles.sqlite"), cache_size=2, ttl_seconds=10, clock=clock)
+    profile_store.put_many({"alice": ["Crypto", "PEPE", "crypto"], "bob": ["AI Agents"], "carol": ["gaming"]})
+    yield profile_store, clock
+    profile_store.close()
+
+def test_profiles_round_trip_as_interest_ids(store, tmp_path):
+    """
+    Test that interests are interned once and profiles survive reopening the database.
+    """
+    profile_store, _ = store
+    profiles = profile_store.get_many(["alice", "bob", "nobody"])
+    assert set(profiles) == {"alice", "bob"}
+    assert profiles["alice"].dtype == np.int32 and len(profiles["alice"]) == 2
+    assert profile_store.get_preferences("bob") == {"interests": ["ai agents"]}
+    assert profile_store.get_preferences("nobody") == {}
+
+    reopened = ProfileStore(str(tmp_path / "profiles.sqlite"))
+    assert np.array_equal(reopened.get_many(["alice"])["alice"], profiles["alice"])
+    assert np.array_equal(reopened.interest_ids(["pepe"]), profile_store.interest_ids(["pepe"]))
+    assert UserProfile("carol", store=reopened).preferences == {"interests": ["gaming"]}
+    reopened.close()
+
+def test_cache_is_bounded_and_expires(store):
+    """
+    Test the LRU bound and that entries older than the TTL are re-read from SQLite.
+    """
+    profile_store, clock = store
+    assert list(profile_store._entries) == ["bob", "carol"]
+    profile_store.get_many(["bob", "carol"])
+    assert (profile_store.hits, profile_store.misses) == (2, 0)
+    clock.now = 11.0
+    profile_store.get_many(["bob"])
+    assert (profile_store.hits, profile_store.misses) == (2, 1)
+
+def test_recommend_cohort_from_store(store):
+    """
+    Test that cohort recommendations from interest IDs match the string-based path.
+    """
+    profile_store, _ = store
+    recommender = RecommenderSystem()
+    recommender.index_trends([
+        {"id": 1, "label": "Trend 1: crypto twitter, pepe", "terms": {"crypto twitter": 0.9, "pepe": 0.4}},
+        {"id": 2, "label": "Trend 2: ai agents", "terms": {"ai agents": 1.0}},
+    ])
+    cohort = recommender.recommend_cohort(profile_store, ["alice", "bob", "carol", "nobody"], k=2)
+    expected = recommender.recommend_many({"alice": ["crypto", "pepe"], "bob": ["ai agents"], "carol": ["gaming"]}, k=2)
+    assert cohort == expected
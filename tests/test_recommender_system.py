@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+from recommender.recommender_system import RecommenderSystem
+
+@pytest.fixture
+def recommender():
+    """
+    Fixture with three indexed trends.
+    """
+    system = RecommenderSystem(block_size=2)
+    system.index_trends([
+        {"id": 1, "label": "Trend 1: crypto twitter, pepe", "terms": {"crypto twitter": 0.9, "pepe": 0.4}},
+        {"id": 4, "label": "Trend 4: ai agents, gaming", "terms": {"ai agents": 0.8, "gaming": 0.6}},
+        {"id": 7, "label": "Trend 7: nfts, pepe", "terms": {"nfts": 0.5, "pepe": 0.5}},
+    ])
+    return system
+
+def test_recommend_many_ranks_trends_per_user(recommender):
+    """
+    Test that users get their matching trends ranked by score, and nothing when nothing matches.
+    """
+    recommendations = recommender.recommend_many({
+        "alice": ["Crypto", "PEPE"],
+        "bob": ["AI", "gaming"],
+        "carol": ["gardening"],
+        "dave": ["pepe"],
+    }, k=2)
+    assert [r["trend_id"] for r in recommendations["alice"]] == [1, 7]
+    assert [r["trend_id"] for r in recommendations["bob"]] == [4]
+    assert recommendations["carol"] == []
+    assert [r["trend_id"] for r in recommendations["dave"]] == [7, 1], "Pepe weighs more in the shorter trend"
+    assert recommendations["alice"][0]["score"] > recommendations["alice"][1]["score"]
+    assert recommendations["bob"][0]["recommendation"] == "Create a meme coin based on Trend 4: ai agents, gaming"
+
+def test_score_users_matches_dense_product(recommender):
+    """
+    Test that blocked top-k scoring agrees with a brute-force dense computation.
+    """
+    rng = np.random.default_rng(0)
+    tokens = list(recommender.vocabulary)
+    interests = [list(rng.choice(tokens, size=rng.integers(0, 4))) for _ in range(7)]
+    users = recommender.user_matrix(interests)
+    top_rows, top_scores = recommender.score_users(users, k=3)
+    dense = users.toarray() @ recommender.trend_matrix.toarray().T
+    assert np.allclose(top_scores, -np.sort(-dense, axis=1), atol=1e-6)
+    assert np.allclose(np.take_along_axis(dense, top_rows, axis=1), top_scores, atol=1e-6)
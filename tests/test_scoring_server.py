@@ -0,0 +1,93 @@
+import asyncio
+import aiohttp
+import numpy as np
+import pytest
+from meme_predictor.feature_extractor import FeatureExtractor
+from meme_predictor.meme_model import MemeModel
+from meme_predictor.scoring_server import LatencyTracker, MicroBatcher, ScoringServer
+
+@pytest.fixture
+def trained_components(tmp_path):
+    """
+    Fixture fitting a small hashing vectorizer and model on synthetic posts.
+    """
+    rng = np.random.default_rng(0)
+    words = ["moon", "pump", "doge", "pepe", "rug", "dump", "scam", "whale", "bonk", "wif"]
+    documents = [" ".join(rng.choice(words, size=6)) for _ in range(200)]
+    y = np.array([int("moon" in doc or "pepe" in doc) for doc in documents])
+    feature_extractor = FeatureExtractor(hashing=True, n_features=2 ** 12)
+    features = feature_extractor.fit_transform(documents)
+    meme_model = MemeModel(model_path=str(tmp_path / "model.joblib"), n_jobs=1)
+    meme_model.train(features, y)
+    return feature_extractor, meme_model, documents
+
+def test_predict_raw_matches_predict(trained_components):
+    """
+    Test that the inplace booster path agrees with the sklearn wrapper.
+    """
+    feature_extractor, meme_model, documents = trained_components
+    features = feature_extractor.transform(documents[:20])
+    assert np.allclose(meme_model.predict_raw(features), meme_model.predict(features), atol=1e-6)
+
+def test_scoring_server_micro_batches(trained_components):
+    """
+    Test that concurrent single-post requests are batched and scored like offline predictions.
+    """
+    feature_extractor, meme_model, documents = trained_components
+    texts = documents[:32]
+    expected = meme_model.predict(feature_extractor.transform(texts))
+
+    async def run():
+        server = ScoringServer(feature_extractor, meme_model, max_batch_size=16, max_wait_ms=20)
+        address = await server.start(port=0)
+        try:
+            async with aiohttp.ClientSession() as session:
+                async def score(text):
+                    async with session.post(f"{address}/score", json={"text": text}) as response:
+                        return (await response.json())["score"]
+                scores = await asyncio.gather(*(score(text) for text in texts))
+                async with session.post(f"{address}/score", json={"texts": texts[:3]}) as response:
+                    bulk = (await response.json())["scores"]
+                for bad in ({"texts": "nope"}, ["not", "an", "object"], "text"):
+                    async with session.post(f"{address}/score", json=bad) as response:
+                        assert response.status == 400
+                async with session.get(f"{address}/metrics") as response:
+                    metrics = await response.json()
+            return scores, bulk, metrics
+        finally:
+            await server.stop()
+
+    scores, bulk, metrics = asyncio.run(run())
+    assert np.allclose(scores, expected, atol=1e-6)
+    assert np.allclose(bulk, expected[:3], atol=1e-6)
+    assert metrics["count"] == 35
+    assert metrics["batches"] < 35, "Concurrent requests should share batches"
+    assert metrics["p50_ms"] <= metrics["p99_ms"]
+
+def test_latency_tracker_window():
+    """
+    Test that percentiles are computed over the most recent samples only.
+    """
+    tracker = LatencyTracker(window=100)
+    for value in range(1000):
+        tracker.record(float(value))
+    snapshot = tracker.snapshot()
+    assert snapshot["count"] == 1000
+    assert 900 <= snapshot["p50_ms"] <= snapshot["p99_ms"] <= 999
+
+def test_micro_batcher_fails_unscored_requests():
+    """
+    Test that requests left without a score by a short batch fail instead of hanging.
+    """
+    async def run():
+        batcher = MicroBatcher(lambda texts: [1.0] * (len(texts) - 1), max_batch_size=3, max_wait_ms=50)
+        batcher.start()
+        try:
+            return await asyncio.wait_for(
+                asyncio.gather(*(batcher.submit(text) for text in "abc"), return_exceptions=True), 5)
+        finally:
+            await batcher.stop()
+
+    results = asyncio.run(run())
+    assert results[:2] == [1.0, 1.0]
+    assert isinstance(results[2], ValueError)
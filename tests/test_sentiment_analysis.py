@@ -0,0 +1,133 @@
+import math
+import numpy as np
+import pytest
+from trend_analysis import sentiment_analysis
+from trend_analysis.inference_engine import BatchedInferenceEngine, ScoreCache
+
+LABELS = {0: "1 star", 1: "2 stars", 2: "3 stars", 3: "4 stars", 4: "5 stars"}
+
+class FakeTokenizer:
+    """
+    Whitespace tokenizer with the call/pad interface the engine relies on.
+    """
+    def __call__(self, texts, truncation=True, max_length=512):
+        ids = [[len(word) for word in text.split()][:max_length] for text in texts]
+        return {"input_ids": ids, "attention_mask": [[1] * len(row) for row in ids]}
+
+    def pad(self, features, return_tensors="np"):
+        width = max(len(f["input_ids"]) for f in features)
+        return {
+            name: np.array([f[name] + [0] * (width - len(f[name])) for f in features])
+            for name in ("input_ids", "attention_mask")
+        }
+
+class FakeModel:
+    """
+    Scores texts by word count and records batch shapes; fails on batches containing a 99-letter word.
+    """
+    def __init__(self):
+        self.batch_shapes = []
+
+    def __call__(self, batch):
+        self.batch_shapes.append(batch["input_ids"].shape)
+        if (batch["input_ids"] == 99).any():
+            raise RuntimeError("bad batch")
+        logits = np.zeros((len(batch["input_ids"]), 5))
+        logits[np.arange(len(logits)), np.minimum(batch["attention_mask"].sum(axis=1) - 1, 4)] = 5.0
+        return logits
+
+@pytest.fixture
+def analyzer(monkeypatch):
+    """
+    Fixture building SentimentAnalysis around the fake tokenizer and model.
+    """
+    model = FakeModel()
+
+    class FakePipeline:
+        tokenizer = FakeTokenizer()
+        model = type("FakeHFModel", (), {"config": type("FakeConfig", (), {"id2label": LABELS})})()
+
+    monkeypatch.setattr(sentiment_analysis, "pipeline", lambda *args, **kwargs: FakePipeline())
+    monkeypatch.setattr(sentiment_analysis, "torch_forward", lambda *args, **kwargs: model)
+    instance = sentiment_analysis.SentimentAnalysis(batch_size=2)
+    instance.engine.return_tensors = "np"
+    return instance, model
+
+def test_engine_batches_by_length():
+    """
+    Test that length-sorted batching keeps results in input order and pads little.
+    """
+    model = FakeModel()
+    engine = BatchedInferenceEngine(FakeTokenizer(), model, LABELS, batch_size=2, return_tensors="np")
+    texts = ["a b c d e", "a", "a b c d", "a b"]
+    results = engine.predict(texts)
+    assert [r["label"] for r in results] == ["5 stars", "1 star", "4 stars", "2 stars"]
+    assert model.batch_shapes == [(2, 2), (2, 5)]
+
+def test_analyze_sentiment_isolates_failed_batch(analyzer):
+    """
+    Test that a failing batch only affects its own texts.
+    """
+    instance, _ = analyzer
+    bad = "x" * 99
+    sentiments = instance.analyze_sentiment(["great", "nice", bad, "wow", "a b c d e"])
+    assert sentiments[0] < 0 and sentiments[1] < 0
+    assert math.isnan(sentiments[2]) and math.isnan(sentiments[3]), "Batch-mates of the bad text fail together"
+    assert sentiments[4] > 0
+
+def test_analyze_sentiment_uses_cache(analyzer):
+    """
+    Test that repeated texts are scored once.
+    """
+    instance, model = analyzer
+    first = instance.analyze_sentiment(["to the moon", "rug pull"])
+    calls = len(model.batch_shapes)
+    second = instance.analyze_sentiment(["rug pull", "to the moon", "to the moon"])
+    assert len(model.batch_shapes) == calls
+    assert second == [first[1], first[0], first[0]]
+
+def test_score_cache_persists_and_evicts(tmp_path):
+    """
+    Test the LRU bound and read-through from the on-disk store.
+    """
+    path = str(tmp_path / "scores.sqlite")
+    cache = ScoreCache(max_size=2, path=path)
+    cache.put_many({"a": 0.1, "b": 0.2, "c": 0.3})
+    assert list(cache._entries) == ["b", "c"]
+    cache.close()
+    reopened = ScoreCache(max_size=2, path=path)
+    assert reopened.get_many(["a", "c", "z"]) == {"a": 0.1, "c": 0.3}
+    assert (reopened.hits, reopened.misses) == (2, 1)
+
+@pytest.fixture(scope="module")
+def tiny_model_dir(tmp_path_factory):
+    """
+    Fixture saving a small randomly initialised BERT classifier with the nlptown label set.
+    """
+    torch = pytest.importorskip("torch")
+    from transformers import BertConfig, BertForSequenceClassification, BertTokenizer
+    path = tmp_path_factory.mktemp("tiny_sentiment_model")
+    words = "pepe doge wif bonk moon rug pump dump launch whale bullish bearish solana memecoin".split()
+    (path / "vocab.txt").write_text("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + words))
+    config = BertConfig(
+        vocab_size=len(words) + 5, hidden_size=64, num_hidden_layers=2, num_attention_heads=2,
+        intermediate_size=128, num_labels=5, id2label=LABELS, label2id={v: k for k, v in LABELS.items()}
+    )
+    torch.manual_seed(0)
+    BertForSequenceClassification(config).save_pretrained(path)
+    BertTokenizer(str(path / "vocab.txt")).save_pretrained(path)
+    return str(path)
+
+@pytest.mark.parametrize("backend", ["quantized", "onnx"])
+def test_backend_parity_with_fp32(tiny_model_dir, tmp_path, backend):
+    """
+    Test that the quantized and ONNX backends keep mapped scores within tolerance of FP32.
+    """
+    if backend == "onnx":
+        pytest.importorskip("onnxruntime")
+    texts = ["pepe to the moon", "rug pull dump bearish whale", "solana memecoin launch", "wif bonk doge pump"]
+    baseline = sentiment_analysis.SentimentAnalysis(tiny_model_dir).analyze_sentiment(texts)
+    candidate = sentiment_analysis.SentimentAnalysis(
+        tiny_model_dir, backend=backend, onnx_path=str(tmp_path / "model.onnx")
+    ).analyze_sentiment(texts)
+    assert np.allclose(candidate, baseline, atol=0.05)
@@ -0,0 +1,40 @@
+import random
+import numpy as np
+import pytest
+from meme_predictor.feature_extractor import FeatureExtractor
+from preprocessing.shared_tokenizer import SharedTokenizer
+from trend_analysis.trend_detector import TrendDetector
+
+@pytest.fixture
+def corpus():
+    """
+    Fixture generating a small random corpus with a skewed vocabulary.
+    """
+    rng = random.Random(0)
+    words = ["pepe", "doge", "moon", "rug", "pump", "solana", "whale", "launch", "frog", "chart", "bonk", "wif"]
+    weights = [1.0 / (rank + 1) for rank in range(len(words))]
+    return [" ".join(rng.choices(words, weights, k=rng.randint(3, 12))) for _ in range(200)]
+
+def test_shared_tokens_match_independent_vectorizers(corpus):
+    """
+    Test that both consumers get the same TF-IDF matrices and fitted state as tokenizing separately.
+    """
+    shared = SharedTokenizer().fit(corpus)
+    for make_vectorizer in (lambda: TrendDetector().vectorizer, lambda: FeatureExtractor(max_features=20).vectorizer):
+        expected_vectorizer = make_vectorizer()
+        expected = expected_vectorizer.fit_transform(corpus)
+        shared_vectorizer = make_vectorizer()
+        actual = shared.tfidf_for(shared_vectorizer)
+        assert list(shared_vectorizer.get_feature_names_out()) == list(expected_vectorizer.get_feature_names_out())
+        assert np.allclose(actual.toarray(), expected.toarray())
+        new_documents = ["pepe moon launch", "solana whale"]
+        assert np.allclose(shared_vectorizer.transform(new_documents).toarray(),
+                           expected_vectorizer.transform(new_documents).toarray())
+
+def test_shared_tokens_reject_uncovered_ngrams(corpus):
+    """
+    Test that consumers needing n-grams the shared pass did not produce are refused.
+    """
+    shared = SharedTokenizer(ngram_range=(1, 1)).fit(corpus)
+    with pytest.raises(ValueError):
+        shared.tfidf_for(FeatureExtractor().vectorizer)
@@ -0,0 +1,82 @@
+from solana.keypair import Keypair
+from solana.rpc.types import TxOpts
+from solana.system_program import TransferParams, transfer
+from solana.transaction import Transaction
+from blockchain_integration.rpc_client import RPCError, SolanaRPC
+from blockchain_integration.smart_contract import SmartContract
+from blockchain_integration.solana_connector import SolanaConnector
+
+class FakeClock:
+    """
+    Manually advanced clock for TTL tests.
+    """
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_get_balances_batches_and_caches(solana_stub):
+    """
+    Test that 250 wallets cost one HTTP request, chunked to the node's account limit, and are cached per commitment.
+    """
+    wallets = [str(Keypair().public_key) for _ in range(250)]
+    solana_stub.balances = {wallet: i * 10 for i, wallet in enumerate(wallets[:200])}
+    clock = FakeClock()
+
+    async def scenario(url):
+        rpc = SolanaRPC(url, cache_ttl=2.0, clock=clock)
+        connector = SolanaConnector(rpc=rpc)
+        first = await connector.get_balances(wallets + wallets[:5])
+        requests_after_first = solana_stub.http_requests
+        second = await connector.get_balances(wallets[:50])
+        finalized = await rpc.get_balances(wallets[:50], commitment="finalized")
+        clock.now = 5.0
+        single = await connector.get_balance(wallets[1])
+        await connector.close()
+        return first, requests_after_first, second, finalized, single
+
+    first, requests_after_first, second, finalized, single = solana_stub.run(scenario)
+    assert first == {wallet: (i * 10 if i < 200 else 0) for i, wallet in enumerate(wallets)}
+    assert requests_after_first == 1 and solana_stub.calls[:3] == ["getMultipleAccounts"] * 3
+    assert second == {wallet: first[wallet] for wallet in wallets[:50]}
+    assert finalized == second
+    assert single == 10
+    assert solana_stub.calls.count("getMultipleAccounts") == 5, "Cached reads skip the node until the TTL expires"
+
+def test_batch_isolates_failed_requests(solana_stub):
+    """
+    Test that an error in one batched request is returned in its slot only.
+    """
+    async def scenario(url):
+        rpc = SolanaRPC(url, max_batch_size=2)
+        results = await rpc.batch([("getBlockHeight", []), ("noSuchMethod", []), ("getBlockHeight", [])])
+        await rpc.close()
+        return results
+
+    results = solana_stub.run(scenario)
+    assert results[0] == results[2] == 1000
+    assert isinstance(results[1], RPCError) and results[1].code == -32602
+    assert solana_stub.http_requests == 2
+
+def test_smart_contract_shares_connector_pool(solana_stub):
+    """
+    Test that a transaction is signed with a fetched blockhash, sent over the shared client and confirmed.
+    """
+    sender = Keypair()
+
+    async def scenario(url):
+        connector = SolanaConnector(url)
+        contract = SmartContract(str(Keypair().public_key), connector=connector)
+        transaction = Transaction().add(transfer(TransferParams(
+            from_pubkey=sender.public_key, to_pubkey=Keypair().public_key, lamports=1000)))
+        signature = await connector.send_transaction(transaction, sender, opts=TxOpts(skip_confirmation=False))
+        invoked = await contract.invoke_contract({}, sender)
+        await contract.close()
+        assert not connector.rpc._session.closed, "Closing the contract must not close the shared pool"
+        await connector.close()
+        return signature, invoked, contract.connector.rpc is connector.rpc
+
+    signature, invoked, shared = solana_stub.run(scenario)
+    assert signature in solana_stub.statuses and invoked in solana_stub.statuses and shared
+    assert solana_stub.calls.count("getSignatureStatuses") >= 1
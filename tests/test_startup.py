@@ -0,0 +1,210 @@
+import asyncio
+import os
+import subprocess
+import sys
+import pytest
+from config.settings import Settings
+from pipeline import prefork
+from pipeline.components import Components
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("sklearn", "xgboost", "transformers", "torch", "solana")
+
+class FakeSentiment:
+    """
+    Stands in for SentimentAnalysis; counts `load` calls and fails while `broken` is set.
+    """
+    loads = 0
+    broken = False
+
+    def load(self):
+        FakeSentiment.loads += 1
+
+    def analyze_sentiment(self, texts):
+        if self.broken:
+            raise RuntimeError("model unavailable")
+        return [0.5] * len(texts)
+
+def loaded_components():
+    return os.getpid(), prefork._components.loaded
+
+def test_settings_are_validated_per_component(monkeypatch):
+    """
+    Test that missing secrets only fail the components that need them.
+    """
+    for name in ("TWITTER_BEARER_TOKEN", "REDDIT_CLIENT_ID", "REDDIT_CLIENT_SECRET", "SMART_CONTRACT_PROGRAM_ID"):
+        monkeypatch.delenv(name, raising=False)
+    settings = Settings(_env_file=None)
+    components = Components(settings)
+    with pytest.raises(ValueError, match="TWITTER_BEARER_TOKEN, REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET"):
+        components.get("api")
+    assert settings.require("Solana", "solana_rpc_url") == ("https://api.mainnet-beta.solana.com",)
+    assert components.deduplicator is components.get("deduplicator"), "Components are built once"
+    assert components.loaded == ["deduplicator"]
+
+def test_ingest_role_skips_the_ml_stack(tmp_path):
+    """
+    Test that importing main and building the ingest pipeline imports no ML or Solana libraries.
+    """
+    script = (
+        "import sys, main\n"
+        "from pipeline.components import Components\n"
+        f"runner = main.build_pipeline(Components(main.settings, store_root={str(tmp_path)!r}), 'w', role='ingest')\n"
+        "print([stage.name for stage in runner.stages])\n"
+        f"print(sorted(name for name in {HEAVY_MODULES!r} if name in sys.modules))\n"
+    )
+    env = {key: value for key, value in os.environ.items() if not key.startswith(("TWITTER", "REDDIT"))}
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env, capture_output=True, text=True,
+                            timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split("\n")[:2] == ["['collect', 'store']", "[]"]
+
+def test_sentiment_analysis_loads_on_first_use(monkeypatch):
+    """
+    Test that constructing SentimentAnalysis loads nothing until it is used.
+    """
+    from trend_analysis import sentiment_analysis
+    calls = []
+    monkeypatch.setattr(sentiment_analysis, "pipeline", lambda *args, **kwargs: calls.append(args) or 1 / 0)
+    analyzer = sentiment_analysis.SentimentAnalysis()
+    assert not calls and not analyzer.loaded
+    assert analyzer.analyze_sentiment(["gm"]) == [], "A failed load is logged like other scoring errors"
+    assert len(calls) == 1
+
+def test_prefork_workers_share_preloaded_components():
+    """
+    Test that workers are forked after preloading and inherit the loaded components.
+    """
+    FakeSentiment.loads = 0
+    components = Components(Settings(_env_file=None), instances={"sentiment": FakeSentiment()})
+    pool = prefork.PreforkPool(components, ["sentiment", "deduplicator"], workers=2).start()
+    try:
+        assert FakeSentiment.loads == 1
+        pid, loaded = pool.executor.submit(loaded_components).result()
+        assert pid != os.getpid()
+        assert sorted(loaded) == ["deduplicator", "sentiment"]
+        assert pool.executor.submit(pool.task("sentiment", "analyze_sentiment"), ["a", "b"]).result() == [0.5, 0.5]
+    finally:
+        pool.close()
+
+def publish_model(bundle_dir, bullish):
+    """
+    Trains a model scoring "$PEPE to the moon" posts high when `bullish` (low otherwise) and publishes it.
+    """
+    from meme_predictor.artifact_bundle import ArtifactBundle
+    from meme_predictor.feature_extractor import FeatureExtractor
+    from meme_predictor.meme_model import MemeModel
+    texts = [f"$PEPE to the moon {i}" if i % 2 else f"rug pull dump {i}" for i in range(200)]
+    extractor = FeatureExtractor()
+    model = MemeModel(model_path=os.path.join(bundle_dir, "unused.joblib"))
+    assert model.train(extractor.fit_transform(texts), [(i + (not bullish)) % 2 for i in range(200)])
+    assert ArtifactBundle(bundle_dir).save(extractor, model)
+
+def test_score_role_uses_published_model(tmp_path):
+    """
+    Test that a scoring process scores every stored document once with the model and vectorizer
+    a training run published, including old posts stored late and documents of a failed cycle.
+    """
+    pytest.importorskip("pyarrow")
+    import main
+    from data_collection.api_integrations import tweet_record
+    publish_model(str(tmp_path / "bundle"), bullish=True)
+
+    sentiment = FakeSentiment()
+    components = Components(Settings(_env_file=None), pretrained=True, model_dir=str(tmp_path),
+                            store_root=str(tmp_path / "documents"), instances={"sentiment": sentiment})
+    components.store.append([tweet_record({"id": "1", "text": "$PEPE to the moon", "public_metrics": {}}),
+                             tweet_record({"id": "2", "text": "rug pull dump", "public_metrics": {}})])
+    runner = main.build_pipeline(components, "w", role="score")
+    try:
+        context = asyncio.run(runner.run_once())
+        assert not runner.last_failures
+        assert context["sentiments"] == [0.5, 0.5]
+        assert context["predictions"][0] > 0.5 > context["predictions"][1]
+        assert asyncio.run(runner.run_once())["documents"] == [], "Each document is scored once"
+
+        # A long-past tweet ingested only now must still be scored
+        components.store.append([tweet_record({"id": "3", "text": "$PEPE to the moon again",
+                                               "created_at": "2020-01-01T00:00:00.000Z", "public_metrics": {}})])
+        sentiment.broken = True
+        assert asyncio.run(runner.run_once())["documents"] == ["$PEPE to the moon again"]
+        assert "mark_scored" in runner.last_failures
+        sentiment.broken = False
+        context = asyncio.run(runner.run_once())
+        assert context["documents"] == ["$PEPE to the moon again"], "A failed cycle's documents are retried"
+        assert context["predictions"][0] > 0.5 and not runner.last_failures
+        assert asyncio.run(runner.run_once())["documents"] == []
+        assert context["refreshed"] is False
+    finally:
+        runner.close()
+
+def test_score_role_reloads_newly_published_model(tmp_path):
+    """
+    Test that a long-running scoring process switches to a model published after it started,
+    and keeps scoring with its current model while the published bundle is unreadable.
+    """
+    pytest.importorskip("pyarrow")
+    import main
+    from data_collection.api_integrations import tweet_record
+    bundle_dir = str(tmp_path / "bundle")
+    publish_model(bundle_dir, bullish=True)
+    components = Components(Settings(_env_file=None), pretrained=True, model_dir=str(tmp_path),
+                            store_root=str(tmp_path / "documents"), instances={"sentiment": FakeSentiment()})
+    runner = main.build_pipeline(components, "w", role="score")
+
+    def score(text_id):
+        components.store.append([tweet_record({"id": text_id, "text": "$PEPE to the moon", "public_metrics": {}})])
+        return asyncio.run(runner.run_once())
+
+    try:
+        first = score("1")
+        assert first["predictions"][0] > 0.5 and first["refreshed"] is False
+        publish_model(bundle_dir, bullish=False)
+        second = score("2")
+        assert second["refreshed"] is True and not runner.last_failures
+        assert second["predictions"][0] < 0.5, "The newly published model is used"
+
+        os.remove(os.path.join(bundle_dir, "manifest.json"))
+        third = score("3")
+        assert third["refreshed"] is False and third["predictions"][0] < 0.5
+    finally:
+        runner.close()
+
+def test_prefork_pool_restart_forks_fresh_workers():
+    """
+    Test that restarting the pool reloads dropped components and replaces every worker.
+    """
+    FakeSentiment.loads = 0
+    components = Components(Settings(_env_file=None), instances={"sentiment": FakeSentiment()})
+    pool = prefork.PreforkPool(components, ["deduplicator"], workers=1).start()
+    try:
+        first_pid, _ = pool.submit(loaded_components).result()
+        deduplicator = components.deduplicator
+        components._instances.pop("deduplicator")
+        pool.restart()
+        pid, loaded = pool.submit(loaded_components).result()
+        assert pid != first_pid
+        assert loaded == ["sentiment", "deduplicator"] and components.deduplicator is not deduplicator
+    finally:
+        pool.close()
+    with pytest.raises(RuntimeError, match="not running"):
+        pool.submit(os.getpid)
+
+def test_failed_training_is_not_published(tmp_path):
+    """
+    Test that a cycle whose labels cannot be stratified does not overwrite the published model,
+    and that a successful one publishes a single bundle.
+    """
+    import main
+    from meme_predictor.artifact_bundle import ArtifactBundle
+    components = Components(Settings(_env_file=None), model_dir=str(tmp_path))
+    runner = main.build_pipeline(components, "w")
+    train = next(stage for stage in runner.stages if stage.name == "train").func
+    features = components.feature_extractor.fit_transform([f"gm {i}" for i in range(20)])
+    with pytest.raises(RuntimeError, match="training failed"):
+        train(features, [0] * 19 + [1])
+    assert os.listdir(tmp_path) == []
+
+    assert train(features, [i % 2 for i in range(20)])
+    assert os.listdir(tmp_path) == ["bundle"]
+    assert ArtifactBundle(components.bundle_dir).load(checksums=True) is not None
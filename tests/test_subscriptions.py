@@ -0,0 +1,93 @@
+import asyncio
+from blockchain_integration.subscriptions import SolanaSubscriptions, ws_url_for
+
+PROGRAM_ID = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
+
+async def take(subscription, n):
+    items = []
+    async for item in subscription:
+        items.append(item)
+        if len(items) == n:
+            break
+    return items
+
+def test_ws_url_for():
+    """
+    Test the http(s) -> ws(s) endpoint mapping.
+    """
+    assert ws_url_for("https://api.mainnet-beta.solana.com") == "wss://api.mainnet-beta.solana.com"
+    assert ws_url_for("http://127.0.0.1:8899") == "ws://127.0.0.1:8899"
+
+def test_streams_route_notifications_and_resubscribe(solana_ws_stub):
+    """
+    Test that notifications reach the right iterator and streams resume after a dropped connection.
+    """
+    async def scenario(url):
+        client = SolanaSubscriptions(url, base_backoff=0.01)
+        logs = await client.logs_subscribe(PROGRAM_ID)
+        accounts = await client.account_subscribe("9jUCqKjpSLPNQwWtscfFX27Ky43mxJVmwUT6TX9CkPuF")
+        await solana_ws_stub.wait_for_subscriptions(2)
+        await solana_ws_stub.publish("logsSubscribe", {"value": {"signature": "a", "logs": ["launch"]}})
+        await solana_ws_stub.publish("accountSubscribe", {"value": {"lamports": 5}})
+        first_logs = await take(logs, 1)
+        first_accounts = await take(accounts, 1)
+
+        await solana_ws_stub.drop_connections()
+        await solana_ws_stub.wait_for_subscriptions(2)
+        await solana_ws_stub.publish("logsSubscribe", {"value": {"signature": "b", "logs": []}})
+        second_logs = await take(logs, 1)
+
+        await client.unsubscribe(accounts)
+        program = await client.program_subscribe(PROGRAM_ID)
+        await solana_ws_stub.wait_for_subscriptions(2)
+        await client.close()
+        remaining = [item async for item in program]
+        return first_logs, first_accounts, second_logs, client.reconnects, remaining
+
+    first_logs, first_accounts, second_logs, reconnects, remaining = solana_ws_stub.run(scenario)
+    assert first_logs[0]["value"]["signature"] == "a"
+    assert first_accounts[0]["value"]["lamports"] == 5
+    assert second_logs[0]["value"]["signature"] == "b"
+    assert reconnects == 1
+    assert solana_ws_stub.subscribe_calls.count("logsSubscribe") == 2, "Streams are resubscribed after reconnect"
+    assert solana_ws_stub.unsubscribe_calls == ["accountUnsubscribe"]
+    assert solana_ws_stub.subscriptions and remaining == []
+
+def test_slow_consumer_drops_oldest(solana_ws_stub):
+    """
+    Test that a full queue keeps the newest notifications and counts what it dropped.
+    """
+    async def scenario(url):
+        client = SolanaSubscriptions(url, queue_size=3)
+        logs = await client.logs_subscribe(PROGRAM_ID)
+        await solana_ws_stub.wait_for_subscriptions(1)
+        for i in range(10):
+            await solana_ws_stub.publish("logsSubscribe", {"value": {"signature": str(i)}})
+        while logs.received < 10:
+            await asyncio.sleep(0.01)
+        items = await take(logs, 3)
+        await client.close()
+        return items, logs.dropped
+
+    items, dropped = solana_ws_stub.run(scenario)
+    assert [item["value"]["signature"] for item in items] == ["7", "8", "9"]
+    assert dropped == 7
+
+def test_malformed_messages_do_not_end_streams(solana_ws_stub):
+    """
+    Test that garbage frames and notifications without a subscription are skipped.
+    """
+    async def scenario(url):
+        client = SolanaSubscriptions(url)
+        logs = await client.logs_subscribe(PROGRAM_ID)
+        await solana_ws_stub.wait_for_subscriptions(1)
+        await solana_ws_stub.send_raw("not json {")
+        await solana_ws_stub.send_raw('{"jsonrpc": "2.0", "method": "logsNotification", "params": {}}')
+        await solana_ws_stub.publish("logsSubscribe", {"value": {"signature": "ok"}})
+        items = await take(logs, 1)
+        await client.close()
+        return items, client.malformed, client.reconnects
+
+    items, malformed, reconnects = solana_ws_stub.run(scenario)
+    assert items[0]["value"]["signature"] == "ok"
+    assert (malformed, reconnects) == (2, 0)
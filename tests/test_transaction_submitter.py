@@ -0,0 +1,108 @@
+from solana.keypair import Keypair
+from solana.system_program import TransferParams, transfer
+from solana.transaction import Transaction
+from blockchain_integration.rpc_client import SolanaRPC
+from blockchain_integration.smart_contract import SmartContract
+from blockchain_integration.solana_connector import SolanaConnector
+from blockchain_integration.transaction_submitter import TransactionSubmitter
+
+def make_transfers(sender, n):
+    return [Transaction().add(transfer(TransferParams(
+        from_pubkey=sender.public_key, to_pubkey=Keypair().public_key, lamports=1000 + i))) for i in range(n)]
+
+def test_submit_many_pipelines_sends_and_polls(solana_stub):
+    """
+    Test that 250 transactions are sent and confirmed with a handful of batched round trips.
+    """
+    sender = Keypair()
+
+    async def scenario(url):
+        rpc = SolanaRPC(url)
+        submitter = TransactionSubmitter(rpc, poll_interval=0.01)
+        records = await submitter.submit_many(make_transfers(sender, 250), sender)
+        await submitter.close()
+        await rpc.close()
+        return records
+
+    records = solana_stub.run(scenario)
+    assert all(record["status"] == "confirmed" and record["attempts"] == 1 for record in records)
+    assert len({record["signature"] for record in records}) == 250
+    assert solana_stub.calls.count("getLatestBlockhash") == 1, "All transactions share the cached blockhash"
+    assert solana_stub.http_requests <= 6
+
+def test_expired_blockhash_is_resent(solana_stub):
+    """
+    Test that transactions that never land are re-signed with a fresh blockhash once theirs expires.
+    """
+    sender = Keypair()
+    solana_stub.dropped_blockhashes.add(solana_stub.blockhash)
+    solana_stub.height_step = 100
+
+    async def scenario(url):
+        connector = SolanaConnector(url)
+        connector.submitter.poll_interval = 0.01
+        records = await connector.send_transactions(make_transfers(sender, 3), sender)
+        await connector.close()
+        return records
+
+    records = solana_stub.run(scenario)
+    assert all(record["status"] == "confirmed" and record["attempts"] == 2 for record in records)
+    assert all(record["signature"] in solana_stub.statuses for record in records)
+
+def test_expired_transactions_give_up_after_max_attempts(solana_stub):
+    """
+    Test that a transaction is reported expired once it has used all its attempts.
+    """
+    sender = Keypair()
+    solana_stub.dropped_blockhashes.add(solana_stub.blockhash)
+    solana_stub.height_step = 100
+
+    async def scenario(url):
+        rpc = SolanaRPC(url)
+        submitter = TransactionSubmitter(rpc, poll_interval=0.01, max_attempts=1)
+        records = await submitter.submit_many(make_transfers(sender, 2), [[sender], [sender]])
+        await submitter.close()
+        await rpc.close()
+        return records
+
+    assert [record["status"] for record in solana_stub.run(scenario)] == ["expired", "expired"]
+
+def test_invoke_many(solana_stub):
+    """
+    Test that contract invocations are submitted together and all return signatures.
+    """
+    signer = Keypair()
+
+    async def scenario(url):
+        connector = SolanaConnector(url)
+        connector.submitter.poll_interval = 0.01
+        contract = SmartContract(str(Keypair().public_key), connector=connector)
+        signatures = await contract.invoke_many([{}] * 5, signer)
+        await connector.close()
+        return signatures
+
+    signatures = solana_stub.run(scenario)
+    assert len(signatures) == 5 and all(signature in solana_stub.statuses for signature in signatures)
+
+def test_invoke_many_reports_every_failed_invocation(solana_stub):
+    """
+    Test that a failed submission still yields one (failed) entry per invocation.
+    """
+    signer = Keypair()
+
+    async def broken_submit_many(transactions, signers):
+        raise ConnectionError("node unreachable")
+
+    async def scenario(url):
+        connector = SolanaConnector(url)
+        connector.submitter.submit_many = broken_submit_many
+        contract = SmartContract(str(Keypair().public_key), connector=connector)
+        records = await connector.send_transactions(make_transfers(signer, 3), signer)
+        signatures = await contract.invoke_many([{}] * 4, signer)
+        await connector.close()
+        return records, signatures
+
+    records, signatures = solana_stub.run(scenario)
+    assert [record["status"] for record in records] == ["failed"] * 3
+    assert "node unreachable" in records[0]["err"]
+    assert signatures == [None] * 4
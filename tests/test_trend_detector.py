@@ -23,3 +23,54 @@ def test_trend_detector(sample_documents):
     assert "Bitcoin" in trends[0], "First trend should mention Bitcoin"
     assert "Meme coins" in trends[1], "Second trend should mention Meme coins"
 
+
+def test_incremental_trends_keep_stable_ids():
+    """
+    Test that online updates keep a persisting topic under the same trend ID.
+    """
+    batch = [
+        "pepe coin pump moon pepe frog",
+        "pepe frog meme coin moon",
+        "solana validator upgrade release network",
+        "solana network validator outage",
+    ] * 5
+    trend_detector = TrendDetector(n_topics=2, n_top_words=3)
+    first = trend_detector.update_trends(batch)
+    second = trend_detector.update_trends(batch[:8])
+
+    assert len(first) == len(second) == 2
+    by_id = {trend.split(":")[0]: trend for trend in first}
+    for trend in second:
+        assert trend.split(":")[0] in by_id, "Trend IDs should carry over between updates"
+        assert set(trend.split(": ")[1].split(", ")) & set(by_id[trend.split(":")[0]].split(": ")[1].split(", "))
+    assert [topic["label"] for topic in trend_detector.topics] == second, "Structured topics back the labels"
+    assert all(weight > 0 for topic in trend_detector.topics for weight in topic["terms"].values())
+
+def test_rising_terms_scored_against_baseline():
+    """
+    Test that a term spiking in the recent window outranks steady background terms.
+    """
+    trend_detector = TrendDetector(bucket_seconds=60, recent_buckets=2, baseline_buckets=10)
+    documents, timestamps = [], []
+    for minute in range(12):
+        documents += ["solana network update", "bitcoin price chart"] * 3
+        timestamps += [minute * 60.0] * 6
+    documents += ["pepe frog pump"] * 20
+    timestamps += ["1970-01-01T00:11:30.000Z"] * 10 + [600.0] * 10
+
+    rising = trend_detector.detect_rising_terms(documents, timestamps, top_k=3)
+
+    assert {trend["term"] for trend in rising} == {"pepe", "frog", "pump"}
+    assert rising[0]["zscore"] > 0 and rising[0]["timestamp"] == 720.0
+    assert all(trend["term"] not in ("solana", "bitcoin") for trend in rising)
+
+def test_term_counter_memory_is_bounded():
+    """
+    Test that the ring never holds more buckets than configured as time moves on.
+    """
+    trend_detector = TrendDetector(recent_buckets=2, baseline_buckets=3)
+    for hour in range(48):
+        trend_detector.detect_rising_terms(["meme coin season"], [hour * 3600.0])
+    counter = trend_detector.term_counter
+    assert len(counter._slots) == 5
+    assert sum(slot.nnz for slot in counter._slots) == 3, "Only the newest bucket should be populated"
@@ -0,0 +1,188 @@
+import hashlib
+import inspect
+import logging
+import os
+import sqlite3
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+def text_key(text: str, namespace: str = "") -> str:
+    """
+    Cache key for a text, namespaced (e.g. by model name) so scores from different models never mix.
+    """
+    return hashlib.blake2b(f"{namespace}\x00{text}".encode('utf-8'), digest_size=16).hexdigest()
+
+class ScoreCache:
+    def __init__(self, max_size: int = 100_000, path: Optional[str] = None):
+        """
+        Bounded LRU cache of float scores keyed by text hash.
+        With `path`, entries are also persisted to a SQLite file and read through on a miss.
+        """
+        self.max_size = max_size
+        self.path = path
+        self._entries: "OrderedDict[str, float]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS scores (key TEXT PRIMARY KEY, score REAL)")
+            self._db.commit()
+
+    def _remember(self, key: str, score: float) -> None:
+        self._entries[key] = score
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def get_many(self, keys: List[str]) -> Dict[str, float]:
+        """
+        Returns the cached scores for whichever of `keys` are known.
+        """
+        found: Dict[str, float] = {}
+        missing = []
+        for key in keys:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                found[key] = self._entries[key]
+            else:
+                missing.append(key)
+        if self._db is not None and missing:
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._db.execute(f"SELECT key, score FROM scores WHERE key IN ({placeholders})", chunk)
+                for key, score in rows:
+                    found[key] = score
+                    self._remember(key, score)
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, scores: Dict[str, float]) -> None:
+        """
+        Stores scores in memory and, when persistent, on disk in a single transaction.
+        """
+        for key, score in scores.items():
+            self._remember(key, score)
+        if self._db is not None and scores:
+            self._db.executemany("INSERT OR REPLACE INTO scores (key, score) VALUES (?, ?)", scores.items())
+            self._db.commit()
+
+    def close(self) -> None:
+        """
+        Closes the on-disk store, if any.
+        """
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+def torch_forward(model: Any, num_threads: Optional[int] = None) -> Callable[[Dict[str, Any]], np.ndarray]:
+    """
+    Wraps a PyTorch sequence-classification model as a batch -> logits function
+    running under `torch.inference_mode`.
+    """
+    import torch
+    if num_threads:
+        torch.set_num_threads(num_threads)
+    model.eval()
+
+    def forward(batch: Dict[str, Any]) -> np.ndarray:
+        with torch.inference_mode():
+            return model(**batch).logits.float().numpy()
+    return forward
+
+def quantize_dynamic(model: Any) -> Any:
+    """
+    Returns a copy of a PyTorch model with its Linear layers dynamically quantized to INT8.
+    """
+    import torch
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+def export_onnx(model: Any, tokenizer: Any, onnx_path: str) -> None:
+    """
+    Exports a PyTorch sequence-classification model to ONNX with dynamic batch and sequence axes.
+    """
+    import torch
+    sample = tokenizer(["sample text"], return_tensors='pt')
+    input_names = [name for name in ('input_ids', 'attention_mask', 'token_type_ids') if name in sample]
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names}
+    dynamic_axes['logits'] = {0: 'batch'}
+    export_kwargs = {}
+    if 'dynamo' in inspect.signature(torch.onnx.export).parameters:
+        export_kwargs['dynamo'] = False
+    os.makedirs(os.path.dirname(os.path.abspath(onnx_path)), exist_ok=True)
+    model.eval()
+    with torch.inference_mode():
+        torch.onnx.export(
+            model, tuple(sample[name] for name in input_names), onnx_path,
+            input_names=input_names, output_names=['logits'], dynamic_axes=dynamic_axes,
+            opset_version=14, **export_kwargs
+        )
+    logger.info(f"Exported ONNX model to {onnx_path}")
+
+def onnx_forward(onnx_path: str, num_threads: Optional[int] = None) -> Callable[[Dict[str, Any]], np.ndarray]:
+    """
+    Loads an exported model into an ONNX Runtime CPU session and wraps it as a batch -> logits function.
+    Expects batches produced with `return_tensors='np'`.
+    """
+    try:
+        import onnxruntime
+    except ImportError as e:
+        raise ImportError("The 'onnx' sentiment backend requires the onnxruntime package") from e
+    options = onnxruntime.SessionOptions()
+    options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if num_threads:
+        options.intra_op_num_threads = num_threads
+    session = onnxruntime.InferenceSession(onnx_path, options, providers=['CPUExecutionProvider'])
+    input_names = [i.name for i in session.get_inputs()]
+
+    def forward(batch: Dict[str, Any]) -> np.ndarray:
+        feed = {name: np.asarray(batch[name], dtype=np.int64) for name in input_names}
+        return session.run(['logits'], feed)[0]
+    return forward
+
+class BatchedInferenceEngine:
+    def __init__(self, tokenizer: Any, forward: Callable[[Dict[str, Any]], np.ndarray], id2label: Dict[int, str],
+                 batch_size: int = 32, max_length: int = 512, return_tensors: str = 'pt'):
+        """
+        Runs a sequence classifier over texts in length-sorted batches to minimize padding.
+        `forward` maps a padded batch (as produced by the tokenizer with `return_tensors`)
+        to a logits array of shape (batch, labels).
+        """
+        self.tokenizer = tokenizer
+        self.forward = forward
+        self.id2label = id2label
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.return_tensors = return_tensors
+
+    def predict(self, texts: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Returns a pipeline-style `{'label', 'score'}` result per text, in input order.
+        Texts in a batch that fails are returned as None; other batches are unaffected.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+        if not texts:
+            return results
+        encodings = self.tokenizer(list(texts), truncation=True, max_length=self.max_length)
+        input_ids = encodings['input_ids']
+        order = np.argsort([len(ids) for ids in input_ids], kind='stable')
+        for start in range(0, len(order), self.batch_size):
+            indices = order[start:start + self.batch_size]
+            try:
+                features = [{name: encodings[name][i] for name in encodings.keys()} for i in indices]
+                batch = self.tokenizer.pad(features, return_tensors=self.return_tensors)
+                logits = np.asarray(self.forward(dict(batch)), dtype=np.float64)
+                logits -= logits.max(axis=1, keepdims=True)
+                probabilities = np.exp(logits)
+                probabilities /= probabilities.sum(axis=1, keepdims=True)
+                best = probabilities.argmax(axis=1)
+                for row, i in enumerate(indices):
+                    results[i] = {'label': self.id2label[int(best[row])], 'score': float(probabilities[row, best[row]])}
+            except Exception as e:
+                logger.error(f"Inference failed for batch of {len(indices)} texts: {e}")
+        return results
@@ -1,17 +1,107 @@
 import logging
-from transformers import pipeline
-from typing import List
+import math
+import os
+import threading
+from typing import Any, List, Optional
+from monitoring.metrics import DOCUMENTS, record_cache, stage_timer
+from trend_analysis.inference_engine import (
+    BatchedInferenceEngine, ScoreCache, export_onnx, onnx_forward, quantize_dynamic, text_key, torch_forward
+)
 
 logger = logging.getLogger(__name__)
 
+BACKENDS = ("torch", "quantized", "onnx")
+
+def pipeline(*args, **kwargs) -> Any:
+    """
+    `transformers.pipeline`, imported on first use: importing transformers takes a large
+    share of a cold start and processes that never score sentiment should not pay for it.
+    """
+    from transformers import pipeline as transformers_pipeline
+    return transformers_pipeline(*args, **kwargs)
+
 class SentimentAnalysis:
-    def __init__(self, model_name: str = "nlptown/bert-base-multilingual-uncased-sentiment"):
+    def __init__(self, model_name: str = "nlptown/bert-base-multilingual-uncased-sentiment",
+                 batch_size: int = 32, max_length: int = 512, num_threads: Optional[int] = None,
+                 cache_size: int = 100_000, cache_path: Optional[str] = None,
+                 backend: str = "torch", onnx_path: Optional[str] = None):
         """
         Initialize sentiment analysis pipeline with the specified model.
+        Texts are scored in length-sorted batches of `batch_size`, truncated to `max_length`
+        tokens, and their scores cached by text hash (persisted to `cache_path` if given).
+        `backend` selects FP32 PyTorch ("torch"), dynamic INT8 PyTorch ("quantized") or an
+        ONNX Runtime session ("onnx"), exported to `onnx_path` on first use. The ONNX backend
+        never keeps the PyTorch model in memory, so `sentiment_pipeline` is None for it.
+        Nothing is loaded until the first analysis (or `load()`), so constructing it is cheap.
         """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown sentiment backend '{backend}', expected one of {BACKENDS}")
+        self.model_name = model_name
+        self.backend = backend
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.num_threads = num_threads
+        self.onnx_path = onnx_path or os.path.join("models", f"{model_name.replace('/', '__')}.onnx")
+        self.cache = ScoreCache(max_size=cache_size, path=cache_path)
+        self._sentiment_pipeline = None
+        self._engine: Optional[BatchedInferenceEngine] = None
+        self._load_lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._engine is not None
+
+    @property
+    def engine(self) -> BatchedInferenceEngine:
+        self.load()
+        return self._engine
+
+    @property
+    def sentiment_pipeline(self) -> Any:
+        self.load()
+        return self._sentiment_pipeline
+
+    def load(self) -> "SentimentAnalysis":
+        """
+        Loads the model and tokenizer (downloading them if needed). Called on first use;
+        call it explicitly to pre-warm, e.g. before forking workers that should share the model.
+        """
+        if self._engine is not None:
+            return self
+        with self._load_lock:
+            if self._engine is None:
+                self._load()
+        return self
+
+    def _load(self) -> None:
         try:
-            self.sentiment_pipeline = pipeline("sentiment-analysis", model=model_name)
-            logger.info(f"SentimentAnalysis initialized with model {model_name}")
+            return_tensors = 'pt'
+            if self.backend == "onnx":
+                from transformers import AutoConfig, AutoModelForSequenceClassification, AutoTokenizer
+                tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+                id2label = AutoConfig.from_pretrained(self.model_name).id2label
+                if not os.path.exists(self.onnx_path):
+                    export_onnx(AutoModelForSequenceClassification.from_pretrained(self.model_name), tokenizer,
+                                self.onnx_path)
+                forward = onnx_forward(self.onnx_path, num_threads=self.num_threads)
+                return_tensors = 'np'
+            else:
+                sentiment_pipeline = pipeline("sentiment-analysis", model=self.model_name)
+                if self.backend == "quantized":
+                    sentiment_pipeline.model = quantize_dynamic(sentiment_pipeline.model)
+                tokenizer = sentiment_pipeline.tokenizer
+                id2label = sentiment_pipeline.model.config.id2label
+                forward = torch_forward(sentiment_pipeline.model, num_threads=self.num_threads)
+                self._sentiment_pipeline = sentiment_pipeline
+            self._engine = BatchedInferenceEngine(
+                tokenizer=tokenizer,
+                forward=forward,
+                id2label=id2label,
+                batch_size=self.batch_size,
+                max_length=self.max_length,
+                return_tensors=return_tensors
+            )
+            logger.info(f"SentimentAnalysis loaded model {self.model_name} ({self.backend} backend)")
         except Exception as e:
             logger.error(f"Failed to load sentiment model: {e}")
             raise e
@@ -28,14 +118,31 @@ class SentimentAnalysis:
             return score
         return 0.0
 
+    @stage_timer("sentiment")
     def analyze_sentiment(self, texts: List[str]) -> List[float]:
         """
         Analyzes sentiment for a list of texts.
+        Cached texts are not re-scored; texts in a batch that fails to score get NaN.
         """
         try:
-            results = self.sentiment_pipeline(texts)
-            sentiments = [self._process_sentiment(result) for result in results]
-            logger.info(f"Sentiment analysis completed for {len(texts)} texts.")
+            keys = [text_key(text, f"{self.model_name}:{self.backend}") for text in texts]
+            scores = self.cache.get_many(keys)
+            pending = {}
+            for key, text in zip(keys, texts):
+                if key not in scores:
+                    pending.setdefault(key, text)
+            if pending:
+                results = self.engine.predict(list(pending.values()))
+                fresh = {
+                    key: self._process_sentiment(result)
+                    for key, result in zip(pending.keys(), results) if result is not None
+                }
+                self.cache.put_many(fresh)
+                scores.update(fresh)
+            sentiments = [scores.get(key, math.nan) for key in keys]
+            record_cache("sentiment", len(texts) - len(pending), len(pending))
+            DOCUMENTS.inc(len(texts), stage="sentiment")
+            logger.info(f"Sentiment analysis completed for {len(texts)} texts ({len(pending)} newly scored).")
             return sentiments
         except Exception as e:
             logger.error(f"Error during sentiment analysis: {e}")
@@ -0,0 +1,109 @@
+import logging
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+import numpy as np
+import scipy.sparse as sp
+
+logger = logging.getLogger(__name__)
+
+def to_epoch(timestamp: Any) -> float:
+    """
+    Converts epoch seconds, datetimes or ISO-8601 strings (e.g. Twitter's `created_at`) to epoch seconds.
+    """
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    return timestamp.timestamp()
+
+class TimeBucketedCounter:
+    def __init__(self, n_features: int, bucket_seconds: int = 60, n_buckets: int = 65):
+        """
+        Ring buffer of per-bucket sparse term counts over a hashed feature space.
+        Holds at most `n_buckets` buckets of `bucket_seconds` each, so memory is bounded
+        by the window length, not by how long the stream has been running.
+        """
+        self.n_features = n_features
+        self.bucket_seconds = bucket_seconds
+        self.n_buckets = n_buckets
+        self._slots: List[sp.csr_matrix] = [self._empty() for _ in range(n_buckets)]
+        self._head: Optional[int] = None
+
+    def _empty(self) -> sp.csr_matrix:
+        return sp.csr_matrix((1, self.n_features), dtype=np.float64)
+
+    def _advance(self, bucket: int) -> None:
+        """
+        Moves the head forward to `bucket`, clearing the slots it skips over.
+        """
+        if self._head is None:
+            self._head = bucket
+            return
+        for skipped in range(self._head + 1, min(bucket, self._head + self.n_buckets) + 1):
+            self._slots[skipped % self.n_buckets] = self._empty()
+        self._head = bucket
+
+    def add(self, counts: sp.csr_matrix, timestamps: List[float]) -> int:
+        """
+        Adds one row of `counts` per document to the bucket of its timestamp.
+        Documents older than the ring are dropped; returns how many were counted.
+        """
+        buckets = (np.asarray(timestamps, dtype=np.float64) // self.bucket_seconds).astype(np.int64)
+        if not len(buckets):
+            return 0
+        newest = int(buckets.max())
+        if self._head is None or newest > self._head:
+            self._advance(newest)
+        keep = buckets > self._head - self.n_buckets
+        counted = 0
+        for bucket in np.unique(buckets[keep]):
+            rows = np.flatnonzero(buckets == bucket)
+            slot = int(bucket) % self.n_buckets
+            self._slots[slot] = self._slots[slot] + sp.csr_matrix(counts[rows].sum(axis=0))
+            counted += len(rows)
+        return counted
+
+    def window(self, n_buckets: int) -> sp.csr_matrix:
+        """
+        Returns the most recent `n_buckets` buckets as a (buckets x features) matrix, oldest first.
+        """
+        if self._head is None:
+            return sp.csr_matrix((0, self.n_features))
+        order = [(self._head - offset) % self.n_buckets for offset in range(n_buckets - 1, -1, -1)]
+        return sp.vstack([self._slots[slot] for slot in order], format='csr')
+
+    def velocity(self, recent_buckets: int = 5, min_count: float = 3.0,
+                 top_k: int = 20) -> List[Tuple[int, float, float, float]]:
+        """
+        Scores terms by how fast they are rising: per-bucket rate over the last `recent_buckets`
+        against the mean and standard deviation of the remaining buckets as baseline.
+        Returns up to `top_k` `(column, recent_count, velocity, zscore)` tuples, highest z-score first.
+        """
+        matrix = self.window(self.n_buckets)
+        if matrix.shape[0] <= recent_buckets:
+            return []
+        recent = matrix[-recent_buckets:]
+        baseline = matrix[:-recent_buckets]
+        recent_count = np.asarray(recent.sum(axis=0)).ravel()
+        candidates = np.flatnonzero(recent_count >= min_count)
+        if not len(candidates):
+            return []
+        baseline = baseline[:, candidates]
+        n_baseline = baseline.shape[0]
+        mean = np.asarray(baseline.sum(axis=0)).ravel() / n_baseline
+        mean_sq = np.asarray(baseline.multiply(baseline).sum(axis=0)).ravel() / n_baseline
+        std = np.sqrt(np.maximum(mean_sq - mean ** 2, 0.0))
+        rate = recent_count[candidates] / recent_buckets
+        velocity = rate - mean
+        # The +1 keeps terms that were silent in the baseline from scoring infinite z.
+        zscore = velocity / np.sqrt(std ** 2 + 1.0)
+        top = np.argsort(zscore)[::-1][:top_k]
+        return [(int(candidates[i]), float(recent_count[candidates[i]]), float(velocity[i]), float(zscore[i]))
+                for i in top]
+
+    @property
+    def head_time(self) -> Optional[float]:
+        """
+        End time (epoch seconds) of the newest bucket.
+        """
+        return None if self._head is None else float((self._head + 1) * self.bucket_seconds)
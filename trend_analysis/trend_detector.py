@@ -1,38 +1,178 @@
 import logging
-from typing import List
+from typing import Any, Dict, List, Optional
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.decomposition import NMF
+from scipy.optimize import linear_sum_assignment
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.decomposition import NMF, MiniBatchNMF
 from sklearn.preprocessing import normalize
+from sklearn.utils import murmurhash3_32
+from monitoring.metrics import DOCUMENTS, stage_timer
+from preprocessing.shared_tokenizer import SharedTokenizer
+from trend_analysis.term_counter import TimeBucketedCounter, to_epoch
 
 logger = logging.getLogger(__name__)
 
+def hash_term(term: str, n_features: int) -> int:
+    """
+    Column index HashingVectorizer assigns to a term (non-alternating sign).
+    """
+    return abs(murmurhash3_32(term, seed=0)) % n_features
+
 class TrendDetector:
-    def __init__(self, n_topics: int = 10, n_top_words: int = 10):
+    def __init__(self, n_topics: int = 10, n_top_words: int = 10, n_features: int = 2 ** 18,
+                 match_threshold: float = 0.3, bucket_seconds: int = 60, recent_buckets: int = 5,
+                 baseline_buckets: int = 60):
         """
         Initializes the TrendDetector with the specified number of topics and top words per topic.
+        `n_features` sizes the hashing space of the incremental mode; `match_threshold` is the
+        minimum cosine similarity for an updated topic to keep its previous ID. Velocity scoring
+        compares the last `recent_buckets` time buckets against the `baseline_buckets` before them.
         """
         self.n_topics = n_topics
         self.n_top_words = n_top_words
         self.vectorizer = TfidfVectorizer(max_df=0.95, min_df=5, stop_words='english')
         self.model = NMF(n_components=self.n_topics, random_state=42)
+        self.match_threshold = match_threshold
+        self.online_vectorizer = HashingVectorizer(
+            n_features=n_features, stop_words='english', alternate_sign=False, norm='l2'
+        )
+        self.online_model = MiniBatchNMF(n_components=self.n_topics, random_state=42)
+        self.count_vectorizer = HashingVectorizer(
+            n_features=n_features, stop_words='english', alternate_sign=False, norm=None, binary=True
+        )
+        self.recent_buckets = recent_buckets
+        self.term_counter = TimeBucketedCounter(
+            n_features=n_features, bucket_seconds=bucket_seconds, n_buckets=recent_buckets + baseline_buckets
+        )
+        self._analyzer = self.online_vectorizer.build_analyzer()
+        self._term_lookup: Dict[int, str] = {}
+        self._topic_ids = np.arange(1, self.n_topics + 1)
+        self._next_topic_id = self.n_topics + 1
+        self._previous_components = None
+        self.topics: List[Dict[str, Any]] = []
+
+    def _record_topic(self, topic_id: int, terms: List[str], weights: np.ndarray) -> str:
+        """
+        Keeps the structured form of a topic (ID, top terms and their weights) and returns its label.
+        """
+        label = f"Trend {topic_id}: " + ", ".join(terms)
+        self.topics.append({"id": int(topic_id), "label": label, "terms": dict(zip(terms, map(float, weights)))})
+        return label
 
-    def detect_trends(self, documents: List[str]) -> List[str]:
+    @stage_timer("trends")
+    def detect_trends(self, documents: List[str], shared_tokens: Optional[SharedTokenizer] = None) -> List[str]:
         """
-        Detects trends using NMF for topic modeling.
+        Detects trends using NMF for topic modeling. The structured topics (ID, top terms
+        and weights) behind the returned labels are kept in `self.topics`.
+        With `shared_tokens` fitted on the same documents, TF-IDF is derived from its cached
+        counts instead of tokenizing the documents again.
         """
         try:
-            tfidf = self.vectorizer.fit_transform(documents)
+            if shared_tokens is not None:
+                tfidf = shared_tokens.tfidf_for(self.vectorizer)
+            else:
+                tfidf = self.vectorizer.fit_transform(documents)
             W = self.model.fit_transform(tfidf)
             H = self.model.components_
             feature_names = self.vectorizer.get_feature_names_out()
-            
+
             trends = []
+            self.topics = []
             for topic_idx, topic in enumerate(H):
-                top_features = [feature_names[i] for i in topic.argsort()[:-self.n_top_words - 1:-1]]
-                trends.append(f"Trend {topic_idx + 1}: " + ", ".join(top_features))
+                top_columns = topic.argsort()[:-self.n_top_words - 1:-1]
+                top_features = [feature_names[i] for i in top_columns]
+                trends.append(self._record_topic(topic_idx + 1, top_features, topic[top_columns]))
+            DOCUMENTS.inc(len(documents), stage="trends")
             logger.info("Trends detected successfully")
             return trends
         except Exception as e:
             logger.error(f"Error in trend detection: {e}")
             return []
+
+    def _remember_terms(self, documents: List[str]) -> None:
+        """
+        Records which term each hashed column came from, so topics can be labelled.
+        Bounded by `n_features` entries; on a collision the most recent term wins.
+        """
+        for document in documents:
+            for term in self._analyzer(document):
+                self._term_lookup[hash_term(term, self.online_vectorizer.n_features)] = term
+
+    def _match_topics(self, components: np.ndarray) -> None:
+        """
+        Carries topic IDs over from the previous update by matching components on cosine
+        similarity; components that no longer resemble any previous topic get a fresh ID.
+        """
+        current = normalize(components)
+        if self._previous_components is not None:
+            similarity = current @ self._previous_components.T
+            rows, cols = linear_sum_assignment(-similarity)
+            previous_ids = self._topic_ids.copy()
+            for row, col in zip(rows, cols):
+                if similarity[row, col] >= self.match_threshold:
+                    self._topic_ids[row] = previous_ids[col]
+                else:
+                    self._topic_ids[row] = self._next_topic_id
+                    self._next_topic_id += 1
+        self._previous_components = current
+
+    @stage_timer("trends_update")
+    def update_trends(self, documents: List[str]) -> List[str]:
+        """
+        Incrementally updates the topic model with a new batch of documents and returns the
+        current trends. Cost is proportional to the batch, not the corpus seen so far, and a
+        trend keeps its ID across updates for as long as its topic persists.
+        """
+        try:
+            features = self.online_vectorizer.transform(documents)
+            self._remember_terms(documents)
+            self.online_model.partial_fit(features)
+            H = self.online_model.components_
+            self._match_topics(H)
+
+            trends = []
+            self.topics = []
+            for topic_idx in np.argsort(self._topic_ids):
+                top_columns = np.argpartition(H[topic_idx], -self.n_top_words)[-self.n_top_words:]
+                top_columns = top_columns[np.argsort(H[topic_idx, top_columns])[::-1]]
+                top_columns = [i for i in top_columns if H[topic_idx, i] > 0 and i in self._term_lookup]
+                top_features = [self._term_lookup[i] for i in top_columns]
+                trends.append(self._record_topic(self._topic_ids[topic_idx], top_features, H[topic_idx, top_columns]))
+            DOCUMENTS.inc(len(documents), stage="trends_update")
+            logger.info(f"Trends updated incrementally with {len(documents)} documents")
+            return trends
+        except Exception as e:
+            logger.error(f"Error in incremental trend detection: {e}")
+            return []
+
+    @stage_timer("rising_terms")
+    def detect_rising_terms(self, documents: List[str], timestamps: List[Any], top_k: int = 20,
+                            min_count: float = 3.0) -> List[Dict[str, Any]]:
+        """
+        Adds timestamped documents to the time-bucketed term counts and returns the terms
+        rising fastest against their rolling baseline, highest z-score first. Timestamps may be
+        epoch seconds, datetimes or ISO-8601 strings such as Twitter's `created_at`.
+        """
+        try:
+            counts = self.count_vectorizer.transform(documents)
+            self._remember_terms(documents)
+            self.term_counter.add(counts, [to_epoch(timestamp) for timestamp in timestamps])
+            as_of = self.term_counter.head_time
+            trends = [
+                {
+                    "term": self._term_lookup.get(column, str(column)),
+                    "count": count,
+                    "velocity": velocity,
+                    "zscore": zscore,
+                    "timestamp": as_of
+                }
+                for column, count, velocity, zscore in self.term_counter.velocity(
+                    recent_buckets=self.recent_buckets, min_count=min_count, top_k=top_k
+                )
+            ]
+            DOCUMENTS.inc(len(documents), stage="rising_terms")
+            logger.info(f"Scored {len(trends)} rising terms")
+            return trends
+        except Exception as e:
+            logger.error(f"Error in rising term detection: {e}")
+            return []